@@ -0,0 +1,350 @@
+from typing import Any, Dict
+from network import *
+from utils import *
+from simulation import GeneticSimulation, PopulationEvaluator, SimulationMetrics, cascade_edges
+from argparse import ArgumentParser
+from datetime import datetime
+from copy import deepcopy
+import os
+import sys
+import json
+import time
+import random
+import platform
+import resource
+import numpy as np
+import networkx as nx
+
+BENCHMARK_DIR = join_with_parent_dir("benchmarks")
+BENCHMARK_PERCENTILES = [50, 90, 99]
+
+
+def benchmark_timings(func, repeats, setup=None):
+    """
+    Time repeats calls of func (after a warm-up call), running setup (untimed) before
+    each call and passing func its result, if given.
+
+    Returns the list of the timings in seconds.
+    """
+    func(setup()) if setup else func()
+
+    timings = []
+    for _ in range(repeats):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        func(arg) if setup else func()
+        timings.append(time.perf_counter() - start)
+
+    return timings
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+
+def benchmark_stats(timings, ops_per_call=1, edges_per_call=None):
+    """
+    Summary of the timings of a benchmark: mean and percentiles of a call, throughput
+    (ops/s and, if edges_per_call is given, edges/s, from the median call) and the
+    peak RSS of the process so far. edges_per_call is the number of edges scanned by
+    the cascades of a call (the "edges touched" of the simulation metrics).
+    """
+    timings = np.array(timings)
+    p50 = float(np.percentile(timings, 50))
+
+    stats = {
+        "repeats": len(timings),
+        "mean": float(timings.mean()),
+        "min": float(timings.min()),
+        "max": float(timings.max()),
+    }
+    for percentile in BENCHMARK_PERCENTILES:
+        stats[f"p{percentile}"] = float(np.percentile(timings, percentile))
+
+    stats["ops_per_s"] = ops_per_call / p50 if p50 > 0 else float("inf")
+    if edges_per_call is not None:
+        stats["edges_per_s"] = edges_per_call / p50 if p50 > 0 else float("inf")
+    stats["peak_rss_mb"] = peak_rss_mb()
+
+    return stats
+
+
+def benchmark_graph(
+    graph_name,
+    costs,
+    n=20,
+    repeats=20,
+    epoch_repeats=3,
+    seed=0,
+    options: Dict[Any, Any]=None,
+):
+    """
+    Benchmark the cascades, the generation of a population, the combination of seed
+    sets and a Genetic epoch on a graph, for each cost (budget).
+
+    Args:
+        graph_name (str): Name of the graph.
+        costs (list): Costs (budgets) of the seed sets.
+        n (int): Size of the populations.
+        repeats (int): Timed calls of each benchmark (but the epochs).
+        epoch_repeats (int): Timed calls of the epoch benchmark.
+        seed (int): Random seed of the thresholds, costs and seed sets.
+        options (dict): Dictionary with the "diffusion_engine", "batch_diffusion",
+            "incremental_diffusion" and "workers".
+
+    Returns a dictionary with the stats of each benchmark, keyed by "{graph}/{benchmark}/cost={cost}".
+    """
+    options = options or {}
+    diffusion_engine = options.get("diffusion_engine", "frontier")
+
+    # seeded before the graph is built, as the random graphs (e.g., erdos_renyi_graph) are built on first use
+    random.seed(seed)
+    graph = graphs_by_name[graph_name]
+
+    nodes_threshold = generate_nodes_threshold_with_node_degrees(graph, graph.nodes)
+    nodes_cost = generate_nodes_cost(graph.nodes)
+    total_cost = sum(nodes_cost.values())
+
+    results = {}
+    for cost in costs:
+        if cost > total_cost:
+            log_important(text=f"Skipping cost {cost} on \"{graph_name}\" (total cost {total_cost})")
+            continue
+
+        random.seed(seed + cost)
+        seed_sets = [
+            seed_set_from_graph_permutation_given_cost(graph.nodes, nodes_cost, cost)
+            for _ in range(repeats)
+        ]
+
+        # cascades, one per seed set
+        evaluator = PopulationEvaluator(graph, nodes_threshold, diffusion_engine=diffusion_engine)
+        cascades = iter(seed_sets * 2)
+        timings = benchmark_timings(
+            lambda seed_set: evaluator.evaluate_one(seed_set),
+            repeats,
+            setup=lambda: next(cascades).seed_set,
+        )
+        # edges scanned by the cascades (as the "edges touched" of the simulation metrics)
+        cascade_edges_per_call = np.mean([cascade_edges(graph, evaluator.evaluate_one(s.seed_set)[0]) for s in seed_sets])
+        results[f"{graph_name}/cascade/cost={cost}"] = benchmark_stats(timings, edges_per_call=cascade_edges_per_call)
+
+        # starting population of a Genetic simulation
+        timings = benchmark_timings(
+            lambda: seed_sets_from_graph_permutation_given_cost(graph.nodes, nodes_cost, cost, n),
+            repeats,
+        )
+        results[f"{graph_name}/population/cost={cost}"] = benchmark_stats(timings, ops_per_call=n)
+
+        # combination of two seed sets of the population
+        pairs = iter(list(zip(seed_sets, seed_sets[1:] + seed_sets[:1])) * 2)
+        timings = benchmark_timings(
+            lambda pair: permutation_position_combine_seed_sets(
+                s1=pair[0],
+                s2=pair[1],
+                nodes_cost_dict=nodes_cost,
+                cost=cost,
+                generation_opt=1,
+            ),
+            repeats,
+            setup=lambda: next(pairs),
+        )
+        results[f"{graph_name}/combine/cost={cost}"] = benchmark_stats(timings)
+
+        # a whole Genetic epoch (cascades of the population and the next population)
+        sim = GeneticSimulation(
+            cost=cost,
+            n=n,
+            nodes_threshold=nodes_threshold,
+            nodes_cost=nodes_cost,
+            diffusion_engine=diffusion_engine,
+            batch_diffusion=options.get("batch_diffusion", False),
+            incremental_diffusion=options.get("incremental_diffusion", False),
+            fitness_cache_size=0,
+            workers=options.get("workers", 0),
+        )
+        sim.metrics = SimulationMetrics(sim.name)
+        sim.evaluator = PopulationEvaluator(
+            graph=graph,
+            nodes_threshold=nodes_threshold,
+            diffusion_engine=diffusion_engine,
+            batch_diffusion=sim.batch_diffusion,
+            incremental_diffusion=sim.incremental_diffusion,
+            workers=sim.workers,
+            nodes_cost=nodes_cost,
+            metrics=sim.metrics,
+        )
+        random.seed(seed + cost)
+        population = seed_sets_from_graph_permutation_given_cost(graph.nodes, nodes_cost, cost, n)
+        timings = benchmark_timings(
+            lambda seed_sets: sim.run_epoch(
+                graph=graph,
+                seed_sets=seed_sets,
+                nodes_cost=nodes_cost,
+                nodes_threshold=nodes_threshold,
+            ),
+            epoch_repeats,
+            setup=lambda: deepcopy(population),
+        )
+        sim.evaluator.close()
+        epoch_edges_per_call = sim.metrics.counters["edges touched"] / sim.metrics.counters["epochs"]
+        results[f"{graph_name}/epoch/cost={cost}"] = benchmark_stats(timings, ops_per_call=n, edges_per_call=epoch_edges_per_call)
+
+    return results
+
+
+def run_benchmarks(
+    graph_names=None,
+    costs=(100, 500),
+    n=20,
+    repeats=20,
+    epoch_repeats=3,
+    seed=0,
+    options: Dict[Any, Any]=None,
+):
+    """
+    Benchmark each graph (all of graphs_by_name if not given), skipping the graphs
+    whose files are missing.
+
+    Returns the benchmark report, with the environment in "meta" and the stats of
+    each benchmark in "results".
+    """
+    graph_names = graph_names or list(graphs_by_name)
+
+    results = {}
+    for graph_name in graph_names:
+        try:
+            graph_results = benchmark_graph(graph_name, costs, n, repeats, epoch_repeats, seed, options)
+        except FileNotFoundError as e:
+            log_important(text=f"Skipping graph \"{graph_name}\" because of \"{e}\"")
+            continue
+
+        for name, stats in graph_results.items():
+            log_benchmark_stats(name, stats)
+        results.update(graph_results)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "networkx": nx.__version__,
+            "seed": seed,
+            "n": n,
+            "costs": list(costs),
+            "options": options or {},
+        },
+        "results": results,
+    }
+
+
+def log_benchmark_stats(name, stats):
+    throughput = f"{stats['ops_per_s']:.1f} ops/s"
+    if "edges_per_s" in stats:
+        throughput += f", {stats['edges_per_s']:.3g} edges/s"
+
+    log_important(text=(
+        f"{name}: p50 {stats['p50'] * 1000:.3f} ms, p90 {stats['p90'] * 1000:.3f} ms, "
+        f"p99 {stats['p99'] * 1000:.3f} ms, {throughput}, peak RSS {stats['peak_rss_mb']:.1f} MB"
+    ))
+
+
+def compare_benchmarks(baseline, current, tolerance=0.1, metric="p50"):
+    """
+    Compare the benchmarks of two reports.
+
+    Args:
+        baseline (dict): Baseline report.
+        current (dict): Current report.
+        tolerance (float): Relative slowdown of the metric above which a benchmark regressed.
+        metric (str): Timing compared (e.g., "p50" or "mean").
+
+    Returns the names of the regressed benchmarks.
+    """
+    regressions = []
+    for name, stats in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+
+        before = baseline["results"][name][metric]
+        after = stats[metric]
+        change = (after - before) / before if before > 0 else 0.0
+
+        if change > tolerance:
+            regressions.append(name)
+            log_important(text=f"{RED}REGRESSION{RESET} {name}: {metric} {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({change:+.1%})")
+        else:
+            log_important(text=f"{GREEN}OK{RESET} {name}: {metric} {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({change:+.1%})")
+
+    return regressions
+
+
+def save_benchmarks(report, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_benchmarks(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark the diffusion, the seed set generation and the genetic epochs.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and save them as JSON")
+    run_parser.add_argument("-g", "--graph_names", type=str, nargs="+", default=None, help="Graph names (all graphs if not given)")
+    run_parser.add_argument("-c", "--costs", type=int, nargs="+", default=[100, 500], help="Cost values")
+    run_parser.add_argument("-n", "--set_size", type=int, default=20, help="Size of the populations")
+    run_parser.add_argument("-r", "--repeats", type=int, default=20, help="Timed calls of each benchmark")
+    run_parser.add_argument("-er", "--epoch_repeats", type=int, default=3, help="Timed calls of the epoch benchmark")
+    run_parser.add_argument("-s", "--seed", type=int, default=0, help="Random seed")
+    run_parser.add_argument("-de", "--diffusion_engine", type=str, default="frontier", help="Diffusion engine (standard, frontier, csr or reduced)")
+    run_parser.add_argument("-bd", "--batch_diffusion", action="store_true", help="Evaluate each genetic population in one batched diffusion")
+    run_parser.add_argument("-id", "--incremental_diffusion", action="store_true", help="Continue the cascade of each seed set from the cascade of the closest evaluated seed set")
+    run_parser.add_argument("-w", "--workers", type=int, default=0, help="Number of worker processes evaluating the genetic populations")
+    run_parser.add_argument("-o", "--output", type=str, default=None, help="Output JSON file (benchmarks/benchmark_<timestamp>.json if not given)")
+    run_parser.add_argument("-b", "--baseline", type=str, default=None, help="Baseline JSON file to compare with")
+    run_parser.add_argument("-t", "--tolerance", type=float, default=0.1, help="Relative slowdown flagged as a regression")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two saved benchmarks")
+    compare_parser.add_argument("baseline", type=str, help="Baseline JSON file")
+    compare_parser.add_argument("current", type=str, help="Current JSON file")
+    compare_parser.add_argument("-t", "--tolerance", type=float, default=0.1, help="Relative slowdown flagged as a regression")
+    compare_parser.add_argument("-m", "--metric", type=str, default="p50", help="Timing compared (p50, p90, p99, mean or min)")
+    args = parser.parse_args()
+
+    # only the benchmark results are logged, not the output of the simulations
+    os.environ["LOG_LEVEL"] = "IMPORTANT"
+    configure_logger()
+
+    if args.command == "run":
+        report = run_benchmarks(
+            graph_names=args.graph_names,
+            costs=args.costs,
+            n=args.set_size,
+            repeats=args.repeats,
+            epoch_repeats=args.epoch_repeats,
+            seed=args.seed,
+            options={
+                "diffusion_engine": args.diffusion_engine,
+                "batch_diffusion": args.batch_diffusion,
+                "incremental_diffusion": args.incremental_diffusion,
+                "workers": args.workers,
+            },
+        )
+        output = args.output or os.path.join(BENCHMARK_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d%H%M%S')}.json")
+        save_benchmarks(report, output)
+        log_important(text=f"Saved the benchmarks to {output}")
+
+        if args.baseline:
+            regressions = compare_benchmarks(load_benchmarks(args.baseline), report, args.tolerance)
+            sys.exit(1 if regressions else 0)
+    else:
+        regressions = compare_benchmarks(load_benchmarks(args.baseline), load_benchmarks(args.current), args.tolerance, args.metric)
+        sys.exit(1 if regressions else 0)
@@ -2,11 +2,28 @@ from typing import Any, Dict
 from network import *
 from utils import *
 from heapq import *
+import os
+import csv
+import json
+import cProfile
+import time
+import random
+import hashlib
+import itertools
 import matplotlib.pyplot as plt
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from simulation import GeneticSimulation
-from simulation import DegreeSimulation, DegreeCostSimulation
+from simulation import DegreeSimulation, DegreeCostSimulation, CELFSimulation, TSSSimulation
 from simulation import GeneticDegreeSimulation, GeneticDegreeCostSimulation
+from simulation import SimulationMetrics
+from simulation import SimulationCheckpoint, checkpoint_path, setup_fingerprint
+from simulation import IslandSimulation
+
+FINAL_RESULTS_ORDER = ["Genetic", "Genetic Degree", "Genetic Degree/Cost", "Degree", "Degree/Cost", "CELF", "TSS"]
+# max number of runs of a simulation whose population could not be generated
+SIMULATION_ATTEMPTS = 3
+SWEEP_COLUMNS = ["graph_name", "cost", "n", "epochs", "simulation", "score", "seconds"]
 
 
 def run_experiment(
@@ -28,22 +45,361 @@ def run_experiment(
         n (int): Number of nodes.
         options (dict): Dictionary with options.
     """
+    run_experiments([exp_name], epochs, graph_name, cost, n, options, with_log_files=False)
+
+
+def run_experiments(
+    exp_names,
+    epochs=10,
+    graph_name="karate_club_graph",
+    cost=0,
+    n=20,
+    options: Dict[Any, Any]=None,
+    with_log_files=True,
+):
+    """
+    Run multiple experiments, scheduling the independent simulations of all of them
+    on a pool of options["jobs"] processes (one after the other if jobs <= 1).
+
+    Each simulation runs with its own random seed, derived from options["seed"], the
+    experiment name and the simulation, so the results do not depend on the number of
+    jobs, and (with jobs > 1) logs to its own file.
+
+    Args:
+        exp_names (list): Names of the experiments.
+        epochs (int): Number of epochs.
+        graph_name (str): Name of the graph.
+        cost (int): Cost of the nodes.
+        n (int): Number of nodes.
+        options (dict): Dictionary with options.
+        with_log_files (bool): If True, log each experiment to the file named after it.
+    """
+    options = dict(options or {})
+    *_, jobs, seed, with_metrics, _ = load_options(options)
+    if seed is None:
+        options["seed"] = random.randrange(2 ** 32)
+
+    executor = ProcessPoolExecutor(max_workers=jobs, mp_context=fork_context()) if jobs > 1 else None
+
+    experiments = []
+    for exp_name in exp_names:
+        if with_log_files:
+            use_log_file(exp_name)
+
+        log_important(text=f"\n{BLUE}### STARTING EXPERIMENT {exp_name} ###{RESET}")
+        log_important(text=f"Using seed {options['seed']}")
+
+        exp_metrics = SimulationMetrics(exp_name)
+        random.seed(job_seed(options["seed"], exp_name, "setup"))
+        nodes_threshold, nodes_cost = setup_graph(graph_name, options.get("thresholds_as_majority", False))
+        exp_metrics.lap("setup")
+
+        job_results = []
+        for job_name in experiment_jobs(options):
+            job = (job_name, exp_name, epochs, graph_name, cost, n, nodes_threshold, nodes_cost, options)
+            if executor is None:
+                job_results.append(run_experiment_job(*job))
+            else:
+                job_results.append(executor.submit(run_experiment_job, *job, log_file_path=f"{exp_name} {job_name}"))
+        exp_metrics.lap("simulations")
+        experiments.append((exp_name, job_results, exp_metrics))
+
+    try:
+        for exp_name, job_results, exp_metrics in experiments:
+            results = {}
+            scores = {}
+            metrics = {}
+            exp_metrics.mark()
+            for job_result in job_results:
+                job_simulation_results, job_scores, job_metrics = job_result.result() if executor is not None else job_result
+                results.update(job_simulation_results)
+                scores.update(job_scores)
+                metrics.update(job_metrics)
+            exp_metrics.lap("simulations")
+
+            if with_log_files:
+                use_log_file(exp_name)
+
+            log_important(text=f"\n{GREEN}### FINAL RESULTS ###{RESET}")
+            for name in FINAL_RESULTS_ORDER:
+                if name in scores:
+                    log_important(text=f"- {name} score: {scores[name]}")
+
+            save_results(exp_name, graph_name, results)
+            exp_metrics.lap("plot")
+
+            if with_metrics:
+                save_metrics(exp_name, exp_metrics, metrics)
+
+            log_important(text=f"\n{BLUE}### ENDING EXPERIMENT {exp_name} ###{RESET}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def job_seed(seed, exp_name, job_name):
+    # stable across processes (unlike hash() of strings)
+    digest = hashlib.sha256(f"{seed}:{exp_name}:{job_name}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def experiment_jobs(options: Dict[Any, Any]):
+    """
+    Independent simulations of an experiment, in the order of their results. The
+    Degree/Cost simulation starts from the best Genetic Degree/Cost seed set when
+    with_best_of_starting_population is set, so then it runs in the same job.
+    """
+    jobs = []
+    if options.get("do_genetic_degree", False):
+        jobs.append("Genetic Degree")
+    jobs.append("Genetic Degree/Cost")
+    jobs.append("Genetic")
+    jobs.append("Degree")
+    if not options.get("with_best_of_starting_population", False):
+        jobs.append("Degree/Cost")
+    jobs.append("CELF")
+    jobs.append("TSS")
+    return jobs
+
+
+def run_experiment_job(
+    job_name,
+    exp_name,
+    epochs,
+    graph_name,
+    cost,
+    n,
+    nodes_threshold,
+    nodes_cost,
+    options: Dict[Any, Any],
+    log_file_path=None,
+):
+    """
+    Run the simulations of a job of an experiment.
+
+    Returns the results (epoch scores and line color), the score and the metrics
+    of each simulation.
+    """
+    if log_file_path is not None:
+        use_log_file(log_file_path)
+
+    random.seed(job_seed(options["seed"], exp_name, job_name))
+
+    *_, with_profile = load_options(options)
+
+    # opt-in profile of the whole job, saved next to the results
+    profiler = cProfile.Profile() if with_profile else None
+    if profiler is not None:
+        profiler.enable()
+
+    try:
+        return run_simulations(job_name, exp_name, epochs, graph_name, cost, n, nodes_threshold, nodes_cost, options)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            save_profile(f"{exp_name} {job_name}", profiler)
+        if log_file_path is not None:
+            # worker processes exit without running atexit, so write the queued lines now
+            close_logger()
+
+
+def sweep_grid(costs, set_sizes, epochs):
+    """
+    Configurations of a sweep over every combination of the given values.
+
+    Args:
+        costs (list): Costs (budgets) of the seed sets.
+        set_sizes (list): Sizes of the populations.
+        epochs (list): Numbers of epochs.
+    """
+    return [
+        {"cost": cost, "n": n, "epochs": e}
+        for cost, n, e in itertools.product(costs, set_sizes, epochs)
+    ]
+
+
+def run_sweep(
+    sweep_name="sweep",
+    graph_names=("karate_club_graph",),
+    configurations=None,
+    options: Dict[Any, Any]=None,
+):
+    """
+    Run the simulations of each configuration on each graph, loading every graph and
+    generating its thresholds and costs only once, and on options["jobs"] processes.
+
+    Each finished simulation job is appended to results/{sweep_name}_{timestamp}.csv
+    as soon as it completes (so the rows are in completion order).
+
+    Args:
+        sweep_name (str): Name of the sweep.
+        graph_names (list): Names of the graphs.
+        configurations (list): Dictionaries with the "cost", "n" and "epochs" of each configuration.
+        options (dict): Dictionary with options (shared by all configurations).
+
+    Returns the path of the results file.
+    """
+    options = dict(options or {})
+    *_, jobs, seed, _, _ = load_options(options)
+    if seed is None:
+        options["seed"] = random.randrange(2 ** 32)
+
+    log_important(text=f"\n{BLUE}### STARTING SWEEP {sweep_name} ###{RESET}")
+    log_important(text=f"Using seed {options['seed']} and {len(configurations)} configurations")
+
+    graph_setups = {}
+    for graph_name in graph_names:
+        random.seed(job_seed(options["seed"], sweep_name, graph_name))
+        graph_setups[graph_name] = setup_graph(graph_name, options.get("thresholds_as_majority", False))
+
+    tasks = [
+        (graph_name, configuration, job_name)
+        for graph_name in graph_names
+        for configuration in configurations
+        for job_name in experiment_jobs(options)
+    ]
+
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    results_dir = "results"
+    os.makedirs(results_dir, exist_ok=True)
+    output_filename = os.path.join(results_dir, f"{sweep_name}_{timestamp}.csv")
+
+    with open(output_filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SWEEP_COLUMNS)
+        f.flush()
+
+        if jobs > 1:
+            with ProcessPoolExecutor(
+                max_workers=jobs,
+                mp_context=fork_context(),
+                initializer=init_sweep_worker,
+                initargs=(graph_setups,),
+            ) as executor:
+                futures = [
+                    executor.submit(run_sweep_task, sweep_name, *task, options, with_log_file=True)
+                    for task in tasks
+                ]
+                for future in as_completed(futures):
+                    writer.writerows(future.result())
+                    f.flush()
+        else:
+            init_sweep_worker(graph_setups)
+            for task in tasks:
+                writer.writerows(run_sweep_task(sweep_name, *task, options))
+                f.flush()
+
+    log_important(text=f"Saved the sweep results to {output_filename}")
+    log_important(text=f"\n{BLUE}### ENDING SWEEP {sweep_name} ###{RESET}")
+
+    return output_filename
+
+
+# thresholds and costs of the graphs of a sweep, set once per worker process
+_sweep_graph_setups = None
+
+
+def init_sweep_worker(graph_setups):
+    global _sweep_graph_setups
+    _sweep_graph_setups = graph_setups
+
+
+def run_sweep_task(sweep_name, graph_name, configuration, job_name, options, with_log_file=False):
+    """
+    Run a simulation job of a sweep configuration and return its rows of results.
+    """
+    cost, n, epochs = configuration["cost"], configuration["n"], configuration["epochs"]
+    nodes_threshold, nodes_cost = _sweep_graph_setups[graph_name]
+
+    config_name = f"{sweep_name} {graph_name} c={cost} n={n} e={epochs}"
+    start = time.perf_counter()
+    _, scores, _ = run_experiment_job(
+        job_name,
+        config_name,
+        epochs,
+        graph_name,
+        cost,
+        n,
+        nodes_threshold,
+        nodes_cost,
+        options,
+        log_file_path=f"{config_name} {job_name}" if with_log_file else None,
+    )
+    seconds = time.perf_counter() - start
+
+    return [
+        [graph_name, cost, n, epochs, name, score, f"{seconds:.3f}"]
+        for name, score in scores.items()
+    ]
+
+
+def run_attempts(name, run, attempts=SIMULATION_ATTEMPTS):
+    """
+    Run a simulation whose population may not be generated (a ValueError, e.g., when
+    the seed sets of the given cost are less than the population size), up to the
+    given number of attempts, each drawing new seed sets.
+
+    Args:
+        name (str): Name of the simulation.
+        run (function): Runs the simulation and returns its results.
+        attempts (int): Max number of attempts.
+
+    Returns the results of the first attempt that succeeded, or None if all failed.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return run()
+        except ValueError as e:
+            log_important(text=f"Attempt {attempt} of {attempts} of {name} failed because of \"{e}\"")
+
+    log_important(text=f"Skipping {name} after {attempts} failed attempts")
+    return None
+
+
+def run_simulations(job_name, exp_name, epochs, graph_name, cost, n, nodes_threshold, nodes_cost, options):
     (
         do_genetic_degree,
         do_genetic_degree_cost_no_first_total,
         thresholds_as_majority,
         with_best_of_starting_population,
+        diffusion_engine,
+        batch_diffusion,
+        incremental_diffusion,
+        fitness_cache_size,
+        workers,
+        checkpoint_every,
+        resume,
+        islands,
+        migration_every,
+        _,
+        _,
+        _,
+        _,
     ) = load_options(options)
 
-    results = {}
+    def checkpoint(name):
+        # the genetic simulations save (and resume from) a checkpoint of each epoch if checkpoint_every > 0
+        if checkpoint_every <= 0 and not resume:
+            return None
+        return SimulationCheckpoint(
+            path=checkpoint_path(f"{exp_name} {name}"),
+            key=(name, cost, n, setup_fingerprint(graph_name, nodes_threshold, nodes_cost)),
+            every=checkpoint_every,
+        )
 
-    log_important(text=f"\n{BLUE}### STARTING EXPERIMENT {exp_name} ###{RESET}")
+    def on_islands(simulation):
+        # with islands > 1, the genetic simulations evolve a population of n seed sets per island
+        if islands <= 1:
+            return simulation
+        return IslandSimulation(simulation, islands=islands, migration_every=migration_every)
 
-    nodes_threshold, nodes_cost = setup_graph(graph_name, thresholds_as_majority)
+    results = {}
+    scores = {}
+    metrics = {}
 
-    if do_genetic_degree:
+    if job_name == "Genetic Degree":
         log_important(text=f"\n{YELLOW}### STARTING GENETIC DEGREE ###{RESET}")
-        genetic_degree_sim = GeneticDegreeSimulation(
+        genetic_degree_sim = on_islands(GeneticDegreeSimulation(
             name="Genetic Degree",
             cost=cost,
             n=n,
@@ -51,17 +407,31 @@ def run_experiment(
             a_range=[0.1, 1],
             nodes_threshold=nodes_threshold,
             nodes_cost=nodes_cost,
-        )
-        _, genetic_degree_score, epoch_scores = genetic_degree_sim.run(graph_name)
-        results[genetic_degree_sim.name] = (epoch_scores, LINE_YELLOW)
-        log_important(text=f"Genetic Degree score: {genetic_degree_score}")
-
-    best_of_starting_population = None
-    log_important(text=f"\n{YELLOW}### STARTING GENETIC DEGREE/COST ###{RESET}")
-    while True:
-        try:
-            genetic_degree_cost_sim = GeneticDegreeCostSimulation(
-                name="Genetic Degree/Cost",
+            diffusion_engine=diffusion_engine,
+            batch_diffusion=batch_diffusion,
+            incremental_diffusion=incremental_diffusion,
+            fitness_cache_size=fitness_cache_size,
+            workers=workers,
+            checkpoint=checkpoint("Genetic Degree"),
+            resume=resume,
+        ))
+        # the degree ordering reaches a single seed set, so it is not run again
+        result = run_attempts(genetic_degree_sim.name, lambda: genetic_degree_sim.run(graph_name), attempts=1)
+        if result is not None:
+            _, genetic_degree_score, epoch_scores = result
+            results[genetic_degree_sim.name] = (epoch_scores, LINE_YELLOW)
+            scores[genetic_degree_sim.name] = genetic_degree_score
+            metrics[genetic_degree_sim.name] = genetic_degree_sim.metrics.to_dict()
+            log_important(text=f"Genetic Degree score: {genetic_degree_score}")
+
+    if job_name == "Genetic Degree/Cost":
+        best_of_starting_population = None
+        genetic_degree_cost_score = None
+        log_important(text=f"\n{YELLOW}### STARTING GENETIC DEGREE/COST ###{RESET}")
+
+        def run_genetic_degree_cost(name, with_first_total=True, with_best=False):
+            sim = on_islands(GeneticDegreeCostSimulation(
+                name=name,
                 cost=cost,
                 n=n,
                 epochs=epochs,
@@ -69,94 +439,161 @@ def run_experiment(
                 b_range=[0.1, 1],
                 nodes_threshold=nodes_threshold,
                 nodes_cost=nodes_cost,
-                with_best_of_starting_population=with_best_of_starting_population,
-            )
-            _, genetic_degree_cost_score, epoch_scores, best = genetic_degree_cost_sim.run(graph_name)
+                with_first_total=with_first_total,
+                with_best_of_starting_population=with_best,
+                diffusion_engine=diffusion_engine,
+                batch_diffusion=batch_diffusion,
+                incremental_diffusion=incremental_diffusion,
+                fitness_cache_size=fitness_cache_size,
+                workers=workers,
+                checkpoint=checkpoint(name),
+                resume=resume,
+            ))
+            return sim, sim.run(graph_name)
+
+        result = run_attempts("Genetic Degree/Cost", lambda: run_genetic_degree_cost("Genetic Degree/Cost", with_best=with_best_of_starting_population))
+        if result is not None:
+            genetic_degree_cost_sim, (_, genetic_degree_cost_score, epoch_scores, best) = result
             results[genetic_degree_cost_sim.name] = (epoch_scores, LINE_PURPLE)
+            metrics[genetic_degree_cost_sim.name] = genetic_degree_cost_sim.metrics.to_dict()
             if with_best_of_starting_population:
-                log_important(text=f"Using best of starting population as seed set: {best}")
+                log_important(text=f"Using best of starting population as seed set: {summarize_nodes(best.seed_set)}")
                 best_of_starting_population = best
             log_important(text=f"Genetic Degree/Cost score: {genetic_degree_cost_score}")
 
-            break
-        except Exception as e:
-            log_important(text=f"Retrying Genetic Degree/Cost because of \"{e}\"")
-
-    if do_genetic_degree_cost_no_first_total:
-        log_important(text=f"\n{YELLOW}### STARTING GENETIC DEGREE/COST NO FIRST TOTAL ###{RESET}")
-        while True:
-            try:
-                genetic_degree_cost_no_total_sim = GeneticDegreeCostSimulation(
-                    name="Genetic Degree/Cost No First Total",
-                    cost=cost,
-                    n=n,
-                    epochs=epochs,
-                    a_range=[0.1, 1],
-                    b_range=[0.1, 1],
-                    nodes_threshold=nodes_threshold,
-                    nodes_cost=nodes_cost,
-                    with_first_total=False,
-                )
-                _, genetic_degree_cost_no_total_score, epoch_scores = genetic_degree_cost_no_total_sim.run(graph_name)
+        if do_genetic_degree_cost_no_first_total:
+            log_important(text=f"\n{YELLOW}### STARTING GENETIC DEGREE/COST NO FIRST TOTAL ###{RESET}")
+            result = run_attempts("Genetic Degree/Cost No First Total", lambda: run_genetic_degree_cost("Genetic Degree/Cost No First Total", with_first_total=False))
+            if result is not None:
+                genetic_degree_cost_no_total_sim, (_, genetic_degree_cost_no_total_score, epoch_scores, _) = result
                 log_important(text=f"Genetic Degree/Cost No First Total score: {genetic_degree_cost_no_total_score}")
-                if genetic_degree_cost_no_total_score > genetic_degree_cost_score:
+                metrics[genetic_degree_cost_no_total_sim.name] = genetic_degree_cost_no_total_sim.metrics.to_dict()
+                if genetic_degree_cost_score is None or genetic_degree_cost_no_total_score > genetic_degree_cost_score:
                     log_important(text=f"Genetic Degree/Cost No First Total score performed better")
                     genetic_degree_cost_score = genetic_degree_cost_no_total_score
-                    results[genetic_degree_cost_sim.name] = (epoch_scores, LINE_PURPLE)
-
-                break
-            except Exception as e:
-                log_important(text=f"Skipping Genetic Degree/Cost No First Total because of \"{e}\"")
-
-    log_important(text=f"\n{YELLOW}### STARTING GENETIC ###{RESET}")
-    genetic_sim = GeneticSimulation(
-        name="Genetic",
-        cost=cost,
-        n=n,
-        epochs=epochs,
-        nodes_threshold=nodes_threshold,
-        nodes_cost=nodes_cost,
-    )
-    _, genetic_score, epoch_scores = genetic_sim.run(graph_name)
-    results[genetic_sim.name] = (epoch_scores, LINE_BLUE)
-    log_important(text=f"Genetic score: {genetic_score}")
-
-    log_important(text=f"\n{YELLOW}### STARTING DEGREE ###{RESET}")
-    degree_sim = DegreeSimulation(
-        name="Degree",
-        cost=cost,
-        nodes_threshold=nodes_threshold,
-        nodes_cost=nodes_cost,
-    )
-    _, degree_score = degree_sim.run(graph_name)
-    epoch_scores = {epoch: degree_score for epoch in range(epochs)}
-    results[degree_sim.name] = (epoch_scores, LINE_RED)
-    log_important(text=f"Degree score: {degree_score}")
-
-    log_important(text=f"\n{YELLOW}### STARTING DEGREE/COST ###{RESET}")
-    degree_cost_sim = DegreeCostSimulation(
-        name="Degree/Cost",
-        cost=cost,
-        nodes_threshold=nodes_threshold,
-        nodes_cost=nodes_cost,
-        starting_seed_set=best_of_starting_population,
-    )
-    _, degree_cost_score = degree_cost_sim.run(graph_name)
-    epoch_scores = {epoch: degree_cost_score for epoch in range(epochs)}
-    results[degree_cost_sim.name] = (epoch_scores, LINE_GREEN)
-    log_important(text=f"Degree/Cost score: {degree_cost_score}")
+                    results["Genetic Degree/Cost"] = (epoch_scores, LINE_PURPLE)
+
+        if genetic_degree_cost_score is not None:
+            scores["Genetic Degree/Cost"] = genetic_degree_cost_score
+
+    if job_name == "Genetic":
+        log_important(text=f"\n{YELLOW}### STARTING GENETIC ###{RESET}")
+        genetic_sim = on_islands(GeneticSimulation(
+            name="Genetic",
+            cost=cost,
+            n=n,
+            epochs=epochs,
+            nodes_threshold=nodes_threshold,
+            nodes_cost=nodes_cost,
+            diffusion_engine=diffusion_engine,
+            batch_diffusion=batch_diffusion,
+            incremental_diffusion=incremental_diffusion,
+            fitness_cache_size=fitness_cache_size,
+            workers=workers,
+            checkpoint=checkpoint("Genetic"),
+            resume=resume,
+        ))
+        _, genetic_score, epoch_scores = genetic_sim.run(graph_name)
+        results[genetic_sim.name] = (epoch_scores, LINE_BLUE)
+        scores[genetic_sim.name] = genetic_score
+        metrics[genetic_sim.name] = genetic_sim.metrics.to_dict()
+        log_important(text=f"Genetic score: {genetic_score}")
+
+    if job_name == "Degree":
+        log_important(text=f"\n{YELLOW}### STARTING DEGREE ###{RESET}")
+        degree_sim = DegreeSimulation(
+            name="Degree",
+            cost=cost,
+            nodes_threshold=nodes_threshold,
+            nodes_cost=nodes_cost,
+            diffusion_engine=diffusion_engine,
+        )
+        _, degree_score = degree_sim.run(graph_name)
+        epoch_scores = {epoch: degree_score for epoch in range(epochs)}
+        results[degree_sim.name] = (epoch_scores, LINE_RED)
+        scores[degree_sim.name] = degree_score
+        metrics[degree_sim.name] = degree_sim.metrics.to_dict()
+        log_important(text=f"Degree score: {degree_score}")
+
+    if job_name == "Degree/Cost" or (job_name == "Genetic Degree/Cost" and with_best_of_starting_population):
+        log_important(text=f"\n{YELLOW}### STARTING DEGREE/COST ###{RESET}")
+        degree_cost_sim = DegreeCostSimulation(
+            name="Degree/Cost",
+            cost=cost,
+            nodes_threshold=nodes_threshold,
+            nodes_cost=nodes_cost,
+            starting_seed_set=best_of_starting_population if job_name == "Genetic Degree/Cost" else None,
+            diffusion_engine=diffusion_engine,
+        )
+        _, degree_cost_score = degree_cost_sim.run(graph_name)
+        epoch_scores = {epoch: degree_cost_score for epoch in range(epochs)}
+        results[degree_cost_sim.name] = (epoch_scores, LINE_GREEN)
+        scores[degree_cost_sim.name] = degree_cost_score
+        metrics[degree_cost_sim.name] = degree_cost_sim.metrics.to_dict()
+        log_important(text=f"Degree/Cost score: {degree_cost_score}")
+
+    if job_name == "CELF":
+        log_important(text=f"\n{YELLOW}### STARTING CELF ###{RESET}")
+        celf_sim = CELFSimulation(
+            name="CELF",
+            cost=cost,
+            nodes_threshold=nodes_threshold,
+            nodes_cost=nodes_cost,
+            diffusion_engine=diffusion_engine,
+        )
+        _, celf_score = celf_sim.run(graph_name)
+        epoch_scores = {epoch: celf_score for epoch in range(epochs)}
+        results[celf_sim.name] = (epoch_scores, LINE_CYAN)
+        scores[celf_sim.name] = celf_score
+        metrics[celf_sim.name] = celf_sim.metrics.to_dict()
+        log_important(text=f"CELF score: {celf_score}")
+
+    if job_name == "TSS":
+        log_important(text=f"\n{YELLOW}### STARTING TSS ###{RESET}")
+        tss_sim = TSSSimulation(
+            name="TSS",
+            cost=cost,
+            nodes_threshold=nodes_threshold,
+            nodes_cost=nodes_cost,
+            diffusion_engine=diffusion_engine,
+        )
+        _, tss_score = tss_sim.run(graph_name)
+        epoch_scores = {epoch: tss_score for epoch in range(epochs)}
+        results[tss_sim.name] = (epoch_scores, LINE_BLACK)
+        scores[tss_sim.name] = tss_score
+        metrics[tss_sim.name] = tss_sim.metrics.to_dict()
+        log_important(text=f"TSS score: {tss_score}")
+
+    return results, scores, metrics
+
+
+def save_metrics(exp_name, exp_metrics, simulation_metrics):
+    """
+    Save the metrics of an experiment and of its simulations as JSON.
 
-    log_important(text=f"\n{GREEN}### FINAL RESULTS ###{RESET}")
-    log_important(text=f"- Genetic score: {genetic_score}")
-    if do_genetic_degree:
-        log_important(text=f"- Genetic Degree score: {genetic_degree_score}")
-    log_important(text=f"- Genetic Degree/Cost score: {genetic_degree_cost_score}")
-    log_important(text=f"- Degree score: {degree_score}")
-    log_important(text=f"- Degree/Cost score: {degree_cost_score}")
+    Args:
+        exp_name (str): Name of the experiment (used in the filename).
+        exp_metrics (SimulationMetrics): Metrics of the experiment (setup, simulations and plot).
+        simulation_metrics (dict): Dictionary with the metrics of each simulation.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
 
-    save_results(exp_name, graph_name, results)
+    results_dir = "results"
+    os.makedirs(results_dir, exist_ok=True)
+    output_filename = os.path.join(results_dir, f"{exp_name}_{timestamp}_metrics.json")
+    with open(output_filename, "w") as f:
+        json.dump({"experiment": exp_metrics.to_dict(), "simulations": simulation_metrics}, f, indent=2)
+
+    log_important(text=f"Saved the metrics to {output_filename}")
+
+
+def save_profile(name, profiler):
+    results_dir = "results"
+    os.makedirs(results_dir, exist_ok=True)
+    output_filename = os.path.join(results_dir, f"{name.replace(os.sep, '-')}.prof")
+    profiler.dump_stats(output_filename)
 
-    log_important(text=f"\n{BLUE}### ENDING EXPERIMENT {exp_name} ###{RESET}")
+    log_important(text=f"Saved the profile to {output_filename} (inspect it with python -m pstats)")
 
 
 def save_results(exp_name, graph_name, simulation_results):
@@ -233,16 +670,55 @@ def load_options(options: Dict[Any, Any]):
     do_genetic_degree_cost_no_first_total = False
     thresholds_as_majority = False
     with_best_of_starting_population = False
+    diffusion_engine = "frontier"
+    batch_diffusion = False
+    incremental_diffusion = False
+    fitness_cache_size = 512
+    workers = 0
+    checkpoint_every = 0
+    resume = False
+    islands = 0
+    migration_every = 5
+    jobs = 1
+    seed = None
+    with_metrics = False
+    with_profile = False
 
     if options:
         do_genetic_degree = options.get("do_genetic_degree", False)
         do_genetic_degree_cost_no_first_total = options.get("do_genetic_degree_cost_no_first_total", False)
         thresholds_as_majority = options.get("thresholds_as_majority", False)
         with_best_of_starting_population = options.get("with_best_of_starting_population", False)
+        diffusion_engine = options.get("diffusion_engine", "frontier")
+        batch_diffusion = options.get("batch_diffusion", False)
+        incremental_diffusion = options.get("incremental_diffusion", False)
+        fitness_cache_size = options.get("fitness_cache_size", 512)
+        workers = options.get("workers", 0)
+        checkpoint_every = options.get("checkpoint_every", 0)
+        resume = options.get("resume", False)
+        islands = options.get("islands", 0)
+        migration_every = options.get("migration_every", 5)
+        jobs = options.get("jobs", 1)
+        seed = options.get("seed", None)
+        with_metrics = options.get("metrics", False)
+        with_profile = options.get("profile", False)
 
     return (
         do_genetic_degree,
         do_genetic_degree_cost_no_first_total,
         thresholds_as_majority,
         with_best_of_starting_population,
+        diffusion_engine,
+        batch_diffusion,
+        incremental_diffusion,
+        fitness_cache_size,
+        workers,
+        checkpoint_every,
+        resume,
+        islands,
+        migration_every,
+        jobs,
+        seed,
+        with_metrics,
+        with_profile,
     )
\ No newline at end of file
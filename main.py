@@ -1,15 +1,20 @@
-from experiment import run_experiment
+from experiment import run_experiments
 from argparse import ArgumentParser
+from utils import configure_logger
 import os
 
 
-def setup(exp_name="experiment"):
+def setup(exp_name="experiment", log_level="INFO"):
     # set for logging file
     os.environ["LOG_FILE_ENABLED"] = "True"
     os.environ["LOG_FILE_DIR"] = "logs"
     os.environ["LOG_FILE_PATH"] = exp_name
 
     os.environ["LOG_CONSOLE_ENABLED"] = "False"
+    os.environ["LOG_LEVEL"] = log_level
+
+    # the logger reads its configuration once, so read it again for this experiment
+    configure_logger()
 
 
 if __name__ == "__main__":
@@ -19,10 +24,26 @@ if __name__ == "__main__":
     parser.add_argument("-n", "--set_size", type=int, default=20, help="Size of seed set")
     parser.add_argument("-mt", "--majority_thresholds", action="store_true", help="Use majority thresholds")
     parser.add_argument("-bop", "--best_of_population", action="store_true", help="Use best of genetic degree/cost population as degree/cost seed set")
+    parser.add_argument("-de", "--diffusion_engine", type=str, default="frontier", help="Diffusion engine (standard, frontier, csr or reduced)")
+    parser.add_argument("-bd", "--batch_diffusion", action="store_true", help="Evaluate each genetic population in one batched diffusion")
+    parser.add_argument("-id", "--incremental_diffusion", action="store_true", help="Continue the cascade of each seed set from the cascade of the closest evaluated seed set")
+    parser.add_argument("-fcs", "--fitness_cache_size", type=int, default=512, help="Max number of cached seed set evaluations (0 to disable)")
+    parser.add_argument("-w", "--workers", type=int, default=0, help="Number of worker processes evaluating the genetic populations")
+    parser.add_argument("-ce", "--checkpoint_every", type=int, default=0, help="Save a checkpoint of each genetic simulation every given number of epochs (in checkpoints, 0 to disable)")
+    parser.add_argument("--resume", action="store_true", help="Resume the genetic simulations from their last checkpoints (needs the seed and options of the interrupted run)")
+    parser.add_argument("-i", "--islands", type=int, default=0, help="Number of populations of each genetic simulation evolving in their own processes (0 or 1 for a single population)")
+    parser.add_argument("-me", "--migration_every", type=int, default=5, help="Number of epochs between the migrations of the best seed sets of each island to the next one")
+    parser.add_argument("-ll", "--log_level", type=str, default="INFO", help="Log level (DEBUG logs every seed set of each epoch, INFO only the summaries)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of processes running the experiments and their simulations in parallel")
+    parser.add_argument("-m", "--metrics", action="store_true", help="Save the per-phase timings and counters of the simulations as JSON (in results)")
+    parser.add_argument("-p", "--profile", action="store_true", help="Profile each simulation job with cProfile (saved in results)")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="Random seed of the experiments (random if not given)")
     parser.add_argument("-e", "--epochs", type=int, default=50, help="Number of epochs")
     parser.add_argument("-r", "--runs", type=int, default=1, help="Number of experiments to run")
     parser.add_argument("-exp", "--experiment_name", type=str, default="Experiment", help="Experiment name")
     args = parser.parse_args()
+    if args.resume and args.seed is None:
+        parser.error("--resume needs the --seed of the interrupted run")
 
     graph_name = args.graph_name
     cost = args.cost
@@ -32,13 +53,40 @@ if __name__ == "__main__":
     exp_name = args.experiment_name
     thresholds_as_majority = args.majority_thresholds
     with_best_of_starting_population = args.best_of_population
+    diffusion_engine = args.diffusion_engine
+    batch_diffusion = args.batch_diffusion
+    incremental_diffusion = args.incremental_diffusion
+    fitness_cache_size = args.fitness_cache_size
+    workers = args.workers
+    checkpoint_every = args.checkpoint_every
+    resume = args.resume
+    islands = args.islands
+    migration_every = args.migration_every
+    log_level = args.log_level
+    jobs = args.jobs
+    seed = args.seed
+    with_metrics = args.metrics
+    with_profile = args.profile
 
     options = {
         "thresholds_as_majority": thresholds_as_majority,
         "with_best_of_starting_population": with_best_of_starting_population,
+        "diffusion_engine": diffusion_engine,
+        "batch_diffusion": batch_diffusion,
+        "incremental_diffusion": incremental_diffusion,
+        "fitness_cache_size": fitness_cache_size,
+        "workers": workers,
+        "checkpoint_every": checkpoint_every,
+        "resume": resume,
+        "islands": islands,
+        "migration_every": migration_every,
+        "jobs": jobs,
+        "seed": seed,
+        "metrics": with_metrics,
+        "profile": with_profile,
     }
 
-    for i in range(runs):
-        run_name = f"{exp_name} {i}"
-        setup(run_name)
-        run_experiment(run_name, epochs, graph_name, cost, n, options)
\ No newline at end of file
+    run_names = [f"{exp_name} {i}" for i in range(runs)]
+    # each run logs to its own file (and, with jobs > 1, each simulation of a run too)
+    setup(run_names[0], log_level)
+    run_experiments(run_names, epochs, graph_name, cost, n, options)
\ No newline at end of file
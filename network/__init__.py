@@ -1,4 +1,5 @@
 from .graph import (
+    GraphRegistry,
     graphs_by_name,
     path_graph,
     networkx_graph_by_name,
@@ -29,20 +30,79 @@ from .seed_set.base_set import (
 
 from .seed_set.graph_permutation_seed_set import (
     GraphPermutationSeedSet,
+    NodeIndex,
+    node_index,
+    NodeOrderIndex,
+    node_order_keys,
+    node_order_index,
+    seed_set_from_node_order_given_cost,
     seed_set_from_ordered_graph_given_cost,
+    csr_seed_set_from_ordered_graph_given_cost,
+    unique_seed_sets,
+    enough_reachable,
+    degree_order_max_duplicates,
     seed_set_from_degree_graph_given_cost,
     seed_sets_from_degree_graph_given_cost,
     seed_set_from_degreecost_graph_given_cost,
+    seed_set_from_degreecost_weights,
+    degreecost_ratios,
+    seed_sets_reachable_from_degreecost,
     seed_sets_from_degreecost_graph_given_cost,
     seed_sets_from_degree_ordered_graph_given_cost,
     seed_set_from_graph_permutation_given_cost,
+    csr_seed_set_from_graph_permutation_given_cost,
     seed_sets_from_graph_permutation_given_cost,
     permutation_position_combine_seed_sets,
+    permutation_position_combine_candidates,
     position_combine_seed_sets,
 )
 
 
+from .edgelist import (
+    read_edgelist_ids,
+    read_edgelist_arrays,
+    read_edgelist_graph,
+    read_edgelist_digraph,
+)
+
+
+from .csr import (
+    CSRGraph,
+    csr_graph_from_networkx,
+    csr_graph_by_name,
+    csr_graph_from_edges,
+    csr_graph_from_edgelist,
+    save_csr_graph,
+    load_memmap_csr_graph,
+    csr_threshold_influence_diffusion,
+    csr_batch_threshold_influence_diffusion,
+    budget_fill,
+)
+
+
 from .diffusion import (
     threshold_influence_diffusion,
+    frontier_threshold_influence_diffusion,
+    csr_backed_threshold_influence_diffusion,
+    batch_threshold_influence_diffusion,
     influence_nodes,
-)
\ No newline at end of file
+    diffusion_engines_by_name,
+    diffusion_engine_by_name,
+)
+
+
+from .incremental import (
+    CascadeState,
+    cascade_state,
+    extend_cascade_state,
+    shrink_cascade_state,
+    incremental_cascade_state,
+    cascade_gain,
+)
+
+
+from .reduction import (
+    GraphReduction,
+    reduce_graph,
+    reduced_threshold_influence_diffusion,
+)
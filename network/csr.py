@@ -0,0 +1,457 @@
+import os
+import numpy as np
+from weakref import WeakKeyDictionary
+from .graph import networkx_graph_by_name
+from .edgelist import EDGELIST_CHUNK_SIZE, read_edgelist_arrays
+
+
+class CSRGraph:
+    """
+    Compact graph representation used by the array based cascade engines.
+
+    Nodes are relabelled as 0, ..., V - 1 following the order of the original graph
+    (nodes[ix] is the original label of node ix), and the neighbors of node ix are
+    indices[indptr[ix]:indptr[ix + 1]], i.e. the nodes whose influence ix counts.
+    """
+    def __init__(
+        self,
+        nodes,
+        indptr,
+        indices,
+        degree=None,
+        threshold=None,
+        cost=None,
+        directed=False,
+        directory=None,
+    ):
+        self.nodes = nodes
+        self.indptr = indptr
+        self.indices = indices
+        self.degree = degree if degree is not None else np.diff(indptr).astype(np.int32)
+        self.threshold = threshold
+        self.cost = cost
+        self.directed = directed
+        # directory of the arrays, if memory-mapped from disk
+        self.directory = directory
+        self._node_ixs = None
+        self._reverse = None
+
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+
+    def __str__(self):
+        return f"CSRGraph(nodes={self.number_of_nodes()}, edges={self.number_of_edges()})"
+
+
+    def number_of_nodes(self):
+        return len(self)
+
+
+    def number_of_edges(self):
+        return len(self.indices) if self.directed else len(self.indices) // 2
+
+
+    @property
+    def node_ixs(self):
+        # the label -> index table is only needed when mapping seed sets
+        if self._node_ixs is None:
+            nodes = self.nodes.tolist() if isinstance(self.nodes, np.ndarray) else self.nodes
+            self._node_ixs = {node: ix for ix, node in enumerate(nodes)}
+        return self._node_ixs
+
+
+    def to_ixs(self, labels):
+        node_ixs = self.node_ixs
+        return np.fromiter((node_ixs[node] for node in labels), dtype=np.int32)
+
+
+    def to_labels(self, ixs):
+        nodes = self.nodes
+        if isinstance(nodes, np.ndarray):
+            return nodes[np.asarray(ixs, dtype=np.int64)].tolist()
+        return [nodes[ix] for ix in np.asarray(ixs).tolist()]
+
+
+    def reverse(self):
+        """
+        Return (indptr, indices) of the nodes to notify when a node is influenced,
+        which is the transpose of the adjacency for directed graphs.
+        """
+        if not self.directed:
+            return self.indptr, self.indices
+
+        if self._reverse is None:
+            sources = np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.indptr))
+            order = np.argsort(self.indices, kind="stable")
+            indptr = np.zeros(len(self) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=len(self)), out=indptr[1:])
+            self._reverse = (indptr, sources[order])
+        return self._reverse
+
+
+    def with_data(self, threshold=None, cost=None):
+        """
+        Return a CSRGraph sharing this structure with other threshold and cost arrays.
+        """
+        csr_graph = CSRGraph(
+            nodes=self.nodes,
+            indptr=self.indptr,
+            indices=self.indices,
+            degree=self.degree,
+            threshold=threshold,
+            cost=cost,
+            directed=self.directed,
+            directory=self.directory,
+        )
+        csr_graph._node_ixs = self._node_ixs
+        csr_graph._reverse = self._reverse
+        return csr_graph
+
+
+# the structure of a networkx graph is converted once and shared by all its CSRGraph
+_csr_structures = WeakKeyDictionary()
+# last CSRGraph built for a networkx graph, reused while thresholds and costs are the same
+_csr_graphs = WeakKeyDictionary()
+
+
+def csr_structure_from_networkx(graph):
+    if graph in _csr_structures:
+        return _csr_structures[graph]
+
+    nodes = list(graph.nodes)
+    node_ixs = {node: ix for ix, node in enumerate(nodes)}
+
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+    indices = []
+    for ix, node in enumerate(nodes):
+        indices.extend(node_ixs[neighbor] for neighbor in graph.neighbors(node))
+        indptr[ix + 1] = len(indices)
+
+    degree = np.fromiter((graph.degree(node) for node in nodes), dtype=np.int32, count=len(nodes))
+
+    csr_graph = CSRGraph(
+        nodes=nodes,
+        indptr=indptr,
+        indices=np.array(indices, dtype=np.int32),
+        degree=degree,
+        directed=graph.is_directed(),
+    )
+    csr_graph._node_ixs = node_ixs
+    _csr_structures[graph] = csr_graph
+    return csr_graph
+
+
+def nodes_data_to_array(nodes, nodes_data, dtype=np.int32):
+    if nodes_data is None:
+        return None
+    if isinstance(nodes_data, np.ndarray):
+        return nodes_data
+    return np.fromiter((nodes_data[node] for node in nodes), dtype=dtype, count=len(nodes))
+
+
+def csr_graph_from_networkx(graph, nodes_threshold=None, nodes_cost=None):
+    """
+    Build the CSRGraph of a networkx graph, converting the threshold and cost
+    dictionaries into arrays indexed as the relabelled nodes.
+
+    Args:
+        graph (nx.Graph): Graph to convert.
+        nodes_threshold (dict): Threshold of each node.
+        nodes_cost (dict): Cost of each node.
+    """
+    cached = _csr_graphs.get(graph)
+    if cached and cached[0] is nodes_threshold and cached[1] is nodes_cost:
+        return cached[2]
+
+    structure = csr_structure_from_networkx(graph)
+    csr_graph = structure.with_data(
+        threshold=nodes_data_to_array(structure.nodes, nodes_threshold),
+        cost=nodes_data_to_array(structure.nodes, nodes_cost),
+    )
+    _csr_graphs[graph] = (nodes_threshold, nodes_cost, csr_graph)
+    return csr_graph
+
+
+def csr_graph_by_name(name, nodes_threshold=None, nodes_cost=None):
+    return csr_graph_from_networkx(networkx_graph_by_name(name), nodes_threshold, nodes_cost)
+
+
+def csr_graph_from_edges(sources, targets, nodes=None, num_nodes=None, directed=False):
+    """
+    Build a CSRGraph straight from edge arrays of node indices, without networkx.
+    As in networkx, repeated edges are kept once and, for undirected graphs, each
+    edge is stored in the rows of both its nodes.
+
+    Args:
+        sources (array): Index of the first node of each edge.
+        targets (array): Index of the second node of each edge.
+        nodes (list): Label of each node index, defaults to the indices themselves.
+        num_nodes (int): Number of nodes, defaults to len(nodes) or the max index + 1.
+        directed (bool): If True, edges go from sources to targets.
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    if num_nodes is None:
+        num_nodes = len(nodes) if nodes is not None else int(max(sources.max(initial=-1), targets.max(initial=-1))) + 1
+    if nodes is None:
+        nodes = np.arange(num_nodes)
+
+    if not directed:
+        sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+
+    # sort edges by source (then target) and drop the repeated ones
+    edges = np.unique(sources * num_nodes + targets)
+    sources, targets = edges // num_nodes, edges % num_nodes
+
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+
+    if directed:
+        degree = np.bincount(sources, minlength=num_nodes) + np.bincount(targets, minlength=num_nodes)
+    else:
+        # as in networkx, a self-loop counts twice in the degree of its node
+        degree = np.diff(indptr) + np.bincount(sources[sources == targets], minlength=num_nodes)
+
+    return CSRGraph(
+        nodes=nodes,
+        indptr=indptr,
+        indices=targets.astype(np.int32),
+        degree=degree.astype(np.int32),
+        directed=directed,
+    )
+
+
+def csr_graph_from_edgelist(path, directed=False, chunk_size=EDGELIST_CHUNK_SIZE):
+    """
+    Build the CSRGraph of an edge list file with the streaming parser, whose node
+    labels are the (integer) ids of the file.
+    """
+    sources, targets, node_ids = read_edgelist_arrays(path, chunk_size)
+    return csr_graph_from_edges(sources, targets, nodes=node_ids, directed=directed)
+
+
+CSR_GRAPH_ARRAYS = ("nodes", "indptr", "indices", "degree", "threshold", "cost")
+
+
+def save_csr_graph(csr_graph, directory):
+    """
+    Save the arrays of a CSRGraph as .npy files in the given directory, so that
+    load_memmap_csr_graph can memory-map them.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    arrays = {name: getattr(csr_graph, name) for name in CSR_GRAPH_ARRAYS}
+    arrays["nodes"] = np.asarray(csr_graph.nodes)
+    arrays["directed"] = np.array(csr_graph.directed)
+    if csr_graph.directed:
+        arrays["reverse_indptr"], arrays["reverse_indices"] = csr_graph.reverse()
+
+    for name, array in arrays.items():
+        if array is not None:
+            np.save(os.path.join(directory, f"{name}.npy"), np.asarray(array))
+
+
+def load_memmap_csr_graph(directory):
+    """
+    Load a CSRGraph saved with save_csr_graph, memory-mapping its arrays (read only).
+
+    The arrays are never copied in memory, so graphs larger than the memory budget
+    can be used and the processes loading the same directory share the OS page cache.
+    """
+    def load(name):
+        path = os.path.join(directory, f"{name}.npy")
+        return np.load(path, mmap_mode="r") if os.path.exists(path) else None
+
+    csr_graph = CSRGraph(
+        nodes=load("nodes"),
+        indptr=load("indptr"),
+        indices=load("indices"),
+        degree=load("degree"),
+        threshold=load("threshold"),
+        cost=load("cost"),
+        directed=bool(load("directed")),
+        directory=directory,
+    )
+    if csr_graph.directed:
+        csr_graph._reverse = (load("reverse_indptr"), load("reverse_indices"))
+
+    return csr_graph
+
+
+def gather_neighbors(indptr, indices, ixs):
+    # concatenation of indices[indptr[ix]:indptr[ix + 1]] for each ix, without a python loop
+    starts = indptr[ixs]
+    lengths = indptr[ixs + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return indices[:0]
+
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[offsets + np.arange(total)]
+
+
+def csr_threshold_influence_diffusion(
+    csr_graph,
+    seed_set,
+    nodes_threshold=None,
+    nodes_influenced=None,
+    with_print=False,
+):
+    """
+    Frontier-driven threshold diffusion over a CSRGraph.
+
+    Args:
+        csr_graph (CSRGraph): Graph to influence.
+        seed_set (array): Indices of the seed set nodes.
+        nodes_threshold (array): Threshold of each node, defaults to csr_graph.threshold.
+        nodes_influenced (array): Optional boolean array marked with the influenced nodes.
+
+    Returns the sorted indices of the influenced nodes and the number of steps.
+    """
+    threshold = csr_graph.threshold if nodes_threshold is None else nodes_threshold
+    indptr, indices = csr_graph.reverse()
+
+    influenced = np.zeros(len(csr_graph), dtype=bool)
+    influenced_neighbors = np.zeros(len(csr_graph), dtype=np.int32)
+    seed_set = np.asarray(seed_set, dtype=np.int64)
+    influenced[seed_set] = True
+
+    # nodes with a non-positive threshold are influenced without any neighbor
+    zero_threshold = np.flatnonzero(~influenced & (threshold <= 0))
+    frontier = np.unique(seed_set)
+    t = 0
+
+    while True:
+        # the nodes influenced in the previous step notify their neighbors
+        notified = gather_neighbors(indptr, indices, frontier)
+        np.add.at(influenced_neighbors, notified, 1)
+
+        candidates = np.unique(notified)
+        candidates = candidates[~influenced[candidates]]
+        frontier = candidates[influenced_neighbors[candidates] >= threshold[candidates]]
+
+        if t == 0 and len(zero_threshold):
+            frontier = np.union1d(frontier, zero_threshold)
+
+        if not len(frontier):
+            break
+
+        influenced[frontier] = True
+        t += 1
+
+        if with_print:
+            print(f"At step {t}, influence set is {csr_graph.to_labels(np.flatnonzero(influenced))}")
+
+    if nodes_influenced is not None:
+        nodes_influenced |= influenced
+
+    return np.flatnonzero(influenced), t
+
+
+def csr_batch_threshold_influence_diffusion(
+    csr_graph,
+    seed_sets,
+    nodes_threshold=None,
+):
+    """
+    Run the threshold diffusion of many seed sets in one pass.
+
+    The state of all the cascades is kept in node x seed set arrays (flattened as
+    node * n + set), so every step handles the frontiers of all the seed sets together.
+
+    Args:
+        csr_graph (CSRGraph): Graph to influence.
+        seed_sets (list): Indices of the nodes of each seed set.
+        nodes_threshold (array): Threshold of each node, defaults to csr_graph.threshold.
+
+    Returns the sorted indices of the influenced nodes, the score and the number
+    of steps of each seed set.
+    """
+    threshold = csr_graph.threshold if nodes_threshold is None else nodes_threshold
+    indptr, indices = csr_graph.reverse()
+    num_nodes = len(csr_graph)
+    n = len(seed_sets)
+
+    influenced = np.zeros(num_nodes * n, dtype=bool)
+    influenced_neighbors = np.zeros(num_nodes * n, dtype=np.int32)
+    steps = np.zeros(n, dtype=np.int64)
+
+    seed_pairs = [
+        np.asarray(seed_set, dtype=np.int64) * n + col
+        for col, seed_set in enumerate(seed_sets)
+    ]
+    frontier = np.unique(np.concatenate(seed_pairs)) if seed_pairs else np.zeros(0, dtype=np.int64)
+    influenced[frontier] = True
+
+    # nodes with a non-positive threshold are influenced without any neighbor
+    zero_threshold = np.flatnonzero(threshold <= 0)
+    zero_threshold = (zero_threshold[:, None] * n + np.arange(n)).ravel()
+    zero_threshold = zero_threshold[~influenced[zero_threshold]]
+    first_step = True
+
+    while True:
+        # the nodes influenced in the previous step notify their neighbors in the same seed set
+        frontier_nodes = frontier // n
+        lengths = indptr[frontier_nodes + 1] - indptr[frontier_nodes]
+        notified = gather_neighbors(indptr, indices, frontier_nodes).astype(np.int64) * n
+        notified += np.repeat(frontier % n, lengths)
+        np.add.at(influenced_neighbors, notified, 1)
+
+        candidates = np.unique(notified)
+        candidates = candidates[~influenced[candidates]]
+        frontier = candidates[influenced_neighbors[candidates] >= threshold[candidates // n]]
+
+        if first_step and len(zero_threshold):
+            frontier = np.union1d(frontier, zero_threshold)
+        first_step = False
+
+        if not len(frontier):
+            break
+
+        influenced[frontier] = True
+        steps[np.unique(frontier % n)] += 1
+
+    influenced = influenced.reshape(num_nodes, n)
+    influenced_sets = [np.flatnonzero(influenced[:, col]) for col in range(n)]
+    scores = influenced.sum(axis=0)
+
+    return influenced_sets, scores.tolist(), steps.tolist()
+
+
+def budget_fill(ordered_costs, cost=0):
+    """
+    Vectorized version of the budget walk of the ordered seed set builders:
+    nodes are taken in order whenever their cost still fits the budget, until
+    the budget is spent.
+
+    Returns the positions of the taken nodes and how many positions were scanned.
+    """
+    ordered_costs = np.asarray(ordered_costs, dtype=np.int64)
+    candidates = np.arange(len(ordered_costs))
+    budget = cost
+    taken = []
+    ix = len(ordered_costs) if budget > 0 else 0
+
+    while budget > 0 and len(candidates):
+        cumulative_costs = np.cumsum(ordered_costs[candidates])
+        # the walk stops as soon as the budget is reached, otherwise it takes
+        # the longest prefix that fits the remaining budget
+        fit = min(
+            np.searchsorted(cumulative_costs, budget, side="right"),
+            np.searchsorted(cumulative_costs, budget, side="left") + 1,
+        )
+        taken.append(candidates[:fit])
+        if fit:
+            budget -= cumulative_costs[fit - 1]
+            if budget <= 0:
+                ix = int(candidates[fit - 1]) + 1
+                break
+
+        # the node after the prefix does not fit, so only cheaper nodes are left to consider
+        rest = candidates[fit + 1:]
+        candidates = rest[ordered_costs[rest] <= budget]
+
+    taken = np.concatenate(taken) if taken else candidates[:0]
+    return taken, ix
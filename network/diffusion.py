@@ -1,3 +1,12 @@
+from .csr import (
+    CSRGraph,
+    csr_graph_from_networkx,
+    csr_threshold_influence_diffusion,
+    csr_batch_threshold_influence_diffusion,
+)
+from .reduction import reduced_threshold_influence_diffusion
+
+
 def threshold_influence_diffusion(
     graph,
     seed_set,
@@ -5,6 +14,15 @@ def threshold_influence_diffusion(
     nodes_threshold,
     with_print=False,
 ):
+    if isinstance(graph, CSRGraph):
+        return csr_threshold_influence_diffusion(
+            csr_graph=graph,
+            seed_set=seed_set,
+            nodes_threshold=nodes_threshold,
+            nodes_influenced=nodes_influenced,
+            with_print=with_print,
+        )
+
     influence_set = set(seed_set)
     t = 0
 
@@ -37,7 +55,133 @@ def threshold_influence_diffusion(
     return list(influence_set), t
 
 
+def frontier_threshold_influence_diffusion(
+    graph,
+    seed_set,
+    nodes_influenced,
+    nodes_threshold,
+    with_print=False,
+):
+    """
+    Event-based version of threshold_influence_diffusion.
+
+    Only the nodes that can be reached from the nodes influenced in the previous
+    step are looked at, and each of them keeps a counter of its influenced
+    neighbors, so a cascade costs O(V + E) instead of O(T * (V + E)).
+    The final influence set and the number of steps t are the same.
+    """
+    influence_set = set(seed_set)
+    t = 0
+
+    # a node counts the neighbors it points to, so a newly influenced node
+    # has to notify the nodes pointing to it (the predecessors in a digraph)
+    notified_neighbors = graph.predecessors if graph.is_directed() else graph.neighbors
+
+    # nodes with a non-positive threshold are influenced without any neighbor
+    frontier = [
+        node for node in graph.nodes
+        if node not in influence_set and nodes_threshold[node] <= 0
+    ]
+    influenced_neighbors = {}
+
+    # the seed set acts as the frontier of step 0
+    for node in influence_set:
+        for neighbor in notified_neighbors(node):
+            if neighbor not in influence_set:
+                influenced_neighbors[neighbor] = influenced_neighbors.get(neighbor, 0) + 1
+                if influenced_neighbors[neighbor] == nodes_threshold[neighbor]:
+                    frontier.append(neighbor)
+
+    while frontier:
+        # mark nodes as influenced all together, as in a synchronous step
+        for node in frontier:
+            nodes_influenced[node] = True
+            influence_set.add(node)
+
+        t += 1
+
+        if with_print:
+            print(f"At step {t}, influence set is {influence_set}")
+
+        # only the neighbors of the last influenced nodes can change state
+        next_frontier = []
+        for node in frontier:
+            for neighbor in notified_neighbors(node):
+                if neighbor not in influence_set:
+                    influenced_neighbors[neighbor] = influenced_neighbors.get(neighbor, 0) + 1
+                    if influenced_neighbors[neighbor] == nodes_threshold[neighbor]:
+                        next_frontier.append(neighbor)
+
+        frontier = next_frontier
+
+    return list(influence_set), t
+
+
+def csr_backed_threshold_influence_diffusion(
+    graph,
+    seed_set,
+    nodes_influenced,
+    nodes_threshold,
+    with_print=False,
+):
+    """
+    Run the array based diffusion on the CSRGraph of a networkx graph, which is
+    built once per (graph, thresholds), and map the result back to node labels.
+    """
+    csr_graph = csr_graph_from_networkx(graph, nodes_threshold)
+
+    influenced_ixs, t = csr_threshold_influence_diffusion(
+        csr_graph=csr_graph,
+        seed_set=csr_graph.to_ixs(seed_set),
+        with_print=with_print,
+    )
+
+    influence_set = csr_graph.to_labels(influenced_ixs)
+    for node in influence_set:
+        nodes_influenced[node] = True
+
+    return influence_set, t
+
+
+def batch_threshold_influence_diffusion(graph, seed_sets, nodes_threshold=None):
+    """
+    Influence the graph starting from each of the given seed sets, running all
+    the cascades in one pass over the CSRGraph of the graph.
+
+    Args:
+        graph (nx.Graph or CSRGraph): Graph to influence.
+        seed_sets (list): Seed sets, as lists of nodes (indices for a CSRGraph).
+        nodes_threshold (dict): Threshold of each node.
+
+    Returns the influenced set, the score and the number of steps of each seed set.
+    """
+    if isinstance(graph, CSRGraph):
+        return csr_batch_threshold_influence_diffusion(graph, seed_sets, nodes_threshold)
+
+    csr_graph = csr_graph_from_networkx(graph, nodes_threshold)
+    influenced_sets, scores, steps = csr_batch_threshold_influence_diffusion(
+        csr_graph=csr_graph,
+        seed_sets=[csr_graph.to_ixs(seed_set) for seed_set in seed_sets],
+    )
+
+    return [csr_graph.to_labels(ixs) for ixs in influenced_sets], scores, steps
+
+
 def influence_nodes(seed_set, nodes_influenced):
     for node in seed_set:
         nodes_influenced[node] = True
-    return nodes_influenced
\ No newline at end of file
+    return nodes_influenced
+
+
+diffusion_engines_by_name = {
+    "standard": threshold_influence_diffusion,
+    "frontier": frontier_threshold_influence_diffusion,
+    "csr": csr_backed_threshold_influence_diffusion,
+    "reduced": reduced_threshold_influence_diffusion,
+}
+
+
+def diffusion_engine_by_name(name):
+    if name not in diffusion_engines_by_name:
+        raise ValueError(f"Diffusion engine {name} not found.")
+    return diffusion_engines_by_name[name]
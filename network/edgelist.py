@@ -0,0 +1,95 @@
+import re
+import gzip
+import numpy as np
+import networkx as nx
+
+EDGELIST_CHUNK_SIZE = 1 << 24
+COMMENT_LINE_PATTERN = re.compile(rb"^[ \t]*#[^\n]*\n?", re.MULTILINE)
+
+
+def open_edgelist(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def read_edgelist_ids(path, chunk_size=EDGELIST_CHUNK_SIZE):
+    """
+    Read the node ids of an edge list file (two integer ids per line, lines starting
+    with # are comments, as in the SNAP files) in chunks of chunk_size bytes, parsing
+    each chunk at once into an array.
+
+    Returns the array of the ids as they appear in the file (u0, v0, u1, v1, ...).
+    """
+    chunks = []
+    remainder = b""
+
+    with open_edgelist(path) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+
+            # only parse whole lines, the last partial line goes with the next chunk
+            chunk = remainder + chunk
+            last_newline = chunk.rfind(b"\n")
+            if last_newline == -1:
+                remainder = chunk
+                continue
+            chunk, remainder = chunk[:last_newline + 1], chunk[last_newline + 1:]
+
+            chunks.append(parse_edgelist_chunk(chunk))
+
+    if remainder:
+        chunks.append(parse_edgelist_chunk(remainder + b"\n"))
+
+    ids = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+    if len(ids) % 2:
+        raise ValueError(f"The edge list {path} has an odd number of node ids")
+
+    return ids
+
+
+def parse_edgelist_chunk(chunk):
+    if b"#" in chunk:
+        chunk = COMMENT_LINE_PATTERN.sub(b"", chunk)
+    return np.fromstring(chunk.decode("ascii"), dtype=np.int64, sep=" ")
+
+
+def read_edgelist_arrays(path, chunk_size=EDGELIST_CHUNK_SIZE):
+    """
+    Stream an edge list file into edge arrays over dense node labels.
+
+    Node ids are relabelled as 0, ..., V - 1 in order of first appearance, which is
+    the order of the nodes of the graph read by nx.read_edgelist.
+
+    Returns the int32 arrays of the sources and targets of the edges, and the original
+    id of each dense label.
+    """
+    ids = read_edgelist_ids(path, chunk_size)
+
+    unique_ids, first_ixs, labels = np.unique(ids, return_index=True, return_inverse=True)
+    order = np.argsort(first_ixs, kind="stable")
+    ranks = np.empty(len(order), dtype=np.int32)
+    ranks[order] = np.arange(len(order), dtype=np.int32)
+    labels = ranks[labels.ravel()]
+
+    return labels[0::2], labels[1::2], unique_ids[order]
+
+
+def read_edgelist_graph(path, directed=False, chunk_size=EDGELIST_CHUNK_SIZE):
+    """
+    Read an edge list file with the streaming parser into a networkx graph,
+    whose nodes are the (integer) ids of the file.
+    """
+    sources, targets, node_ids = read_edgelist_arrays(path, chunk_size)
+
+    graph = nx.DiGraph() if directed else nx.Graph()
+    graph.add_nodes_from(node_ids.tolist())
+    graph.add_edges_from(zip(node_ids[sources].tolist(), node_ids[targets].tolist()))
+
+    return graph
+
+
+def read_edgelist_digraph(path, chunk_size=EDGELIST_CHUNK_SIZE):
+    return read_edgelist_graph(path, directed=True, chunk_size=chunk_size)
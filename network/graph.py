@@ -1,6 +1,9 @@
 import networkx as nx
+from collections.abc import Mapping
 from matplotlib import pyplot as plt
 from random import randint
+from .graph_cache import cached_graph
+from .edgelist import read_edgelist_graph, read_edgelist_digraph
 from utils import (
     BLUE,
     RESET,
@@ -10,6 +13,70 @@ from utils import (
 )
 
 
+class GraphRegistry(Mapping):
+    """
+    Registry of the graphs by name: each graph is built by its loader only on first
+    access and then memoized until evicted, so that importing the package does not
+    build (or read from disk) graphs that are never used.
+    """
+
+
+    def __init__(self, loaders=None):
+        self.loaders = dict(loaders) if loaders else {}
+        self.graphs = {}
+
+
+    def __getitem__(self, name):
+        if name not in self.loaders:
+            raise KeyError(name)
+        if name not in self.graphs:
+            self.graphs[name] = self.loaders[name]()
+        return self.graphs[name]
+
+
+    def __contains__(self, name):
+        # checking a name must not load its graph
+        return name in self.loaders
+
+
+    def __iter__(self):
+        return iter(self.loaders)
+
+
+    def __len__(self):
+        return len(self.loaders)
+
+
+    def register(self, name, loader, replace=False):
+        """
+        Register the loader of a graph.
+
+        Args:
+            name (str): Name of the graph.
+            loader (callable): Function without arguments building the graph.
+            replace (bool): If True, replace the loader of an already registered graph.
+        """
+        if name in self.loaders and not replace:
+            raise ValueError(f"Graph {name} is already registered.")
+        self.loaders[name] = loader
+        self.graphs.pop(name, None)
+
+
+    def evict(self, name=None):
+        """
+        Drop the loaded graph with the given name (all of them if no name is given),
+        which will be built again on next access.
+        """
+        if name is None:
+            self.graphs.clear()
+        else:
+            self.graphs.pop(name, None)
+
+
+    def is_loaded(self, name):
+        return name in self.graphs
+
+
 def path_graph(n=5):
     graph = nx.Graph()
     for i in range(1, n):
@@ -24,7 +91,14 @@ def networkx_graph_by_name(name):
 
 
 def print_all_graphs_statistics():
-    for name, graph in graphs_by_name.items():
+    for name in graphs_by_name:
+        try:
+            graph = graphs_by_name[name]
+        except FileNotFoundError as e:
+            log(text=f"Skipping {name} statistics because of \"{e}\"")
+            log()
+            continue
+
         num_nodes = graph.number_of_nodes()
         num_edges = graph.number_of_edges()
         graph_density = nx.density(graph)
@@ -142,39 +216,32 @@ def get_max_degree(graph):
 
 def email_eu_core_graph():
     path = join_with_parent_dir("data", "email-eu-core.txt")
-    return nx.read_edgelist(path)
+    return cached_graph(path, read_edgelist_graph)
 
 
 def email_eu_core_departments_graph():
     path = join_with_parent_dir("data", "email-eu-core-departments.txt")
-    return nx.read_edgelist(path)
+    return cached_graph(path, read_edgelist_graph)
 
 
 def email_enron_graph():
     path = join_with_parent_dir("data", "email-enron.txt")
-    return nx.read_edgelist(path)
+    return cached_graph(path, read_edgelist_graph)
 
 
 def cit_hepth_graph():
     path = join_with_parent_dir("data", "cit-hepth.txt")
-    G = nx.DiGraph()
-    with open(path, "r") as f:
-        for line in f:
-            if line.startswith("#"):
-                continue
-            node1, node2 = map(int, line.split())
-            G.add_edge(node1, node2)
-    return G
-
-
-graphs_by_name = {
-    "erdos_renyi_graph": nx.erdos_renyi_graph(1000, 0.6),
-    "karate_club_graph": nx.karate_club_graph(),
-    "davis_southern_women_graph": nx.davis_southern_women_graph(),
-    "florentine_families_graph": nx.florentine_families_graph(),
-    "les_miserables_graph": nx.les_miserables_graph(),
-    "email_eu_core_graph": email_eu_core_graph(),
-    "email_eu_core_departments_graph": email_eu_core_departments_graph(),
-    "cit_hepth_graph": cit_hepth_graph(),
-    "email_enron_graph": email_enron_graph(),
-}
+    return cached_graph(path, read_edgelist_digraph)
+
+
+graphs_by_name = GraphRegistry({
+    "erdos_renyi_graph": lambda: nx.erdos_renyi_graph(1000, 0.6),
+    "karate_club_graph": nx.karate_club_graph,
+    "davis_southern_women_graph": nx.davis_southern_women_graph,
+    "florentine_families_graph": nx.florentine_families_graph,
+    "les_miserables_graph": nx.les_miserables_graph,
+    "email_eu_core_graph": email_eu_core_graph,
+    "email_eu_core_departments_graph": email_eu_core_departments_graph,
+    "cit_hepth_graph": cit_hepth_graph,
+    "email_enron_graph": email_enron_graph,
+})
@@ -0,0 +1,145 @@
+import os
+import hashlib
+import tempfile
+import numpy as np
+import networkx as nx
+from utils import log, join_with_parent_dir
+
+GRAPH_CACHE_DIR = join_with_parent_dir("data", "cache")
+# bumped whenever the way graphs are read changes (e.g., the type of the node ids)
+GRAPH_CACHE_VERSION = 2
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def graph_cache_path(path, cache_dir=GRAPH_CACHE_DIR):
+    return os.path.join(cache_dir, f"{os.path.basename(path)}.npz")
+
+
+def save_graph_cache(graph, path, cache_path, source_sha256=None):
+    """
+    Save the graph read from path as a compact binary file: the node-id table and
+    the CSR adjacency (indptr/indices over the node positions), together with the
+    mtime, size and hash of the source file used to invalidate the cache.
+    """
+    nodes = list(graph.nodes)
+    node_ixs = {node: ix for ix, node in enumerate(nodes)}
+
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+    indices = []
+    for ix, node in enumerate(nodes):
+        indices.extend(node_ixs[neighbor] for neighbor in graph.neighbors(node))
+        indptr[ix + 1] = len(indices)
+
+    source_stat = os.stat(path)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+    # write to a temporary file first, so that a killed process never leaves a broken cache
+    # (with a unique name, as processes reading the same graph may write the cache at once)
+    tmp_cache = tempfile.NamedTemporaryFile(dir=os.path.dirname(cache_path), prefix=f"{os.path.basename(cache_path)}.", suffix=".tmp", delete=False)
+    try:
+        with tmp_cache as f:
+            np.savez(
+                f,
+                nodes=np.array(nodes),
+                indptr=indptr,
+                indices=np.array(indices, dtype=np.int32),
+                directed=np.array(graph.is_directed()),
+                version=np.array(GRAPH_CACHE_VERSION),
+                source_mtime=np.array(source_stat.st_mtime_ns),
+                source_size=np.array(source_stat.st_size),
+                source_sha256=np.array(source_sha256 or file_sha256(path)),
+            )
+        os.replace(tmp_cache.name, cache_path)
+    finally:
+        if os.path.exists(tmp_cache.name):
+            os.remove(tmp_cache.name)
+
+
+def load_graph_cache(cache_path):
+    with np.load(cache_path) as cache:
+        nodes = cache["nodes"].tolist()
+        indptr = cache["indptr"]
+        indices = cache["indices"]
+        directed = bool(cache["directed"])
+
+    graph = nx.DiGraph() if directed else nx.Graph()
+    graph.add_nodes_from(nodes)
+
+    sources = np.repeat(np.arange(len(nodes)), np.diff(indptr))
+    if not directed:
+        # each undirected edge is stored in the rows of both its nodes
+        keep = sources <= indices
+        sources, indices = sources[keep], indices[keep]
+    graph.add_edges_from((nodes[u], nodes[v]) for u, v in zip(sources.tolist(), indices.tolist()))
+
+    return graph
+
+
+def is_graph_cache_valid(path, cache_path):
+    """
+    The cache is valid if it was written by the current GRAPH_CACHE_VERSION and the
+    source file has the same mtime and size as when the cache was written, or, when
+    only the mtime changed, the same content hash.
+
+    Returns whether the cache is valid, whether its stored mtime is stale and the
+    hash of the source file (if known).
+    """
+    if not os.path.exists(cache_path):
+        return False, False, None
+
+    source_stat = os.stat(path)
+    with np.load(cache_path) as cache:
+        if "version" not in cache or int(cache["version"]) != GRAPH_CACHE_VERSION:
+            return False, False, None
+
+        source_mtime = int(cache["source_mtime"])
+        source_size = int(cache["source_size"])
+        source_sha256 = str(cache["source_sha256"])
+
+    if source_size != source_stat.st_size:
+        return False, False, None
+    if source_mtime == source_stat.st_mtime_ns:
+        return True, False, source_sha256
+
+    current_sha256 = file_sha256(path)
+    return current_sha256 == source_sha256, True, current_sha256
+
+
+def cached_graph(path, read_graph, cache_dir=GRAPH_CACHE_DIR):
+    """
+    Load the graph stored at path from its binary cache, reading it with read_graph
+    (and writing the cache) only when the cache is missing or the source changed.
+
+    Args:
+        path (str): Path of the source file (e.g., a SNAP edge list).
+        read_graph (callable): Function reading the graph from the source file.
+        cache_dir (str): Directory of the cache files.
+    """
+    cache_path = graph_cache_path(path, cache_dir)
+
+    graph = None
+    try:
+        is_valid, is_mtime_stale, source_sha256 = is_graph_cache_valid(path, cache_path)
+        if is_valid:
+            graph = load_graph_cache(cache_path)
+    except Exception as e:
+        # e.g., a truncated cache file (zipfile.BadZipFile), read again from the source
+        log(text=f"Ignoring graph cache {cache_path} because of \"{e}\"")
+        graph, is_mtime_stale, source_sha256 = None, False, None
+
+    if graph is not None:
+        if is_mtime_stale:
+            # same content with a new mtime: store the new one to skip hashing next time
+            save_graph_cache(graph, path, cache_path, source_sha256)
+        return graph
+
+    graph = read_graph(path)
+    save_graph_cache(graph, path, cache_path, source_sha256)
+    return graph
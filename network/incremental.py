@@ -0,0 +1,279 @@
+class CascadeState:
+    """
+    State of a finished cascade: the activation round of each influenced node
+    (0 for the nodes of the seed set), from which a cascade starting from a
+    similar seed set can be continued instead of restarted.
+
+    A node v that is not in the seed set is influenced at round
+    r(v) = (threshold(v)-th smallest round of its neighbors) + 1,
+    which is the step at which the synchronous diffusion influences it.
+
+    counts holds the number of neighbors of each node influenced before its round
+    (all the influenced neighbors for the nodes that are not influenced), and below
+    the number of those influenced before the last round, so a node keeps its round
+    as long as below < threshold <= counts.
+    """
+
+
+    def __init__(self, seed_set, rounds, counts, below, edges=0):
+        self.seed_set = frozenset(seed_set)
+        self.rounds = rounds
+        self.counts = counts
+        self.below = below
+        # edges scanned to compute the state
+        self.edges = edges
+        self.t = max(rounds.values(), default=0)
+
+
+    def __len__(self):
+        return len(self.rounds)
+
+
+    @property
+    def influenced(self):
+        return list(self.rounds)
+
+
+def notified_neighbors_of(graph):
+    # a node counts the neighbors it points to, so an influenced
+    # node notifies the nodes pointing to it (its predecessors)
+    return graph.predecessors if graph.is_directed() else graph.neighbors
+
+
+def cascade_state(graph, seed_set, nodes_threshold):
+    """
+    Influence the graph starting from the seed set (as frontier_threshold_influence_diffusion)
+    and return the CascadeState with the activation round of each influenced node.
+    """
+    notified_neighbors = notified_neighbors_of(graph)
+    rounds = {node: 0 for node in seed_set}
+    counts = {}
+    below = {}
+    edges = 0
+
+    # nodes with a non-positive threshold are influenced without any neighbor
+    frontier = [
+        node for node in graph.nodes
+        if node not in rounds and nodes_threshold[node] <= 0
+    ]
+    influencing = list(rounds)
+
+    t = 0
+    while True:
+        # counts of the nodes notified in this round before the round
+        round_counts = {}
+        next_frontier = []
+        for node in influencing:
+            for neighbor in notified_neighbors(node):
+                edges += 1
+                if neighbor not in rounds:
+                    count = counts.get(neighbor, 0)
+                    if neighbor not in round_counts:
+                        round_counts[neighbor] = count
+                    counts[neighbor] = count + 1
+                    if count + 1 == nodes_threshold[neighbor]:
+                        next_frontier.append(neighbor)
+                        below[neighbor] = round_counts[neighbor]
+
+        frontier.extend(next_frontier)
+        if not frontier:
+            break
+
+        t += 1
+        for node in frontier:
+            rounds[node] = t
+        influencing, frontier = frontier, []
+
+    return CascadeState(seed_set, rounds, counts, below, edges)
+
+
+def continue_cascade(graph, state, seed_set, nodes_threshold):
+    """
+    Continue the cascade state of a similar seed set with the seed set.
+
+    The rounds are recomputed round by round as in the diffusion, but only for the
+    dirty nodes: the nodes whose counts (kept up to date by the neighbors that change
+    their round) no longer give them their round. Each dirty node keeps the count of
+    its neighbors influenced so far and a histogram of the rounds of the others, so
+    a changed node only notifies its neighbors once, and the nodes far from the
+    changed seeds are never looked at.
+
+    Returns the rounds of the nodes that changed their round (None for the nodes no
+    longer influenced), the counts and below that changed (the ones of state are not
+    copied) and the number of edges scanned.
+    """
+    notified_neighbors = notified_neighbors_of(graph)
+    seed_set = frozenset(seed_set)
+    old_rounds = state.rounds
+    old_counts = state.counts
+    old_below = state.below
+    counts = {}
+    below = {}
+    # rounds of the nodes that changed their round (None while not influenced again)
+    changed = {}
+    # dirty nodes not influenced yet, with the histogram of the later rounds of their neighbors
+    pending = {}
+    decided = set()
+    edges = 0
+
+    def node_round(node):
+        return changed[node] if node in changed else old_rounds.get(node)
+
+    def make_dirty(node, t):
+        # count of the neighbors influenced before round t, histogram of the later ones
+        nonlocal edges
+        histogram = {}
+        pending[node] = histogram
+        if node in seed_set:
+            # influenced at round 0 whatever its neighbors
+            return
+
+        count = 0
+        for neighbor in graph.neighbors(node):
+            edges += 1
+            if neighbor == node:
+                continue
+            r = node_round(neighbor)
+            if r is None:
+                continue
+            if r < t:
+                count += 1
+            else:
+                histogram[r] = histogram.get(r, 0) + 1
+        counts[node] = count
+
+    def notify(node, old_round, new_round, t):
+        # the node moved from old_round to new_round (None if not influenced) at round t
+        nonlocal edges
+        for neighbor in notified_neighbors(node):
+            edges += 1
+            if neighbor == node or neighbor in seed_set or neighbor in decided:
+                continue
+
+            if neighbor in pending:
+                histogram = pending[neighbor]
+                if old_round is not None and old_round >= t:
+                    histogram[old_round] -= 1
+                if new_round is not None:
+                    histogram[new_round] = histogram.get(new_round, 0) + 1
+                continue
+
+            threshold = nodes_threshold[neighbor]
+            if threshold <= 0:
+                # influenced at round 1 whatever its neighbors
+                continue
+
+            count = counts[neighbor] if neighbor in counts else old_counts.get(neighbor, 0)
+            neighbor_round = old_rounds.get(neighbor)
+            if neighbor_round is None:
+                count += (new_round is not None) - (old_round is not None)
+                counts[neighbor] = count
+                if count >= threshold:
+                    make_dirty(neighbor, t)
+            elif neighbor_round > t:
+                # a neighbor influenced up to round t keeps its round
+                last_round = neighbor_round - 1
+                was_counted = old_round is not None and old_round <= last_round
+                is_counted = new_round is not None and new_round <= last_round
+                count += is_counted - was_counted
+                counts[neighbor] = count
+                was_below = old_round is not None and old_round < last_round
+                is_below = new_round is not None and new_round < last_round
+                count_below = (below[neighbor] if neighbor in below else old_below[neighbor]) + is_below - was_below
+                below[neighbor] = count_below
+                if count_below >= threshold or count < threshold:
+                    make_dirty(neighbor, t)
+
+    for node in state.seed_set ^ seed_set:
+        make_dirty(node, 0)
+
+    t = 0
+    last = state.t + 1
+    while t <= last and pending:
+        influenced = []
+        not_influenced = []
+        for node, histogram in pending.items():
+            if node in seed_set:
+                influenced.append(node)
+                continue
+
+            previous_count = counts[node]
+            counts[node] = previous_count + histogram.pop(t - 1, 0)
+            threshold = nodes_threshold[node]
+            if t > 0 and (threshold <= 0 or counts[node] >= threshold):
+                below[node] = previous_count
+                influenced.append(node)
+            elif old_rounds.get(node) == t:
+                not_influenced.append(node)
+
+        for node in influenced:
+            del pending[node]
+            decided.add(node)
+        for node in influenced:
+            old_round = node_round(node)
+            if old_round != t:
+                changed[node] = t
+                notify(node, old_round, t, t)
+
+        for node in not_influenced:
+            changed[node] = None
+            notify(node, t, None, t)
+
+        if influenced:
+            last = max(last, t + 1)
+        t += 1
+
+    # the dirty nodes left are not influenced: count all their influenced neighbors
+    for node, histogram in pending.items():
+        counts[node] += sum(histogram.values())
+
+    return changed, counts, below, edges
+
+
+def incremental_cascade_state(graph, state, seed_set, nodes_threshold):
+    """
+    Cascade state of the seed set, continuing the cascade state of a similar seed set.
+    """
+    changed, counts, below, edges = continue_cascade(graph, state, seed_set, nodes_threshold)
+
+    rounds = dict(state.rounds)
+    for node, r in changed.items():
+        if r is None:
+            del rounds[node]
+        else:
+            rounds[node] = r
+
+    return CascadeState(
+        seed_set,
+        rounds,
+        {**state.counts, **counts},
+        {**state.below, **below},
+        edges,
+    )
+
+
+def cascade_gain(graph, state, added, nodes_threshold):
+    """
+    Number of nodes influenced by adding the nodes to the seed set of state (e.g.,
+    the marginal gain of a node), without building the cascade state.
+
+    Returns the gain and the number of edges scanned.
+    """
+    seed_set = state.seed_set | frozenset(added)
+    changed, _, _, edges = continue_cascade(graph, state, seed_set, nodes_threshold)
+    gain = sum((r is not None) - (node in state.rounds) for node, r in changed.items())
+    return gain, edges
+
+
+def extend_cascade_state(graph, state, added, nodes_threshold):
+    """
+    Cascade state of the seed set of state plus the added nodes.
+    """
+    return incremental_cascade_state(graph, state, state.seed_set | frozenset(added), nodes_threshold)
+
+
+def shrink_cascade_state(graph, state, removed, nodes_threshold):
+    """
+    Cascade state of the seed set of state without the removed nodes.
+    """
+    return incremental_cascade_state(graph, state, state.seed_set - frozenset(removed), nodes_threshold)
@@ -0,0 +1,232 @@
+from .incremental import cascade_state, notified_neighbors_of
+
+
+class GraphReduction:
+    """
+    Nodes of a graph decided once for all the cascades with the given thresholds,
+    peeled from the graph until only its core is left:
+
+    - dead nodes, with a threshold greater than the number of their neighbors that
+      can be influenced before them (e.g., isolated nodes), are never influenced
+      unless they are seeds (and then only notify the nodes counting them);
+    - hanging nodes, whose only neighbor left is their anchor and whose threshold
+      is 1 (e.g., the trees hanging off the core), are influenced the round after
+      their anchor, and never help their anchor (they need it first) unless they or
+      the nodes hanging from them are seeds.
+
+    Cascades run on the core graph, and the hanging nodes are influenced afterwards
+    from their anchors, with the same influence set and number of steps.
+    """
+
+
+    def __init__(self, graph, nodes_threshold):
+        self.graph = graph
+        self.nodes_threshold = nodes_threshold
+        # dead nodes, with how many more neighbors they need to be influenceable
+        self.dead = {}
+        self.anchors = {}
+        # hanging nodes of each anchor
+        self.dependants = {}
+        # hanging nodes that their anchor counts, so they can influence it when seeds
+        self.counted_by_anchor = set()
+
+        notified_neighbors = notified_neighbors_of(graph)
+
+        def adjacent(node):
+            return (set(graph.neighbors(node)) | set(notified_neighbors(node))) - {node}
+
+        # neighbors that can be influenced before the node, and neighbors left
+        potential = {node: sum(1 for neighbor in graph.neighbors(node) if neighbor != node) for node in graph.nodes}
+        adjacent_left = {node: len(adjacent(node)) for node in graph.nodes}
+        peeled = set()
+
+        stack = list(graph.nodes)
+        while stack:
+            node = stack.pop()
+            threshold = nodes_threshold[node]
+            if node in peeled or threshold <= 0:
+                continue
+
+            if threshold > potential[node]:
+                peeled.add(node)
+                self.dead[node] = threshold - potential[node]
+                for neighbor in notified_neighbors(node):
+                    if neighbor != node and neighbor not in peeled:
+                        potential[neighbor] -= 1
+                for neighbor in adjacent(node):
+                    if neighbor not in peeled:
+                        adjacent_left[neighbor] -= 1
+                        stack.append(neighbor)
+            elif adjacent_left[node] == 1:
+                # not dead, so its threshold is 1 and its anchor is the neighbor it counts
+                anchor = next(neighbor for neighbor in adjacent(node) if neighbor not in peeled)
+                peeled.add(node)
+                self.anchors[node] = anchor
+                self.dependants.setdefault(anchor, []).append(node)
+                if graph.has_edge(anchor, node):
+                    self.counted_by_anchor.add(node)
+                    potential[anchor] -= 1
+                adjacent_left[anchor] -= 1
+                stack.append(anchor)
+
+        self.core = [node for node in graph.nodes if node not in peeled]
+        self.core_graph = graph.subgraph(self.core).copy()
+        # nodes with a non-positive threshold are influenced without any neighbor
+        self.unconditional = [node for node in self.core if nodes_threshold[node] <= 0]
+
+
+    def __len__(self):
+        return len(self.core)
+
+
+    def cascade_rounds(self, seed_set):
+        """
+        Activation round of each node influenced by the seed set, or None if the
+        seed set makes a dead node influenceable (then the reduction does not hold).
+        """
+        nodes_threshold = self.nodes_threshold
+        anchors = self.anchors
+        rounds = {node: 0 for node in seed_set}
+        # round at which each hanging node influenced by the seeds notifies its anchor in the core
+        notifying = {}
+        # core nodes notified by the dead seeds
+        notified = []
+        # dead nodes notified by the seeds (or the hanging nodes they influence)
+        dead_notified = {}
+
+        def notify_dead(node):
+            # a dead node stays dead while less than its slack of notifications
+            dead_notified[node] = dead_notified.get(node, 0) + 1
+            return dead_notified[node] < self.dead[node]
+
+        def influence_anchors(node, r):
+            # a hanging node influences its anchors up to the core, as far as they count it
+            while node in anchors and node in self.counted_by_anchor:
+                anchor = anchors[node]
+                if anchor in self.dead:
+                    return rounds.get(anchor) == 0 or notify_dead(anchor)
+                if anchor not in anchors:
+                    notifying[node] = min(r, notifying.get(node, r))
+                    return True
+                if rounds.get(anchor, r + 2) <= r + 1:
+                    return True
+                rounds[anchor] = r + 1
+                node, r = anchor, r + 1
+            return True
+
+        graph_notified_neighbors = notified_neighbors_of(self.graph)
+        for node in seed_set:
+            if node in self.dead:
+                # a dead seed still notifies the nodes counting it
+                for neighbor in graph_notified_neighbors(node):
+                    if neighbor == node or rounds.get(neighbor) == 0:
+                        continue
+                    if neighbor in self.dead:
+                        if not notify_dead(neighbor):
+                            return None
+                        continue
+                    if neighbor in anchors:
+                        # its threshold is 1
+                        if rounds.get(neighbor, 2) > 1:
+                            rounds[neighbor] = 1
+                            if not influence_anchors(neighbor, 1):
+                                return None
+                    else:
+                        notified.append(neighbor)
+            elif not influence_anchors(node, 0):
+                return None
+
+        notifications = {0: notified} if notified else {}
+        for node, r in notifying.items():
+            notifications.setdefault(r, []).append(anchors[node])
+
+        # cascade on the core graph, as frontier_threshold_influence_diffusion
+        notified_neighbors = notified_neighbors_of(self.core_graph)
+        frontier = [node for node in rounds if node not in anchors and node not in self.dead]
+        next_frontier = [node for node in self.unconditional if node not in rounds]
+        influenced_neighbors = {}
+
+        t = 0
+        while True:
+            for node in frontier:
+                for neighbor in notified_neighbors(node):
+                    if neighbor not in rounds:
+                        influenced_neighbors[neighbor] = influenced_neighbors.get(neighbor, 0) + 1
+                        if influenced_neighbors[neighbor] == nodes_threshold[neighbor]:
+                            next_frontier.append(neighbor)
+            for neighbor in notifications.pop(t, []):
+                if neighbor not in rounds:
+                    influenced_neighbors[neighbor] = influenced_neighbors.get(neighbor, 0) + 1
+                    if influenced_neighbors[neighbor] == nodes_threshold[neighbor]:
+                        next_frontier.append(neighbor)
+
+            if not next_frontier and not notifications:
+                break
+
+            t += 1
+            for node in next_frontier:
+                rounds[node] = t
+            frontier, next_frontier = next_frontier, []
+
+        # the hanging nodes are influenced the round after their anchors
+        stack = [node for node in rounds if node in self.dependants]
+        while stack:
+            node = stack.pop()
+            r = rounds[node] + 1
+            for dependant in self.dependants[node]:
+                if rounds.get(dependant, r + 1) > r:
+                    rounds[dependant] = r
+                    if dependant in self.dependants:
+                        stack.append(dependant)
+
+        return rounds
+
+
+# reductions by graph and nodes' thresholds, which are fixed in a simulation
+_graph_reductions = {}
+
+
+def reduce_graph(graph, nodes_threshold, max_reductions=8):
+    """
+    Return the GraphReduction of the graph with the given thresholds, computed once
+    per graph and thresholds dictionary.
+    """
+    key = (id(graph), id(nodes_threshold))
+    cached = _graph_reductions.get(key)
+    if cached is not None and cached.graph is graph and cached.nodes_threshold is nodes_threshold:
+        return cached
+
+    if len(_graph_reductions) >= max_reductions:
+        _graph_reductions.pop(next(iter(_graph_reductions)))
+
+    reduction = GraphReduction(graph, nodes_threshold)
+    # the reduction keeps references to the graph and the thresholds, so that their ids are not reused while cached
+    _graph_reductions[key] = reduction
+    return reduction
+
+
+def reduced_threshold_influence_diffusion(
+    graph,
+    seed_set,
+    nodes_influenced,
+    nodes_threshold,
+    with_print=False,
+):
+    """
+    Same as frontier_threshold_influence_diffusion, with the cascade run on the core of
+    the graph reduction (computed once per graph and thresholds) and the hanging nodes
+    influenced afterwards, so the nodes decided before any cascade are not looked at.
+    Seed sets making dead nodes influenceable fall back to the cascade on the whole graph.
+    """
+    rounds = reduce_graph(graph, nodes_threshold).cascade_rounds(seed_set)
+    if rounds is None:
+        rounds = cascade_state(graph, seed_set, nodes_threshold).rounds
+
+    for node in rounds:
+        nodes_influenced[node] = True
+
+    t = max(rounds.values(), default=0)
+    if with_print:
+        print(f"At step {t}, influence set is {set(rounds)}")
+
+    return list(rounds), t
@@ -11,14 +11,29 @@ from .base_set import (
 
 from .graph_permutation_seed_set import (
     GraphPermutationSeedSet,
+    NodeIndex,
+    node_index,
+    NodeOrderIndex,
+    node_order_keys,
+    node_order_index,
+    seed_set_from_node_order_given_cost,
     seed_set_from_ordered_graph_given_cost,
+    csr_seed_set_from_ordered_graph_given_cost,
+    unique_seed_sets,
+    enough_reachable,
+    degree_order_max_duplicates,
     seed_set_from_degree_graph_given_cost,
     seed_sets_from_degree_graph_given_cost,
     seed_set_from_degreecost_graph_given_cost,
+    seed_set_from_degreecost_weights,
+    degreecost_ratios,
+    seed_sets_reachable_from_degreecost,
     seed_sets_from_degreecost_graph_given_cost,
     seed_sets_from_degree_ordered_graph_given_cost,
     seed_set_from_graph_permutation_given_cost,
+    csr_seed_set_from_graph_permutation_given_cost,
     seed_sets_from_graph_permutation_given_cost,
     permutation_position_combine_seed_sets,
+    permutation_position_combine_candidates,
     position_combine_seed_sets,
 )
\ No newline at end of file
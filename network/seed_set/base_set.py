@@ -1,5 +1,6 @@
+import numpy as np
 from random import sample
-from utils import log
+from utils import log_debug, summarize_nodes
 
 
 def random_seed_set(graph, size):
@@ -61,10 +62,10 @@ def seed_sets_from_graph_partition_given_cost(
 
     tries = n * 5
     while len(seed_sets) < n:
-        log(text=f"{tries} tries left to generate a seed set of cost {cost}", enabled=with_print)
+        log_debug("%d tries left to generate a seed set of cost %d", tries, cost, enabled=with_print)
 
         if tries < 1:
-            log(text=f"No tries left to generate a seed set of cost {cost}, terminating the process", enabled=with_print)
+            log_debug("No tries left to generate a seed set of cost %d, terminating the process", cost, enabled=with_print)
             raise ValueError("There is no partition to generate a seed set of the given cost")
 
         seed_set = seed_set_from_graph_partition_given_cost(graph, nodes_cost_dict, cost)
@@ -77,18 +78,22 @@ def seed_sets_from_graph_partition_given_cost(
 
 def seed_set_cost(seed_set, nodes_cost, with_print=False):
     if with_print:
-        log(text="Nodes cost:", enabled=with_print)
+        log_debug("Nodes cost:", enabled=with_print)
         for node_id, _ in seed_set:
-            log(text=f"Node {node_id} has cost {nodes_cost[node_id]}", enabled=with_print)
+            log_debug("Node %s has cost %d", node_id, nodes_cost[node_id], enabled=with_print)
+
+    # nodes' costs of a CSRGraph, indexed by the relabelled nodes
+    if isinstance(nodes_cost, np.ndarray):
+        return int(nodes_cost[np.asarray(seed_set, dtype=np.int64)].sum())
 
     return sum(nodes_cost[node_id] for node_id in seed_set)
 
 
 def seed_set_cost_with_data(seed_set, nodes_cost, with_print=False):
     if with_print:
-        log(text="Nodes cost:", enabled=with_print)
+        log_debug("Nodes cost:", enabled=with_print)
         for node_id, _ in seed_set:
-            log(text=f"Node {node_id} has cost {nodes_cost[node_id]}", enabled=with_print)
+            log_debug("Node %s has cost %d", node_id, nodes_cost[node_id], enabled=with_print)
 
     return sum(nodes_cost[node_id] for node_id, _ in seed_set)
 
@@ -98,4 +103,4 @@ def seed_set_score(seed_set):
 
 
 def print_seed_set(seed_set):
-    log(text=f"Seed set\'s nodes: {seed_set} with size {len(seed_set)}")
\ No newline at end of file
+    log_debug("Seed set\'s nodes: %s with size %d", summarize_nodes(seed_set), len(seed_set))
\ No newline at end of file
@@ -1,50 +1,315 @@
+import numpy as np
+import networkx as nx
 from random import shuffle, uniform
 from heapq import heappush, heappop
-from utils import log
+from utils import log_debug, summarize_nodes
+from ..csr import CSRGraph, budget_fill
+
+
+class NodeIndex:
+    """
+    Position of each node of a graph (in the order of the nodes' cost dictionary,
+    which is the graph order), so that sets and permutations of nodes can be stored
+    as arrays of positions, in the smallest unsigned type that holds them.
+    """
+    def __init__(self, nodes, cost=None):
+        self.nodes = list(nodes)
+        self.node_ixs = {node: ix for ix, node in enumerate(self.nodes)}
+        self.dtype = ixs_dtype(len(self.nodes))
+        # cost of each node, if the index was built from the nodes' cost dictionary
+        self.cost = cost
+        self.ranks = None
+
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+    def ixs(self, nodes):
+        node_ixs = self.node_ixs
+        return np.fromiter((node_ixs[node] for node in nodes), dtype=self.dtype, count=len(nodes))
+
+
+    def labels(self, ixs):
+        nodes = self.nodes
+        return [nodes[ix] for ix in ixs.tolist()]
+
+
+    def label_ranks(self):
+        """
+        Rank of each node in the sorted nodes, to break ties by node as comparing them does.
+        """
+        if self.ranks is None:
+            order = sorted(range(len(self.nodes)), key=self.nodes.__getitem__)
+            self.ranks = np.empty(len(order), dtype=np.int64)
+            self.ranks[order] = np.arange(len(order))
+        return self.ranks
+
+
+    def __getstate__(self):
+        # the ranks are sorted again when needed, instead of being pickled (e.g., in checkpoints)
+        return {**self.__dict__, "ranks": None}
+
+
+def ixs_dtype(num_nodes):
+    # e.g., uint16 for graphs of up to 65536 nodes, so a permutation takes 2 bytes per node
+    return np.min_scalar_type(max(num_nodes - 1, 0))
+
+
+# indices by nodes' cost dictionary, which identifies the graph in a simulation
+_node_indices = {}
+
+
+def node_index(nodes_cost_dict, max_indices=8):
+    """
+    Return the NodeIndex of the nodes in nodes_cost_dict, built once per cost dictionary.
+    """
+    cached = _node_indices.get(id(nodes_cost_dict))
+    if cached and cached[0] is nodes_cost_dict:
+        return cached[1]
+
+    if len(_node_indices) >= max_indices:
+        _node_indices.pop(next(iter(_node_indices)))
+
+    index = NodeIndex(nodes_cost_dict, np.fromiter(nodes_cost_dict.values(), dtype=np.int64, count=len(nodes_cost_dict)))
+    # keep a reference to the dictionary, so that its id is not reused while cached
+    _node_indices[id(nodes_cost_dict)] = (nodes_cost_dict, index)
+    return index
 
 
 class GraphPermutationSeedSet:
-    def __init__(self, seed_set, permutation):
+    """
+    Seed set taken from a permutation of the graph nodes.
+
+    The initial seed set, the current one (the influenced nodes once evaluated) and the
+    permutation are stored as arrays of the nodes' positions in a NodeIndex, shared by
+    all the seed sets of a simulation (none for the node indices of a CSRGraph, which
+    are their own positions), and turned back into lists of nodes when read. The hash
+    of the seed set is computed once, until the seed set changes.
+    """
+    __slots__ = ("index", "initial_ixs", "seed_ixs", "permutation_ixs", "_hash")
+
+
+    def __init__(self, seed_set, permutation, index=None):
+        if index is None and not isinstance(permutation, np.ndarray):
+            index = NodeIndex(permutation)
+        self.index = index
+        if index is None:
+            # node indices of a CSRGraph
+            self.permutation_ixs = np.asarray(permutation, dtype=ixs_dtype(len(permutation)))
+        else:
+            self.permutation_ixs = index.ixs(permutation)
         # initial set will never change (used for comparison)
-        self.initial_seed_set = seed_set
-        self.seed_set = seed_set
-        self.permutation = permutation
+        self.initial_ixs = self.to_ixs(seed_set)
+        self.seed_ixs = self.initial_ixs
+        self._hash = None
+
+
+    @classmethod
+    def from_ixs(cls, seed_ixs, permutation_ixs, index=None):
+        """
+        Seed set of the nodes at the given positions of the index.
+        """
+        dtype = index.dtype if index is not None else ixs_dtype(len(permutation_ixs))
+        seed_set = cls.__new__(cls)
+        seed_set.index = index
+        seed_set.permutation_ixs = np.asarray(permutation_ixs, dtype=dtype)
+        seed_set.initial_ixs = np.asarray(seed_ixs, dtype=dtype)
+        seed_set.seed_ixs = seed_set.initial_ixs
+        seed_set._hash = None
+        return seed_set
+
+
+    def to_ixs(self, nodes):
+        if self.index is None:
+            return np.asarray(nodes, dtype=self.permutation_ixs.dtype)
+        return self.index.ixs(nodes)
+
+
+    def to_labels(self, ixs):
+        return ixs.tolist() if self.index is None else self.index.labels(ixs)
+
+
+    @property
+    def seed_set(self):
+        return self.to_labels(self.seed_ixs)
+
+
+    @seed_set.setter
+    def seed_set(self, seed_set):
+        self.seed_ixs = self.to_ixs(seed_set)
+        self._hash = None
+
+
+    @property
+    def initial_seed_set(self):
+        return self.to_labels(self.initial_ixs)
+
+
+    @property
+    def permutation(self):
+        return self.to_labels(self.permutation_ixs)
 
 
     def __len__(self):
-        return len(self.seed_set)
+        return len(self.seed_ixs)
 
 
     def __eq__(self, other):
         if not isinstance(other, GraphPermutationSeedSet):
             return False
 
-        # compare the seed_set as sets (order doesn't matter)
-        # compare the permutation as lists (order matters)
+        # compare the seed_set as lists of nodes (the hashes, as sets, only tell the different ones apart)
+        if hash(self) != hash(other):
+            return False
+        if self.index is other.index:
+            return np.array_equal(self.seed_ixs, other.seed_ixs)
         return self.seed_set == other.seed_set
 
 
     def __hash__(self):
         # to use instances in sets or as dictionary keys, implement __hash__
-        return hash(frozenset(self.seed_set))
+        if self._hash is None:
+            self._hash = hash(frozenset(self.seed_set))
+        return self._hash
+
+
+    def __deepcopy__(self, memo):
+        # the arrays are copied, the index is shared (it never changes)
+        copied = GraphPermutationSeedSet.from_ixs(self.initial_ixs.copy(), self.permutation_ixs.copy(), self.index)
+        copied.seed_ixs = self.seed_ixs.copy()
+        copied._hash = self._hash
+        return copied
 
 
     def __str__(self):
         return f"GraphPermutationSeedSet(seed_set={self.seed_set})"
 
 
+# keys of the cached node orderings, computed from the degree and cost arrays
+node_order_keys = {
+    "degree": lambda degree, cost: degree,
+    "degree/cost": lambda degree, cost: degree // cost,
+}
+
+
+class NodeOrderIndex:
+    """
+    Degree and cost of the nodes of a graph as arrays (in the order of the nodes'
+    cost dictionary, which is the graph order), with the orderings of the nodes
+    by the keys in node_order_keys sorted once and then reused.
+    """
+    def __init__(self, nodes_cost_dict, degrees):
+        self.node_index = node_index(nodes_cost_dict)
+        self.nodes = self.node_index.nodes
+        self.node_ixs = self.node_index.node_ixs
+        self.cost = self.node_index.cost
+        self.degree = np.fromiter((degrees[node] for node in self.nodes), dtype=np.int64, count=len(self.nodes))
+        self.total_cost = int(self.cost.sum())
+        self.orders = {}
+
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+    def order(self, key_name):
+        if key_name not in self.orders:
+            self.orders[key_name] = self.sort(node_order_keys[key_name](self.degree, self.cost))
+        return self.orders[key_name]
+
+
+    def sort(self, keys, nodes=None, ixs=None):
+        """
+        Return the node indices sorted in descending order of keys, with ties in the
+        order of the given nodes, or node indices (the graph order if not given), as
+        list.sort(reverse=True).
+        """
+        if nodes is None and ixs is None:
+            return np.argsort(-keys, kind="stable")
+
+        if ixs is None:
+            ixs = np.fromiter((self.node_ixs[node] for node in nodes), dtype=np.int64, count=len(nodes))
+        return ixs[np.argsort(-keys[ixs], kind="stable")]
+
+
+# indices by nodes' cost dictionary and degrees, which identify the graph and its costs in a simulation
+_node_order_indices = {}
+
+
+def degrees_source(degrees):
+    """
+    Object identifying the degrees: the graph (with the kind and weight of the view)
+    for a networkx degree view, which each graph.degree() call builds again, or the
+    degrees themselves (e.g., a dictionary).
+    """
+    if isinstance(degrees, nx.reportviews.DiDegreeView):
+        return degrees._graph, type(degrees), degrees._weight
+    return degrees, None, None
+
+
+def node_order_index(nodes_cost_dict, degrees, max_indices=8):
+    """
+    Return the NodeOrderIndex of the nodes in nodes_cost_dict, built once per cost
+    dictionary and degrees (a degree view of the same graph and kind counts as the same degrees).
+    """
+    source = degrees_source(degrees)
+    key = (id(nodes_cost_dict), id(source[0]), source[1], source[2])
+    cached = _node_order_indices.get(key)
+    if cached and cached[0] is nodes_cost_dict and cached[1] is source[0]:
+        return cached[2]
+
+    if len(_node_order_indices) >= max_indices:
+        _node_order_indices.pop(next(iter(_node_order_indices)))
+
+    index = NodeOrderIndex(nodes_cost_dict, degrees)
+    # keep references to the dictionary and the degrees, so that their ids are not reused while cached
+    _node_order_indices[key] = (nodes_cost_dict, source[0], index)
+    return index
+
+
+def seed_set_from_node_order_given_cost(
+    index,
+    order,
+    cost=0,
+):
+    """
+    Same as seed_set_from_ordered_graph_given_cost, for nodes already ordered.
+
+    Args:
+        index (NodeOrderIndex): Index of the graph nodes.
+        order (array): Node indices in the order to visit them (e.g., index.order("degree")).
+        cost (int): Cost budget of the seed set.
+    """
+    if index.total_cost < cost:
+        raise ValueError("The given cost is greater than the sum of the nodes\' costs")
+    if index.total_cost == cost:
+        return GraphPermutationSeedSet(index.nodes, index.nodes, index.node_index), len(index)
+
+    # vectorized walk of the nodes, taking them while their cost fits the budget
+    taken, ix = budget_fill(index.cost[order], cost)
+
+    nodes = index.nodes
+    seed_set = {nodes[node_ix] for node_ix in order[taken].tolist()}
+
+    return GraphPermutationSeedSet.from_ixs(index.node_index.ixs(list(seed_set)), order, index.node_index), ix
+
+
 def seed_set_from_ordered_graph_given_cost(
     nodes,
     nodes_cost_dict,
     key_func,
     cost=0,
 ):
+    if isinstance(nodes, CSRGraph):
+        return csr_seed_set_from_ordered_graph_given_cost(nodes, nodes_cost_dict, key_func, cost)
+
     nodes = list(nodes)
     nodes_cost = sum(nodes_cost_dict.values())
     if nodes_cost < cost:
         raise ValueError("The given cost is greater than the sum of the nodes\' costs")
     if nodes_cost == cost:
-        return GraphPermutationSeedSet(nodes, nodes)
+        return GraphPermutationSeedSet(nodes, nodes, node_index(nodes_cost_dict))
 
     nodes.sort(key=key_func, reverse=True)
     seed_set = set()
@@ -56,7 +321,7 @@ def seed_set_from_ordered_graph_given_cost(
     while seed_set_cost < cost and ix < len(nodes):
         sample_node = nodes[ix]
         sample_node_cost = nodes_cost_dict[sample_node]
-        log(text=f"Processing node at ix: {ix} -> (node={sample_node}, cost={sample_node_cost})", enabled=False)
+        log_debug("Processing node at ix: %s -> (node=%s, cost=%s)", ix, sample_node, sample_node_cost, enabled=False)
 
         seed_set_with_sample_cost = seed_set_cost + sample_node_cost
 
@@ -68,7 +333,129 @@ def seed_set_from_ordered_graph_given_cost(
 
         ix += 1
 
-    return GraphPermutationSeedSet(list(seed_set), nodes), ix
+    return GraphPermutationSeedSet(list(seed_set), nodes, node_index(nodes_cost_dict)), ix
+
+
+def csr_seed_set_from_ordered_graph_given_cost(
+    csr_graph,
+    nodes_cost=None,
+    key_func=None,
+    cost=0,
+):
+    """
+    Same as seed_set_from_ordered_graph_given_cost, but on the node indices of a CSRGraph:
+    key_func is applied to the array of all the indices at once (e.g., lambda node: degrees[node]
+    with degrees being csr_graph.degree) and the budget walk is vectorized.
+    """
+    nodes_cost = csr_graph.cost if nodes_cost is None else nodes_cost
+    nodes = np.arange(len(csr_graph))
+
+    total_cost = int(nodes_cost.sum())
+    if total_cost < cost:
+        raise ValueError("The given cost is greater than the sum of the nodes\' costs")
+    if total_cost == cost:
+        return GraphPermutationSeedSet(nodes, nodes), len(nodes)
+
+    # stable sort in descending order, as list.sort(reverse=True) does
+    permutation = np.argsort(-np.asarray(key_func(nodes)), kind="stable")
+    taken, ix = budget_fill(nodes_cost[permutation], cost)
+
+    return GraphPermutationSeedSet(permutation[taken], permutation), ix
+
+
+def ordered_nodes(nodes):
+    # an explicit list is a permutation of the nodes (e.g., a combined one),
+    # while a node view follows the graph order, which is the default one
+    return nodes if isinstance(nodes, (list, tuple, np.ndarray)) else None
+
+
+def unique_seed_sets(
+    generate,
+    n,
+    exclude=(),
+    max_duplicates=None,
+    reachable=None,
+    strict=False,
+    with_print=False,
+):
+    """
+    Draw seed sets with generate() until n distinct ones (and not in exclude) are
+    found, or until max_duplicates seed sets in a row were already found (by default
+    10 * n, at least 100), so a generator reaching fewer distinct seed sets stops
+    early instead of spinning.
+
+    If reachable is given, hitting max_duplicates only stops the drawing when the
+    distinct seed sets reachable by generate() are fewer than n: otherwise the seed
+    sets left exist (e.g., in a narrow range of the random weights) and the drawing
+    goes on until they are found.
+
+    The seed sets are drawn one at a time, so the random numbers drawn are the same
+    as drawing until n distinct ones are found.
+
+    Args:
+        generate (function): Draws a new seed set.
+        n (int): Number of distinct seed sets.
+        exclude (list): Seed sets that do not count as new ones.
+        max_duplicates (int): Max number of seed sets in a row already found.
+        reachable (function): Returns an iterable of the distinct seed sets generate() can draw.
+        strict (bool): If True, raise a ValueError when less than n seed sets are found.
+
+    Returns the set of distinct seed sets (less than n if the generator ran out of
+    new ones) and the number of duplicates drawn.
+    """
+    if max_duplicates is None:
+        max_duplicates = max(100, 10 * n)
+
+    seed_sets = set()
+    duplicates = 0
+    duplicates_in_a_row = 0
+    while len(seed_sets) < n:
+        if duplicates_in_a_row >= max_duplicates:
+            if reachable is None or not enough_reachable(reachable(), n, seed_sets, exclude):
+                break
+            log_debug("The %s seed sets left are reachable, drawing until they are found", n - len(seed_sets), enabled=with_print)
+            max_duplicates = float("inf")
+
+        seed_set = generate()
+        if seed_set in seed_sets or seed_set in exclude:
+            duplicates += 1
+            duplicates_in_a_row += 1
+            continue
+
+        seed_sets.add(seed_set)
+        duplicates_in_a_row = 0
+        log_debug("lenght of seed sets: %s", len(seed_sets), enabled=with_print)
+
+    if len(seed_sets) < n:
+        log_debug("Only %s distinct seed sets after %s duplicates in a row", len(seed_sets), duplicates_in_a_row, enabled=with_print)
+        if strict:
+            reason = "out of the reachable ones" if reachable is not None else f"before {max_duplicates} duplicates in a row"
+            raise ValueError(f"Could not generate {n} distinct seed sets, only {len(seed_sets)} found {reason}")
+
+    return seed_sets, duplicates
+
+
+def enough_reachable(reachable_seed_sets, n, seed_sets, exclude=()):
+    """
+    Whether the seed sets found and the reachable ones not found yet (and not in
+    exclude) are at least n, stopping at the n-th.
+    """
+    found = len(seed_sets)
+    for seed_set in reachable_seed_sets:
+        if found >= n:
+            break
+        if seed_set not in seed_sets and seed_set not in exclude:
+            found += 1
+    return found >= n
+
+
+def degree_order_max_duplicates(a_range):
+    """
+    The order by degree * a is the order by degree for any a > 0 (ties keep the order
+    of the nodes), so the seed sets drawn from the same nodes are all the same: the
+    first duplicate means there is no other one.
+    """
+    return 1 if a_range[0] > 0 else None
 
 
 def seed_set_from_degree_graph_given_cost(
@@ -78,14 +465,25 @@ def seed_set_from_degree_graph_given_cost(
     cost=0,
     a_range=None,
     with_print=False,
+    node_ixs=None,
 ):
+    # node_ixs: node indices (in the NodeOrderIndex of the costs) in the order of the ties, instead of nodes
     a = uniform(a_range[0], a_range[1])
-    log(text=f"Generating seed set from degree graph given a cost of {cost} and a={a}", enabled=with_print)
+    log_debug("Generating seed set from degree graph given a cost of %s and a=%s", cost, a, enabled=with_print)
 
-    graph_permutation_seed_set, _ = seed_set_from_ordered_graph_given_cost(
-        nodes=nodes,
-        nodes_cost_dict=nodes_cost_dict,
-        key_func=lambda node: (degrees[node] * a),
+    if isinstance(nodes, CSRGraph):
+        graph_permutation_seed_set, _ = seed_set_from_ordered_graph_given_cost(
+            nodes=nodes,
+            nodes_cost_dict=nodes_cost_dict,
+            key_func=lambda node: (degrees[node] * a),
+            cost=cost,
+        )
+        return graph_permutation_seed_set
+
+    index = node_order_index(nodes_cost_dict, degrees)
+    graph_permutation_seed_set, _ = seed_set_from_node_order_given_cost(
+        index=index,
+        order=index.sort(index.degree * a, nodes=ordered_nodes(nodes), ixs=node_ixs),
         cost=cost,
     )
 
@@ -101,29 +499,20 @@ def seed_sets_from_degree_graph_given_cost(
     a_range=None,
     with_print=False,
 ):
-    seed_sets = set()
-
-    tries = n * 1_000_000
-    while len(seed_sets) < n:
-        log(text=f"{tries} tries left to generate a seed set of cost {cost}", enabled=with_print)
-
-        if tries < 1:
-            log(text=f"No tries left to generate a seed set of cost {cost}, terminating the process", enabled=with_print)
-            raise ValueError("Could not generate a seed set of the given cost using degree/cost")
-
-        graph_permutation_seed_set = seed_set_from_degree_graph_given_cost(
+    seed_sets, _ = unique_seed_sets(
+        lambda: seed_set_from_degree_graph_given_cost(
             nodes=nodes,
             nodes_cost_dict=nodes_cost_dict,
             degrees=degrees,
             cost=cost,
             a_range=a_range,
             with_print=with_print,
-        )
-
-        seed_sets.add(graph_permutation_seed_set)
-        log(text=f"lenght of seed sets: {len(seed_sets)}", enabled=with_print)
-
-        tries -= 1
+        ),
+        n=n,
+        max_duplicates=degree_order_max_duplicates(a_range),
+        strict=True,
+        with_print=with_print,
+    )
 
     return list(seed_sets)
 
@@ -136,7 +525,9 @@ def seed_set_from_degreecost_graph_given_cost(
     a_range=None,
     b_range=None,
     ab_total=False,
+    node_ixs=None,
 ):
+    # node_ixs: node indices (in the NodeOrderIndex of the costs) in the order of the ties, instead of nodes
     a = uniform(a_range[0], a_range[1])
     b = uniform(b_range[0], b_range[1])
 
@@ -145,16 +536,83 @@ def seed_set_from_degreecost_graph_given_cost(
     if ab_total:
         a = b = 1
 
-    graph_permutation_seed_set, _ = seed_set_from_ordered_graph_given_cost(
-        nodes=nodes,
-        nodes_cost_dict=nodes_cost_dict,
-        key_func=lambda node: ((degrees[node] * a) // (nodes_cost_dict[node] * b)),
+    return seed_set_from_degreecost_weights(nodes, nodes_cost_dict, degrees, cost, a, b, node_ixs)
+
+
+def seed_set_from_degreecost_weights(nodes, nodes_cost_dict, degrees, cost, a, b, node_ixs=None):
+    """
+    Seed set of the nodes taken in descending order of (degree * a) // (cost * b).
+    """
+    if isinstance(nodes, CSRGraph):
+        graph_permutation_seed_set, _ = seed_set_from_ordered_graph_given_cost(
+            nodes=nodes,
+            nodes_cost_dict=nodes_cost_dict,
+            key_func=lambda node: ((degrees[node] * a) // (nodes_cost_dict[node] * b)),
+            cost=cost,
+        )
+        return graph_permutation_seed_set
+
+    index = node_order_index(nodes_cost_dict, degrees)
+    nodes = ordered_nodes(nodes)
+    if a == 1 and b == 1 and nodes is None and node_ixs is None:
+        # same order as (degree * 1.0) // (cost * 1.0), but sorted only once
+        order = index.order("degree/cost")
+    else:
+        order = index.sort((index.degree * a) // (index.cost * b), nodes=nodes, ixs=node_ixs)
+
+    graph_permutation_seed_set, _ = seed_set_from_node_order_given_cost(
+        index=index,
+        order=order,
         cost=cost,
     )
 
     return graph_permutation_seed_set
 
 
+def degreecost_ratios(nodes_cost_dict, degrees, a_range, b_range):
+    """
+    Ratios a / b, one inside each interval of the ratios reachable with a in a_range
+    and b in b_range where the order by (degree * a) // (cost * b) stays the same:
+    the key of a node only changes where degree * a / (cost * b) crosses an integer k,
+    at the ratio k * cost / degree.
+    """
+    min_ratio = a_range[0] / b_range[1]
+    max_ratio = a_range[1] / b_range[0]
+    if min_ratio >= max_ratio:
+        return np.array([min_ratio])
+
+    index = node_order_index(nodes_cost_dict, degrees)
+    with_degree = index.degree > 0
+    slopes = index.degree[with_degree] / index.cost[with_degree]
+    first_k = np.ceil(min_ratio * slopes).astype(np.int64)
+    counts = np.maximum(np.floor(max_ratio * slopes).astype(np.int64) - first_k + 1, 0)
+
+    # k = first_k, first_k + 1, ... for each node
+    starts = np.cumsum(counts) - counts
+    ks = np.repeat(first_k, counts) + np.arange(counts.sum()) - np.repeat(starts, counts)
+    breakpoints = np.unique(ks / np.repeat(slopes, counts))
+    breakpoints = breakpoints[(breakpoints > min_ratio) & (breakpoints < max_ratio)]
+    if len(breakpoints):
+        # the same ratio of different nodes may be computed a rounding apart
+        breakpoints = breakpoints[np.concatenate(([True], np.diff(breakpoints) > 1e-12 * breakpoints[1:]))]
+
+    bounds = np.concatenate(([min_ratio], breakpoints, [max_ratio]))
+    return (bounds[:-1] + bounds[1:]) / 2
+
+
+def seed_sets_reachable_from_degreecost(nodes, nodes_cost_dict, degrees, cost=0, a_range=None, b_range=None):
+    """
+    Distinct seed sets of seed_set_from_degreecost_graph_given_cost for all the a and
+    b in their ranges (but the ratios with probability zero, as a = b = 1 of ab_total).
+    """
+    seed_sets = set()
+    for ratio in degreecost_ratios(nodes_cost_dict, degrees, a_range, b_range).tolist():
+        seed_set = seed_set_from_degreecost_weights(nodes, nodes_cost_dict, degrees, cost, ratio, 1)
+        if seed_set not in seed_sets:
+            seed_sets.add(seed_set)
+            yield seed_set
+
+
 def seed_sets_from_degreecost_graph_given_cost(
     nodes,
     nodes_cost_dict,
@@ -166,20 +624,13 @@ def seed_sets_from_degreecost_graph_given_cost(
     with_first_total=True,
     with_print=False,
 ):
-    seed_sets = set()
-
     ix = 0
 
-    tries = n * 1_000_000
-    while len(seed_sets) < n:
+    def generate():
+        nonlocal ix
         a = uniform(a_range[0], a_range[1])
         b = uniform(b_range[0], b_range[1])
-
-        log(text=f"{tries} tries left to generate a seed set of cost {cost} with a={a} and b={b}", enabled=with_print)
-
-        if tries < 1:
-            log(text=f"No tries left to generate a seed set of cost {cost}, terminating the process", enabled=with_print)
-            raise ValueError(f"Could not generate a seed set of the given cost, max is {len(seed_sets)}")
+        log_debug("Generating a seed set of cost %s with a=%s and b=%s", cost, a, b, enabled=with_print)
 
         graph_permutation_seed_set = seed_set_from_degreecost_graph_given_cost(
             nodes=nodes,
@@ -190,12 +641,16 @@ def seed_sets_from_degreecost_graph_given_cost(
             b_range=b_range,
             ab_total= with_first_total and ix == 0,
         )
-
-        seed_sets.add(graph_permutation_seed_set)
-        log(text=f"lenght of seed sets: {len(seed_sets)}", enabled=with_print)
-
-        tries -= 1
         ix += 1
+        return graph_permutation_seed_set
+
+    seed_sets, _ = unique_seed_sets(
+        generate,
+        n=n,
+        reachable=lambda: seed_sets_reachable_from_degreecost(nodes, nodes_cost_dict, degrees, cost, a_range, b_range),
+        strict=True,
+        with_print=with_print,
+    )
 
     return list(seed_sets)
 
@@ -213,13 +668,13 @@ def seed_sets_from_degree_ordered_graph_given_cost(
     exclude_ixs = []
     tries = n * 1_000_000
     while len(seed_sets) < n:
-        log(text=f"{tries} tries left to generate a seed set of cost {cost}", enabled=with_print)
+        log_debug("%s tries left to generate a seed set of cost %s", tries, cost, enabled=with_print)
 
         if tries < 1:
-            log(text=f"No tries left to generate a seed set of cost {cost}, terminating the procees by excluding {excluded_ixs}", enabled=with_print)
-            log(text=f"Generated {len(seed_sets)} seed sets", enabled=with_print)
+            log_debug("No tries left to generate a seed set of cost %s, terminating the procees by excluding %s", cost, summarize_nodes(excluded_ixs), enabled=with_print)
+            log_debug("Generated %s seed sets", len(seed_sets), enabled=with_print)
             for seed_set in seed_sets:
-                log(text=f"- Generated seed set: {seed_set.seed_set}", enabled=with_print)
+                log_debug("- Generated seed set: %s", summarize_nodes(seed_set.seed_set), enabled=with_print)
             raise ValueError("Could not generate a seed set of the given cost")
 
         seed_set, excluded_ixs = seed_set_from_ordered_graph_given_cost(
@@ -239,12 +694,15 @@ def seed_sets_from_degree_ordered_graph_given_cost(
 
 
 def seed_set_from_graph_permutation_given_cost(nodes, nodes_cost_dict, cost=0):
+    if isinstance(nodes, CSRGraph):
+        return csr_seed_set_from_graph_permutation_given_cost(nodes, nodes_cost_dict, cost)
+
     nodes = list(nodes)
     nodes_cost = sum(nodes_cost_dict.values())
     if nodes_cost < cost:
         raise ValueError("The given cost is greater than the sum of the nodes\' costs")
     if nodes_cost == cost:
-        return GraphPermutationSeedSet(nodes, nodes)
+        return GraphPermutationSeedSet(nodes, nodes, node_index(nodes_cost_dict))
 
     # permute the nodes in the graph
     shuffle(nodes)
@@ -269,7 +727,26 @@ def seed_set_from_graph_permutation_given_cost(nodes, nodes_cost_dict, cost=0):
 
         ix += 1
 
-    return GraphPermutationSeedSet(list(seed_set), nodes)
+    return GraphPermutationSeedSet(list(seed_set), nodes, node_index(nodes_cost_dict))
+
+
+def csr_seed_set_from_graph_permutation_given_cost(csr_graph, nodes_cost=None, cost=0):
+    nodes_cost = csr_graph.cost if nodes_cost is None else nodes_cost
+    nodes = list(range(len(csr_graph)))
+
+    total_cost = int(nodes_cost.sum())
+    if total_cost < cost:
+        raise ValueError("The given cost is greater than the sum of the nodes\' costs")
+    if total_cost == cost:
+        return GraphPermutationSeedSet(np.array(nodes), np.array(nodes))
+
+    # permute the nodes in the graph
+    shuffle(nodes)
+
+    permutation = np.array(nodes)
+    taken, _ = budget_fill(nodes_cost[permutation], cost)
+
+    return GraphPermutationSeedSet(permutation[taken], permutation)
 
 
 def seed_sets_from_graph_permutation_given_cost(
@@ -279,20 +756,12 @@ def seed_sets_from_graph_permutation_given_cost(
     n=1,
     with_print=False,
 ):
-    seed_sets = set()
-
-    tries = n * 1_000_000
-    while len(seed_sets) < n:
-        log(text=f"{tries} tries left to generate a seed set of cost {cost}", enabled=with_print)
-
-        if tries < 1:
-            log(text=f"No tries left to generate a seed set of cost {cost}, terminating the process", enabled=with_print)
-            raise ValueError("Could not generate a seed set of the given cost")
-
-        seed_set = seed_set_from_graph_permutation_given_cost(nodes, nodes_cost_dict, cost)
-        seed_sets.add(seed_set)
-
-        tries -= 1
+    seed_sets, _ = unique_seed_sets(
+        lambda: seed_set_from_graph_permutation_given_cost(nodes, nodes_cost_dict, cost),
+        n=n,
+        strict=True,
+        with_print=with_print,
+    )
 
     return list(seed_sets)
 
@@ -321,7 +790,7 @@ def position_combine_seed_sets(s1, s2):
         _, node = heappop(max_heap)
         combined_set.append(node)
 
-    return GraphPermutationSeedSet(combined_set, position_combine_permutation(s1, s2))
+    return GraphPermutationSeedSet.from_ixs(s1.to_ixs(combined_set), position_combine_ixs(s1, s2), s1.index)
 
 
 def permutation_position_combine_seed_sets(
@@ -335,64 +804,136 @@ def permutation_position_combine_seed_sets(
     cost=0,
     generation_opt=1,
 ):
-    max_heap = []
-    s1_nodes_to_ixs = {node: ix for ix, node in enumerate(s1.permutation)}
-    s2_nodes_to_ixs = {node: ix for ix, node in enumerate(s2.permutation)}
+    return next(permutation_position_combine_candidates(
+        s1,
+        s2,
+        degrees=degrees,
+        exclude_ixs=exclude_ixs,
+        nodes_cost_dict=nodes_cost_dict,
+        a_range=a_range,
+        b_range=b_range,
+        cost=cost,
+        generation_opt=generation_opt,
+    ))
 
-    for node in s1.permutation:
-        s1_ix = s1_nodes_to_ixs[node]
-        s2_ix = s2_nodes_to_ixs[node]
-        node_score = (s1_ix + s2_ix) // 2
-        heappush(max_heap, (-node_score, node))
 
-    combined_set = []
-    while max_heap:
-        _, node = heappop(max_heap)
-        combined_set.append(node)
+def permutation_position_combine_candidates(
+    s1,
+    s2,
+    degrees=None,
+    exclude_ixs=None,
+    nodes_cost_dict=None,
+    a_range=None,
+    b_range=None,
+    cost=0,
+    generation_opt=1,
+):
+    """
+    Children of s1 and s2, as permutation_position_combine_seed_sets, with their
+    combined permutation computed once for all of them (e.g., for the retries until
+    a child is new). Each child draws its random numbers (the shuffle, or the degree
+    and cost factors) when it is generated, so the n-th child is the same as the
+    n-th call to permutation_position_combine_seed_sets.
+
+    When the seed sets are indexed as the nodes' costs, the children are built from
+    the node indices of the combined permutation, without turning it into nodes.
+    """
+    index = s1.index
+    combined_ixs = position_combine_ixs(s1, s2)
+
+    if generation_opt == 1 and index is not None and index is node_index(nodes_cost_dict):
+        while True:
+            yield seed_set_from_node_permutation_given_cost(index, combined_ixs, cost)
+
+    if generation_opt in (3, 4) and index is not None and index is node_order_index(nodes_cost_dict, degrees).node_index:
+        combined_set, node_ixs = None, combined_ixs
+    else:
+        combined_set, node_ixs = s1.to_labels(combined_ixs), None
+
+    while True:
+        if generation_opt == 1:
+            yield seed_set_from_graph_permutation_given_cost(combined_set, nodes_cost_dict, cost)
+        elif generation_opt == 2:
+            yield seed_set_from_ordered_graph_given_cost(
+                combined_set,
+                nodes_cost_dict,
+                key_func=lambda node: degrees[node],
+                cost=cost,
+                exclude_ixs=exclude_ixs,
+            )
+        elif generation_opt == 3:
+            yield seed_set_from_degreecost_graph_given_cost(
+                combined_set,
+                nodes_cost_dict,
+                degrees=degrees,
+                cost=cost,
+                a_range=a_range,
+                b_range=b_range,
+                node_ixs=node_ixs,
+            )
+        elif generation_opt == 4:
+            yield seed_set_from_degree_graph_given_cost(
+                combined_set,
+                nodes_cost_dict,
+                degrees=degrees,
+                cost=cost,
+                a_range=a_range,
+                node_ixs=node_ixs,
+            )
+        else:
+            raise ValueError(f"Unknown generation option {generation_opt}")
+
+
+def seed_set_from_node_permutation_given_cost(index, permutation_ixs, cost=0):
+    """
+    Same as seed_set_from_graph_permutation_given_cost, for the node indices of a
+    NodeIndex of the nodes' costs: the indices are shuffled with the same random
+    numbers as the nodes would be, and the budget walk is vectorized.
+    """
+    total_cost = int(index.cost.sum())
+    if total_cost < cost:
+        raise ValueError("The given cost is greater than the sum of the nodes\' costs")
+    if total_cost == cost:
+        return GraphPermutationSeedSet.from_ixs(permutation_ixs, permutation_ixs, index)
 
-    if generation_opt == 1:
-        return seed_set_from_graph_permutation_given_cost(combined_set, nodes_cost_dict, cost)
-    elif generation_opt == 2:
-        return seed_set_from_ordered_graph_given_cost(
-            combined_set,
-            nodes_cost_dict,
-            key_func=lambda node: degrees[node],
-            cost=cost,
-            exclude_ixs=exclude_ixs,
-        )
-    elif generation_opt == 3:
-        return seed_set_from_degreecost_graph_given_cost(
-            combined_set,
-            nodes_cost_dict,
-            degrees=degrees,
-            cost=cost,
-            a_range=a_range,
-            b_range=b_range,
-        )
-    elif generation_opt == 4:
-        return seed_set_from_degree_graph_given_cost(
-            combined_set,
-            nodes_cost_dict,
-            degrees=degrees,
-            cost=cost,
-            a_range=a_range,
-        )
+    # permute the nodes in the graph
+    permutation = permutation_ixs.tolist()
+    shuffle(permutation)
+    permutation = np.array(permutation, dtype=index.dtype)
 
+    taken, _ = budget_fill(index.cost[permutation], cost)
+    nodes = index.nodes
+    seed_set = {nodes[node_ix] for node_ix in permutation[taken].tolist()}
 
-def position_combine_permutation(s1, s2):
-    max_heap = []
-    s1_nodes_to_ixs = {node: ix for ix, node in enumerate(s1.permutation)}
-    s2_nodes_to_ixs = {node: ix for ix, node in enumerate(s2.permutation)}
+    return GraphPermutationSeedSet.from_ixs(index.ixs(list(seed_set)), permutation, index)
 
-    for node in s1.permutation:
-        s1_ix = s1_nodes_to_ixs[node]
-        s2_ix = s2_nodes_to_ixs[node]
-        node_score = (s1_ix + s2_ix) // 2
-        heappush(max_heap, (-node_score, node))
 
-    combined_permutation = []
-    while max_heap:
-        _, node = heappop(max_heap)
-        combined_permutation.append(node)
+def position_combine_ixs(s1, s2):
+    """
+    Node indices (in the index of s1) in descending order of their average position
+    (rounded down) in the permutations of s1 and s2, with ties in ascending order of
+    the nodes, as popping (-average position, node) from a heap of all the nodes.
+
+    The positions of the nodes are the inverse permutations, computed by indexing,
+    and the averages are sorted at once.
+    """
+    permutation1 = s1.permutation_ixs.astype(np.int64)
+    if s2.index is s1.index:
+        permutation2 = s2.permutation_ixs.astype(np.int64)
+    else:
+        permutation2 = s1.to_ixs(s2.permutation).astype(np.int64)
+
+    positions = np.arange(len(permutation1))
+    positions1 = np.empty_like(positions)
+    positions1[permutation1] = positions
+    positions2 = np.empty_like(positions)
+    positions2[permutation2] = positions
 
-    return combined_permutation
\ No newline at end of file
+    # the indices of a CSRGraph are the nodes, so they are their own ranks
+    ranks = s1.index.label_ranks() if s1.index is not None else positions
+    combined = np.lexsort((ranks, -((positions1 + positions2) // 2)))
+    return combined.astype(s1.permutation_ixs.dtype)
+
+
+def position_combine_permutation(s1, s2):
+    return s1.to_labels(position_combine_ixs(s1, s2))
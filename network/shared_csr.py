@@ -0,0 +1,106 @@
+import numpy as np
+from multiprocessing import shared_memory
+from .csr import CSRGraph, csr_threshold_influence_diffusion, load_memmap_csr_graph
+
+
+class SharedCSRGraph:
+    """
+    Copy of the arrays needed by the cascades of a CSRGraph (notification adjacency,
+    thresholds and costs) in shared memory blocks, so that worker processes can attach
+    to them once instead of receiving a pickled graph with every task.
+
+    The arrays of a memory-mapped CSRGraph are not copied: workers map the same files.
+    """
+
+
+    def __init__(self, csr_graph):
+        indptr, indices = csr_graph.reverse()
+        arrays = {
+            "indptr": indptr,
+            "indices": indices,
+            "threshold": csr_graph.threshold,
+            "cost": csr_graph.cost,
+        }
+
+        self.blocks = []
+        self.descriptor = {}
+
+        if csr_graph.directory is not None:
+            # workers map the files of the graph, only the arrays not on disk are shared
+            self.descriptor["directory"] = csr_graph.directory
+            arrays = {
+                name: array for name, array in arrays.items()
+                if name in ("threshold", "cost") and not isinstance(array, np.memmap)
+            }
+
+        for name, array in arrays.items():
+            if array is None:
+                continue
+
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+
+            self.blocks.append(block)
+            self.descriptor[name] = (block.name, array.shape, array.dtype.str)
+
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def attach_shared_csr_graph(descriptor):
+    """
+    Attach to the shared memory blocks (and files) of a SharedCSRGraph and return a
+    CSRGraph over them, together with the blocks (that must be kept alive while in use).
+    """
+    blocks = []
+    arrays = {}
+    for name, value in descriptor.items():
+        if name == "directory":
+            continue
+
+        block_name, shape, dtype = value
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+    if "directory" in descriptor:
+        csr_graph = load_memmap_csr_graph(descriptor["directory"])
+        return csr_graph.with_data(
+            threshold=arrays.get("threshold", csr_graph.threshold),
+            cost=arrays.get("cost", csr_graph.cost),
+        ), blocks
+
+    # the shared adjacency is already the notification one, so the
+    # graph is marked as undirected to have reverse() return it as is
+    csr_graph = CSRGraph(
+        nodes=None,
+        indptr=arrays["indptr"],
+        indices=arrays["indices"],
+        threshold=arrays.get("threshold"),
+        cost=arrays.get("cost"),
+        directed=False,
+    )
+    return csr_graph, blocks
+
+
+# state of a worker process, set once by init_shared_csr_worker
+_worker_csr_graph = None
+_worker_blocks = None
+
+
+def init_shared_csr_worker(descriptor):
+    global _worker_csr_graph, _worker_blocks
+    _worker_csr_graph, _worker_blocks = attach_shared_csr_graph(descriptor)
+
+
+def shared_csr_threshold_influence_diffusion(seed_set):
+    """
+    Task run by a worker process: influence the shared graph starting from the
+    given node indices and return the influenced indices and the number of steps.
+    """
+    return csr_threshold_influence_diffusion(_worker_csr_graph, seed_set)
@@ -1,3 +1,9 @@
 from .degree_simulation import DegreeSimulation, DegreeCostSimulation
+from .celf_simulation import CELFSimulation
+from .tss_simulation import TSSSimulation
 from .genetic_degree_simulation import GeneticDegreeSimulation, GeneticDegreeCostSimulation
-from .genetic_simulation import GeneticSimulation
\ No newline at end of file
+from .genetic_simulation import GeneticSimulation
+from .island_simulation import IslandSimulation
+from .evaluation import FitnessCache, PopulationEvaluator, cascade_edges
+from .metrics import SimulationMetrics
+from .checkpoint import SimulationCheckpoint, checkpoint_path, setup_fingerprint
\ No newline at end of file
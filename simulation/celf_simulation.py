@@ -0,0 +1,107 @@
+from heapq import heapify, heappop, heappush
+from typing import Any, Dict
+from network import *
+from utils import *
+from .degree_simulation import DegreeSimulation
+from .metrics import SimulationMetrics
+
+class CELFSimulation(DegreeSimulation):
+    """
+    Cost-aware greedy seed selection with lazy evaluations (CELF): the node with
+    the highest marginal gain (newly influenced nodes) per unit cost is added to
+    the seed set while its cost fits the budget.
+
+    The marginal gains are assumed to only get lower as the seed set grows, so each
+    node keeps in a priority queue the gain computed when it was last evaluated, and
+    only the node on top is evaluated again: if it is still on top, it is added
+    without evaluating the others. The gain of a node continues the cascade state of
+    the seed set (cascade_gain), so it only costs the nodes it influences.
+    """
+
+
+    def __init__(
+        self,
+        name="CELF",
+        cost=0,
+        nodes_threshold: Dict[Any, int]=None,
+        nodes_cost: Dict[Any, int]=None,
+        diffusion_engine="frontier",
+    ):
+        super().__init__(
+            name=name,
+            cost=cost,
+            nodes_threshold=nodes_threshold,
+            nodes_cost=nodes_cost,
+            diffusion_engine=diffusion_engine,
+        )
+
+
+    def run(self, graph_name="karate_club_graph"):
+        graph = graphs_by_name[graph_name]
+        self.metrics = SimulationMetrics(self.name)
+
+        log(text=f"Generating seed set with lazy greedy (marginal gain per unit cost) given a cost of {self.cost}\n")
+        seed_set = self.lazy_greedy_seed_set(graph)
+
+        self.metrics.lap("seed set")
+
+        epoch_sets, epoch_score = self.run_epoch(
+            graph=graph,
+            seed_sets=[seed_set], # only one seed set in this case
+            nodes_cost=self.nodes_cost,
+            nodes_threshold=self.nodes_threshold,
+        )
+
+        log(text=f"\n{GREEN}### Final CELF seed set ###{RESET}\n")
+        log_info("- %s", summarize_nodes(epoch_sets[0].seed_set))
+
+        log(text=f"\n{GREEN}### Metrics ###{RESET}\n")
+        log_info("%s\n", self.metrics)
+
+        return seed_set, epoch_score
+
+
+    def lazy_greedy_seed_set(self, graph):
+        state = cascade_state(graph, [], self.nodes_threshold)
+        budget = self.cost
+        seed_set = []
+
+        # (-gain per unit cost, position of the node, node, size of the seed set when evaluated)
+        queue = []
+        for position, node in enumerate(graph.nodes):
+            if self.nodes_cost[node] <= budget:
+                queue.append((-self.marginal_gain(graph, state, node) / self.nodes_cost[node], position, node, 0))
+        heapify(queue)
+
+        while queue:
+            ratio, position, node, evaluated_at = heappop(queue)
+            node_cost = self.nodes_cost[node]
+            if node_cost > budget:
+                # the budget only gets lower, so the node never fits again
+                continue
+
+            if evaluated_at < len(seed_set):
+                # stale gain: evaluate the node again with the current seed set
+                self.metrics.count("lazy evaluations")
+                heappush(queue, (-self.marginal_gain(graph, state, node) / node_cost, position, node, len(seed_set)))
+                continue
+
+            if ratio >= 0:
+                # no node left influences any new node
+                break
+
+            seed_set.append(node)
+            budget -= node_cost
+            state = incremental_cascade_state(graph, state, seed_set, self.nodes_threshold)
+            self.metrics.count("edges touched", state.edges)
+            log_debug("Added node %s with gain per unit cost %.3f: %d nodes influenced, %d budget left", node, -ratio, len(state), budget)
+
+        permutation = seed_set + [node for node in graph.nodes if node not in state.seed_set]
+        return GraphPermutationSeedSet(seed_set, permutation, node_index(self.nodes_cost))
+
+
+    def marginal_gain(self, graph, state, node):
+        gain, edges = cascade_gain(graph, state, [node], self.nodes_threshold)
+        self.metrics.count("gain evaluations")
+        self.metrics.count("edges touched", edges)
+        return gain
@@ -0,0 +1,115 @@
+import gzip
+import hashlib
+import os
+import pickle
+import random
+from utils import log_important
+
+# bumped whenever the pickled state changes (e.g., the layout of the seed sets)
+CHECKPOINT_VERSION = 2
+
+
+def setup_fingerprint(graph_name, nodes_threshold, nodes_cost):
+    """
+    Digest of the graph and of the nodes' thresholds and costs of a simulation, so a
+    checkpoint is only resumed by a simulation with the same setup (e.g., the same seed).
+    """
+    digest = hashlib.sha256(graph_name.encode())
+    digest.update(pickle.dumps(list(nodes_threshold.items()), protocol=pickle.HIGHEST_PROTOCOL))
+    digest.update(pickle.dumps(list(nodes_cost.items()), protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+class SimulationCheckpoint:
+    """
+    Checkpoint of a genetic simulation, saved at the end of every `every` epochs to a
+    gzipped pickle: the population (initial seed sets, current seed sets and
+    permutations), the scores of the epochs run, the state of the random module and
+    the fitness cache entries.
+
+    Resuming restores the random state, so the epochs left draw the same seed sets
+    and the run ends with the same results as an uninterrupted one.
+    """
+
+
+    def __init__(self, path, key, every=1):
+        self.path = path
+        # identifies the simulation (name, setup, cost and population size)
+        self.key = key
+        self.every = every
+
+
+    def is_due(self, epoch, epochs):
+        return self.every > 0 and ((epoch + 1) % self.every == 0 or epoch + 1 == epochs)
+
+
+    def save(self, epoch, seed_sets, max_score, epoch_scores, fitness_cache=None, metrics=None, **extra):
+        """
+        Save the state of the simulation after the given epoch (atomically, so an
+        interrupted save keeps the previous checkpoint).
+        """
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "key": self.key,
+            "epoch": epoch,
+            "seed_sets": seed_sets,
+            "max_score": max_score,
+            "epoch_scores": epoch_scores,
+            "random_state": random.getstate(),
+            "fitness_cache": list(fitness_cache.entries.items()) if fitness_cache is not None else None,
+            "metrics": metrics.to_dict() if metrics is not None else None,
+            **extra,
+        }
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wb", compresslevel=1) as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+
+    def load(self):
+        """
+        Return the saved state, or None if there is no checkpoint of this simulation.
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with gzip.open(self.path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as e:
+            # e.g., a checkpoint truncated by a killed process or pickled by an older version
+            log_important(text=f"Ignoring checkpoint {self.path} because of \"{e}\"")
+            return None
+        if not isinstance(state, dict) or state.get("version") != CHECKPOINT_VERSION or state.get("key") != self.key:
+            return None
+        return state
+
+
+    def resume(self, fitness_cache=None, metrics=None):
+        """
+        Load the saved state and restore the random state, the fitness cache entries and
+        the metrics from it. Returns the state, or None if there is no checkpoint.
+        """
+        state = self.load()
+        if state is None:
+            return None
+
+        random.setstate(state["random_state"])
+        if fitness_cache is not None and state["fitness_cache"] is not None:
+            for seed_set, (score, t, influenced) in state["fitness_cache"]:
+                fitness_cache.put(seed_set, score, t, influenced)
+        if metrics is not None and state["metrics"] is not None:
+            for phase, seconds in state["metrics"]["phases"].items():
+                metrics.phases[phase] += seconds
+            for counter, value in state["metrics"]["counters"].items():
+                metrics.counters[counter] += value
+
+        return state
+
+
+def checkpoint_path(name, checkpoint_dir="checkpoints"):
+    return os.path.join(checkpoint_dir, f"{name.replace(os.sep, '-')}.ckpt")
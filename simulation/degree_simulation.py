@@ -1,6 +1,8 @@
 from typing import Any, Dict
 from network import *
 from utils import *
+from .evaluation import cascade_edges
+from .metrics import SimulationMetrics
 
 class DegreeSimulation:
 
@@ -11,24 +13,30 @@ class DegreeSimulation:
         cost=0,
         nodes_threshold: Dict[Any, int]=None,
         nodes_cost: Dict[Any, int]=None,
+        diffusion_engine="frontier",
     ):
         self.name = name
         self.cost = cost
         self.nodes_threshold = nodes_threshold
         self.nodes_cost = nodes_cost
+        self.diffusion_engine = diffusion_engine
+        self.metrics = None
 
 
     def run(self, graph_name="karate_club_graph"):
         graph = graphs_by_name[graph_name]
+        self.metrics = SimulationMetrics(self.name)
 
         log(text=f"Generating seed sets from cost ordered graph given a cost of {self.cost}\n")
-        seed_set, _ = seed_set_from_ordered_graph_given_cost(
-            nodes=graph.nodes,
-            nodes_cost_dict=self.nodes_cost,
-            key_func=lambda node: graph.degree()[node],
+        index = node_order_index(self.nodes_cost, graph.degree())
+        seed_set, _ = seed_set_from_node_order_given_cost(
+            index=index,
+            order=index.order("degree"),
             cost=self.cost,
         )
 
+        self.metrics.lap("seed set")
+
         epoch_sets, epoch_score = self.run_epoch(
             graph=graph,
             seed_sets=[seed_set], # only one seed set in this case
@@ -37,7 +45,10 @@ class DegreeSimulation:
         )
 
         log(text=f"\n{GREEN}### Final degree seed set ###{RESET}\n")
-        log(text=f"- {epoch_sets[0].seed_set}")
+        log_info("- %s", summarize_nodes(epoch_sets[0].seed_set))
+
+        log(text=f"\n{GREEN}### Metrics ###{RESET}\n")
+        log_info("%s\n", self.metrics)
 
         # log(text=f"\n{GREEN}### Max score ###{RESET}\n")
         # log(text=f"Max score: {epoch_score}\n")
@@ -53,14 +64,15 @@ class DegreeSimulation:
         nodes_threshold,
     ):
         max_score = 0
+        self.metrics.mark()
 
         for i, s in enumerate(seed_sets):
-            log(text="\n---------------------------------------------\n")
-            log(text=f"{RED}### START Seed set {i}: {s} START ###{RESET}\n")
+            log_debug("\n---------------------------------------------\n")
+            log_debug(f"{RED}### START Seed set %d: %s START ###{RESET}\n", i, summarize_nodes(s))
             s_cost = seed_set_cost(s.seed_set, nodes_cost)
             s_score = seed_set_score(s.seed_set)
 
-            log(text=f"{YELLOW}Influencing nodes in the seed set {i} with initial cost {s_cost} and score {s_score}")
+            log_debug(f"{YELLOW}Influencing nodes in the seed set %d with initial cost %d and score %d", i, s_cost, s_score)
             print_seed_set(s)
             # start with a clean graph (without any influenced nodes)
             nodes_influenced = generate_nodes_influenced(graph.nodes)
@@ -69,24 +81,30 @@ class DegreeSimulation:
             # log(text=f"{RESET}Nodes influenced {i} at the start: {nodes_influenced}\n")
 
             # influence the nodes in the graph starting from the seed set i
-            s_influenced, t = threshold_influence_diffusion(
+            s_influenced, t = diffusion_engine_by_name(self.diffusion_engine)(
                 graph=graph,
                 seed_set=s.seed_set,
                 nodes_influenced=nodes_influenced,
                 nodes_threshold=nodes_threshold,
             )
             s.seed_set = s_influenced
+            self.metrics.lap("diffusion")
+            self.metrics.count("cascades")
+            self.metrics.count("diffusion rounds", t)
+            self.metrics.count("nodes touched", len(s_influenced))
+            self.metrics.count("edges touched", cascade_edges(graph, s_influenced))
 
-            log(text=f"{YELLOW}Influenced seed set {i} in {t} steps:")
+            log_debug(f"{YELLOW}Influenced seed set %d in %d steps:", i, t)
             print_seed_set(s_influenced)
             # log(text=f"{RESET}Nodes influenced {i} at the end: {nodes_influenced}\n")
 
             s_influenced_cost = seed_set_cost(s_influenced, nodes_cost) - s_cost
             s_influenced_score = seed_set_score(s_influenced)
-            log(text=f"{GREEN}Cost of influenced seed set {i}: {s_influenced_cost}{RESET}")
-            log(text=f"{GREEN}Score of influenced seed set {i}: {s_influenced_score}\n{RESET}")
+            log_debug(f"{GREEN}Cost of influenced seed set %d: %d{RESET}", i, s_influenced_cost)
+            log_debug(f"{GREEN}Score of influenced seed set %d: %d\n{RESET}", i, s_influenced_score)
 
             max_score = max(max_score, s_influenced_score)
+            self.metrics.lap("logging")
 
         return seed_sets, max_score
 
@@ -100,31 +118,37 @@ class DegreeCostSimulation:
         cost=0,
         nodes_threshold: Dict[Any, int]=None,
         nodes_cost: Dict[Any, int]=None,
-        starting_seed_set=None
+        starting_seed_set=None,
+        diffusion_engine="frontier",
     ):
         self.name = name
         self.cost = cost
         self.nodes_threshold = nodes_threshold
         self.nodes_cost = nodes_cost
         self.starting_seed_set = starting_seed_set
+        self.diffusion_engine = diffusion_engine
+        self.metrics = None
 
 
     def run(self, graph_name="karate_club_graph"):
         graph = graphs_by_name[graph_name]
+        self.metrics = SimulationMetrics(self.name)
 
         seed_set = self.starting_seed_set
         if seed_set:
-            log(text=f"Starting seed set provided is {seed_set} with score {seed_set_score(seed_set.seed_set)}\n")
+            log_info("Starting seed set provided is %s with score %d\n", summarize_nodes(seed_set), seed_set_score(seed_set.seed_set))
         if not self.starting_seed_set:
-            log(text=f"No starting set provided: {self.starting_seed_set}")
+            log_info("No starting set provided: %s", self.starting_seed_set)
             log(text=f"Then, generating seed set from (degree/cost) ordered graph given a cost of {self.cost}\n")
-            seed_set, _ = seed_set_from_ordered_graph_given_cost(
-                nodes=graph.nodes,
-                nodes_cost_dict=self.nodes_cost,
-                key_func=lambda node: (graph.degree()[node] // self.nodes_cost[node]),
+            index = node_order_index(self.nodes_cost, graph.degree())
+            seed_set, _ = seed_set_from_node_order_given_cost(
+                index=index,
+                order=index.order("degree/cost"),
                 cost=self.cost,
             )
 
+        self.metrics.lap("seed set")
+
         epoch_sets, epoch_score = self.run_epoch(
             graph=graph,
             seed_sets=[seed_set], # only one seed set in this case
@@ -133,7 +157,10 @@ class DegreeCostSimulation:
         )
 
         log(text=f"\n{GREEN}### Final degree seed set ###{RESET}\n")
-        log(text=f"- {epoch_sets[0].seed_set}")
+        log_info("- %s", summarize_nodes(epoch_sets[0].seed_set))
+
+        log(text=f"\n{GREEN}### Metrics ###{RESET}\n")
+        log_info("%s\n", self.metrics)
 
         # log(text=f"\n{GREEN}### Max score ###{RESET}\n")
         # log(text=f"Max score: {epoch_score}\n")
@@ -149,14 +176,15 @@ class DegreeCostSimulation:
         nodes_threshold,
     ):
         max_score = 0
+        self.metrics.mark()
 
         for i, s in enumerate(seed_sets):
-            log(text="\n---------------------------------------------\n")
-            log(text=f"{RED}### START Seed set {i}: {s} START ###{RESET}\n")
+            log_debug("\n---------------------------------------------\n")
+            log_debug(f"{RED}### START Seed set %d: %s START ###{RESET}\n", i, summarize_nodes(s))
             s_cost = seed_set_cost(s.seed_set, nodes_cost)
             s_score = seed_set_score(s.seed_set)
 
-            log(text=f"{YELLOW}Influencing nodes in the seed set {i} with initial cost {s_cost} and score {s_score}")
+            log_debug(f"{YELLOW}Influencing nodes in the seed set %d with initial cost %d and score %d", i, s_cost, s_score)
             print_seed_set(s)
             # start with a clean graph (without any influenced nodes)
             nodes_influenced = generate_nodes_influenced(graph.nodes)
@@ -165,23 +193,29 @@ class DegreeCostSimulation:
             # log(text=f"{RESET}Nodes influenced {i} at the start: {nodes_influenced}\n")
 
             # influence the nodes in the graph starting from the seed set i
-            s_influenced, t = threshold_influence_diffusion(
+            s_influenced, t = diffusion_engine_by_name(self.diffusion_engine)(
                 graph=graph,
                 seed_set=s.seed_set,
                 nodes_influenced=nodes_influenced,
                 nodes_threshold=nodes_threshold,
             )
             s.seed_set = s_influenced
+            self.metrics.lap("diffusion")
+            self.metrics.count("cascades")
+            self.metrics.count("diffusion rounds", t)
+            self.metrics.count("nodes touched", len(s_influenced))
+            self.metrics.count("edges touched", cascade_edges(graph, s_influenced))
 
-            log(text=f"{YELLOW}Influenced seed set {i} in {t} steps:")
+            log_debug(f"{YELLOW}Influenced seed set %d in %d steps:", i, t)
             print_seed_set(s_influenced)
             # log(text=f"{RESET}Nodes influenced {i} at the end: {nodes_influenced}\n")
 
             s_influenced_cost = seed_set_cost(s_influenced, nodes_cost) - s_cost
             s_influenced_score = seed_set_score(s_influenced)
-            log(text=f"{GREEN}Cost of influenced seed set {i}: {s_influenced_cost}{RESET}")
-            log(text=f"{GREEN}Score of influenced seed set {i}: {s_influenced_score}\n{RESET}")
+            log_debug(f"{GREEN}Cost of influenced seed set %d: %d{RESET}", i, s_influenced_cost)
+            log_debug(f"{GREEN}Score of influenced seed set %d: %d\n{RESET}", i, s_influenced_score)
 
             max_score = max(max_score, s_influenced_score)
+            self.metrics.lap("logging")
 
         return seed_sets, max_score
\ No newline at end of file
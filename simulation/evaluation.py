@@ -0,0 +1,305 @@
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict
+from network import (
+    CSRGraph,
+    csr_threshold_influence_diffusion,
+    diffusion_engine_by_name,
+    batch_threshold_influence_diffusion,
+    cascade_state,
+    incremental_cascade_state,
+    csr_graph_from_networkx,
+    generate_nodes_influenced,
+    influence_nodes,
+    seed_set_score,
+)
+from network.shared_csr import (
+    SharedCSRGraph,
+    init_shared_csr_worker,
+    shared_csr_threshold_influence_diffusion,
+)
+
+
+def cascade_edges(graph, influenced):
+    """
+    Number of edges scanned by a cascade: each influenced node notifies its
+    neighbours (its predecessors in a digraph) once.
+    """
+    if isinstance(graph, CSRGraph):
+        indptr, _ = graph.reverse()
+        ixs = np.asarray(influenced, dtype=np.int64)
+        return int((indptr[ixs + 1] - indptr[ixs]).sum())
+
+    if graph.is_directed():
+        return sum(degree for _, degree in graph.in_degree(influenced))
+    return sum(degree for _, degree in graph.degree(influenced))
+
+
+class FitnessCache:
+    """
+    LRU memo of the cascades already evaluated, keyed by the initial seed set.
+
+    Each entry stores the score, the number of steps and the influenced set, and
+    the cache keeps at most max_size entries and (if given) max_nodes influenced
+    nodes overall, so that memory stays bounded on large graphs.
+    """
+
+
+    def __init__(self, max_size=512, max_nodes=None):
+        self.max_size = max_size
+        self.max_nodes = max_nodes
+        self.entries = OrderedDict()
+        self.num_nodes = 0
+        self.hits = 0
+        self.misses = 0
+
+
+    def __len__(self):
+        return len(self.entries)
+
+
+    def __contains__(self, seed_set):
+        return frozenset(seed_set) in self.entries
+
+
+    def get(self, seed_set):
+        key = frozenset(seed_set)
+        if key not in self.entries:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+
+    def put(self, seed_set, score, t, influenced):
+        key = frozenset(seed_set)
+        if key in self.entries:
+            self.num_nodes -= len(self.entries[key][2])
+
+        self.entries[key] = (score, t, influenced)
+        self.entries.move_to_end(key)
+        self.num_nodes += len(influenced)
+
+        # evict the least recently used entries
+        while self.entries and (
+            len(self.entries) > self.max_size or
+            (self.max_nodes is not None and self.num_nodes > self.max_nodes)
+        ):
+            _, (_, _, evicted) = self.entries.popitem(last=False)
+            self.num_nodes -= len(evicted)
+
+
+    def __str__(self):
+        return f"FitnessCache(entries={len(self)}, nodes={self.num_nodes}, hits={self.hits}, misses={self.misses})"
+
+
+class PopulationEvaluator:
+    """
+    Evaluate the seed sets of a population, either one cascade after the other
+    with the chosen diffusion engine, all the cascades in one batched pass or
+    spread over a pool of worker processes, skipping the seed sets already in
+    the fitness cache (if any).
+
+    With workers > 1 the graph is shared with the workers through shared memory
+    once per evaluator, and the cascades give the same results as the "csr" engine.
+
+    With incremental_diffusion the evaluator keeps the cascade states (activation
+    rounds) of the last max_cascade_states seed sets, and the cascade of a seed set
+    continues the one of the closest of them (e.g., a parent of a combined seed set)
+    instead of starting from an empty graph, if they differ by at most
+    max_incremental_change of the seeds.
+    """
+
+
+    def __init__(
+        self,
+        graph,
+        nodes_threshold: Dict[Any, int]=None,
+        diffusion_engine="frontier",
+        batch_diffusion=False,
+        fitness_cache: FitnessCache=None,
+        workers=0,
+        nodes_cost: Dict[Any, int]=None,
+        metrics=None,
+        incremental_diffusion=False,
+        max_cascade_states=64,
+        max_incremental_change=0.25,
+    ):
+        self.graph = graph
+        self.nodes_threshold = nodes_threshold
+        self.diffusion_engine = diffusion_engine
+        self.batch_diffusion = batch_diffusion
+        self.fitness_cache = fitness_cache
+        self.workers = workers
+        self.nodes_cost = nodes_cost
+        self.metrics = metrics
+        self.incremental_diffusion = incremental_diffusion
+        self.max_cascade_states = max_cascade_states
+        self.max_incremental_change = max_incremental_change
+        self.cascade_states = OrderedDict()
+        self.csr_graph = None
+        self.shared_csr_graph = None
+        self.executor = None
+
+
+    def evaluate(self, seed_sets, initial_seed_sets=None):
+        """
+        Influence the graph starting from each seed set.
+
+        Args:
+            seed_sets (list): Seed sets, as lists of nodes.
+            initial_seed_sets (list): Initial seed sets, used as fitness cache keys
+                                      (the seed sets themselves if not given).
+
+        Returns a list with the influenced set and the number of steps of each seed set.
+        """
+        if self.fitness_cache is None:
+            return self.evaluate_all(seed_sets)
+
+        keys = initial_seed_sets if initial_seed_sets is not None else seed_sets
+        evaluations = [None] * len(seed_sets)
+
+        # positions of the seed sets to evaluate, grouped by key so that
+        # a seed set repeated in the population is evaluated only once
+        missing = OrderedDict()
+        for i, key in enumerate(keys):
+            key = frozenset(key)
+            if key in missing:
+                self.fitness_cache.hits += 1
+                missing[key].append(i)
+                continue
+
+            cached = self.fitness_cache.get(key)
+            if cached:
+                _, t, influenced = cached
+                evaluations[i] = (influenced, t)
+            else:
+                missing[key] = [i]
+
+        missing_evaluations = self.evaluate_all([seed_sets[ixs[0]] for ixs in missing.values()])
+        for (key, ixs), (influenced, t) in zip(missing.items(), missing_evaluations):
+            self.fitness_cache.put(key, seed_set_score(influenced), t, influenced)
+            for i in ixs:
+                evaluations[i] = (influenced, t)
+
+        return evaluations
+
+
+    def evaluate_all(self, seed_sets):
+        if not seed_sets:
+            return []
+
+        edges = None
+        if self.workers > 1:
+            evaluations = self.evaluate_in_workers(seed_sets)
+        elif self.incremental_diffusion and not isinstance(self.graph, CSRGraph):
+            states = [self.evaluate_incremental(seed_set) for seed_set in seed_sets]
+            evaluations = [(state.influenced, state.t) for state in states]
+            edges = [state.edges for state in states]
+        elif self.batch_diffusion:
+            influenced_sets, _, steps = batch_threshold_influence_diffusion(
+                graph=self.graph,
+                seed_sets=seed_sets,
+                nodes_threshold=self.nodes_threshold,
+            )
+            evaluations = list(zip(influenced_sets, steps))
+        else:
+            evaluations = [self.evaluate_one(seed_set) for seed_set in seed_sets]
+
+        if self.metrics is not None:
+            self.metrics.count("cascades", len(evaluations))
+            for i, (influenced, t) in enumerate(evaluations):
+                self.metrics.count("diffusion rounds", t)
+                self.metrics.count("nodes touched", len(influenced))
+                self.metrics.count("edges touched", edges[i] if edges else cascade_edges(self.graph, influenced))
+
+        return evaluations
+
+
+    def evaluate_one(self, seed_set):
+        if isinstance(self.graph, CSRGraph):
+            # seed sets of a CSRGraph (e.g., a memory-mapped one) are node indices
+            return csr_threshold_influence_diffusion(self.graph, seed_set, self.nodes_threshold)
+
+        # start with a clean graph (without any influenced nodes)
+        nodes_influenced = generate_nodes_influenced(self.graph.nodes)
+        # influence the node in the seed set
+        nodes_influenced = influence_nodes(seed_set, nodes_influenced)
+
+        return diffusion_engine_by_name(self.diffusion_engine)(
+            graph=self.graph,
+            seed_set=seed_set,
+            nodes_influenced=nodes_influenced,
+            nodes_threshold=self.nodes_threshold,
+        )
+
+
+    def evaluate_incremental(self, seed_set):
+        key = frozenset(seed_set)
+
+        # continue from the stored state whose seed set differs the least, when the
+        # changed seeds are few enough for the continued cascade to be the cheaper one
+        parent, distance = None, self.max_incremental_change * len(key)
+        for state in self.cascade_states.values():
+            state_distance = len(key ^ state.seed_set)
+            if state_distance <= distance:
+                parent, distance = state, state_distance
+
+        if parent is None:
+            state = cascade_state(self.graph, seed_set, self.nodes_threshold)
+        else:
+            state = incremental_cascade_state(self.graph, parent, key, self.nodes_threshold)
+            if self.metrics is not None:
+                self.metrics.count("incremental cascades")
+
+        self.cascade_states[key] = state
+        self.cascade_states.move_to_end(key)
+        while len(self.cascade_states) > self.max_cascade_states:
+            self.cascade_states.popitem(last=False)
+
+        return state
+
+
+    def evaluate_in_workers(self, seed_sets):
+        if self.executor is None:
+            if isinstance(self.graph, CSRGraph):
+                self.csr_graph = self.graph.with_data(
+                    threshold=self.graph.threshold if self.nodes_threshold is None else self.nodes_threshold,
+                    cost=self.graph.cost if self.nodes_cost is None else self.nodes_cost,
+                )
+            else:
+                self.csr_graph = csr_graph_from_networkx(self.graph, self.nodes_threshold, self.nodes_cost)
+            self.shared_csr_graph = SharedCSRGraph(self.csr_graph)
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_shared_csr_worker,
+                initargs=(self.shared_csr_graph.descriptor,),
+            )
+
+        if isinstance(self.graph, CSRGraph):
+            return list(self.executor.map(
+                shared_csr_threshold_influence_diffusion,
+                seed_sets,
+                chunksize=max(1, len(seed_sets) // (self.workers * 4)),
+            ))
+
+        results = self.executor.map(
+            shared_csr_threshold_influence_diffusion,
+            [self.csr_graph.to_ixs(seed_set) for seed_set in seed_sets],
+            chunksize=max(1, len(seed_sets) // (self.workers * 4)),
+        )
+
+        return [(self.csr_graph.to_labels(influenced), t) for influenced, t in results]
+
+
+    def close(self):
+        # stop the worker processes and release the shared memory
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.shared_csr_graph is not None:
+            self.shared_csr_graph.close()
+            self.shared_csr_graph = None
@@ -2,6 +2,8 @@ from typing import Any, Dict
 from network import *
 from utils import *
 from heapq import *
+from .evaluation import FitnessCache, PopulationEvaluator
+from .metrics import SimulationMetrics
 from copy import deepcopy
 
 class GeneticDegreeSimulation:
@@ -16,7 +18,14 @@ class GeneticDegreeSimulation:
         a_range=None,
         nodes_threshold: Dict[Any, int]=None,
         nodes_cost: Dict[Any, int]=None,
+        diffusion_engine="frontier",
+        batch_diffusion=False,
+        incremental_diffusion=False,
+        fitness_cache_size=512,
+        workers=0,
         with_first_total=True,
+        checkpoint=None,
+        resume=False,
     ):
         self.name = name
         self.cost = cost
@@ -25,35 +34,77 @@ class GeneticDegreeSimulation:
         self.a_range = a_range if a_range else [1, 1]
         self.nodes_threshold = nodes_threshold
         self.nodes_cost = nodes_cost
+        self.diffusion_engine = diffusion_engine
+        self.batch_diffusion = batch_diffusion
+        self.incremental_diffusion = incremental_diffusion
+        self.fitness_cache_size = fitness_cache_size
+        self.workers = workers
+        # SimulationCheckpoint saved every checkpoint.every epochs, and resumed if resume is set
+        self.checkpoint = checkpoint
+        self.resume = resume
+        # called with the epoch and the new population after each epoch (e.g., by an IslandSimulation)
+        self.migration = None
+        self.evaluator = None
+        self.metrics = None
         self.with_first_total = with_first_total
 
 
     def run(self, graph_name="karate_club_graph"):
         graph = graphs_by_name[graph_name]
-
-        log(text=f"Generating {self.n} seed sets from degree given a cost of {self.cost}\n")
-        seed_sets = seed_sets_from_degree_graph_given_cost(
-            nodes=graph.nodes,
-            nodes_cost_dict=self.nodes_cost,
-            degrees=graph.degree(),
-            cost=self.cost,
-            n=self.n,
-            a_range=self.a_range,
-            with_print=True,
+        self.metrics = SimulationMetrics(self.name)
+        self.evaluator = PopulationEvaluator(
+            graph=graph,
+            nodes_threshold=self.nodes_threshold,
+            diffusion_engine=self.diffusion_engine,
+            batch_diffusion=self.batch_diffusion,
+            incremental_diffusion=self.incremental_diffusion,
+            fitness_cache=FitnessCache(self.fitness_cache_size) if self.fitness_cache_size else None,
+            workers=self.workers,
+            nodes_cost=self.nodes_cost,
+            metrics=self.metrics,
         )
 
-        max_score = 0
-        epoch_scores = {0: 0}
-        for epoch in range(self.epochs):
-            log(text=f"\n{BLUE}### EPOCH {epoch} ###{RESET}\n")
-            epoch_sets, epoch_score = self.run_epoch(graph=graph, seed_sets=seed_sets)
-            seed_sets = epoch_sets
-            max_score = max(max_score, epoch_score)
-            epoch_scores[epoch] = epoch_score
+        # the evaluator's worker processes and shared memory are released even if the run fails
+        try:
+            self.metrics.mark()
+            state = self.resume_checkpoint()
+            if state is not None:
+                seed_sets = state["seed_sets"]
+            else:
+                log(text=f"Generating {self.n} seed sets from degree given a cost of {self.cost}\n")
+                seed_sets = seed_sets_from_degree_graph_given_cost(
+                    nodes=graph.nodes,
+                    nodes_cost_dict=self.nodes_cost,
+                    degrees=graph.degree(),
+                    cost=self.cost,
+                    n=self.n,
+                    a_range=self.a_range,
+                    with_print=True,
+                )
+                self.metrics.lap("population")
+
+            max_score = state["max_score"] if state is not None else 0
+            epoch_scores = state["epoch_scores"] if state is not None else {0: 0}
+            first_epoch = state["epoch"] + 1 if state is not None else 0
+            for epoch in range(first_epoch, self.epochs):
+                log(text=f"\n{BLUE}### EPOCH {epoch} ###{RESET}\n")
+                epoch_sets, epoch_score = self.run_epoch(graph=graph, seed_sets=seed_sets)
+                seed_sets = epoch_sets
+                max_score = max(max_score, epoch_score)
+                epoch_scores[epoch] = epoch_score
+                if self.migration is not None:
+                    seed_sets = self.migration(epoch, seed_sets)
+
+                if self.checkpoint is not None and self.checkpoint.is_due(epoch, self.epochs):
+                    self.checkpoint.save(epoch, seed_sets, max_score, epoch_scores, self.evaluator.fitness_cache, self.metrics)
+                    self.metrics.lap("checkpoint")
+        finally:
+            self.evaluator.close()
+        self.metrics.count_cache(self.evaluator.fitness_cache)
 
         log(text=f"\n{GREEN}### Final seed sets ###{RESET}\n")
         for i, s in enumerate(seed_sets):
-            log(text=f"Final seed set {i} -> {s.seed_set}")
+            log_info("Final seed set %d -> %s", i, summarize_nodes(s.seed_set))
 
         log(text=f"\n{GREEN}### Max score ###{RESET}\n")
         log(text=f"Max score: {max_score}\n")
@@ -62,106 +113,133 @@ class GeneticDegreeSimulation:
             log(text=f"Epoch {epoch} score: {score}")
         log()
 
+        if self.evaluator.fitness_cache is not None:
+            fitness_cache = self.evaluator.fitness_cache
+            log(text=f"\n{GREEN}### Fitness cache ###{RESET}\n")
+            log(text=f"Hits: {fitness_cache.hits}, misses: {fitness_cache.misses}, entries: {len(fitness_cache)}\n")
+
+        log(text=f"\n{GREEN}### Metrics ###{RESET}\n")
+        log_info("%s\n", self.metrics)
+
         return seed_sets, max_score, epoch_scores
 
 
+    def resume_checkpoint(self):
+        """
+        Restore the state saved after the last completed epoch, if resuming from a checkpoint.
+        """
+        if not self.resume or self.checkpoint is None:
+            return None
+
+        state = self.checkpoint.resume(self.evaluator.fitness_cache, self.metrics)
+        if state is None:
+            log_important(text=f"No checkpoint of {self.name} to resume in {self.checkpoint.path}")
+            return None
+
+        log(text=f"Resuming {self.name} after epoch {state['epoch']} from {self.checkpoint.path}\n")
+        self.metrics.lap("checkpoint")
+        return state
+
+
     def run_epoch(self, graph, seed_sets):
         max_score = 0
+        self.metrics.mark()
+        self.metrics.count("epochs")
+
+        # influence the nodes in the graph starting from each seed set of the population
+        # (survivors were already evaluated, so they are looked up by their initial seed set)
+        evaluations = self.evaluator.evaluate(
+            seed_sets=[s.seed_set for s in seed_sets],
+            initial_seed_sets=[s.initial_seed_set for s in seed_sets],
+        )
+        self.metrics.lap("diffusion")
 
         # the max heap will store the seed set cost and the seed set index
         # so, if we want the top 5 seed sets, we can pop 5 times from the heap
         max_heap = []
         for i, s in enumerate(seed_sets):
-            log(text="\n---------------------------------------------\n")
-            log(text=f"{RED}### START Seed set {i}: {s} START ###{RESET}\n")
+            log_debug("\n---------------------------------------------\n")
+            log_debug(f"{RED}### START Seed set %d: %s START ###{RESET}\n", i, summarize_nodes(s))
             s_cost = seed_set_cost(s.seed_set, self.nodes_cost)
             s_score = seed_set_score(s.seed_set)
 
-            log(text=f"{YELLOW}Influencing nodes in the seed set {i} with initial cost {s_cost} and score {s_score}")
+            log_debug(f"{YELLOW}Influencing nodes in the seed set %d with initial cost %d and score %d", i, s_cost, s_score)
             print_seed_set(s)
-            # start with a clean graph (without any influenced nodes)
-            nodes_influenced = generate_nodes_influenced(graph.nodes)
-            # influence the node in the seed set i
-            nodes_influenced = influence_nodes(s.seed_set, nodes_influenced)
-            # log(text=f"{RESET}Nodes influenced {i} at the start: {nodes_influenced}\n")
-
-            # influence the nodes in the graph starting from the seed set i
-            s_influenced, t = threshold_influence_diffusion(
-                graph=graph,
-                seed_set=s.seed_set,
-                nodes_influenced=nodes_influenced,
-                nodes_threshold=self.nodes_threshold,
-            )
+            s_influenced, t = evaluations[i]
             s.seed_set = s_influenced
 
-            log(text=f"{YELLOW}Influenced seed set {i} in {t} steps:")
+            log_debug(f"{YELLOW}Influenced seed set %d in %d steps:", i, t)
             print_seed_set(s_influenced)
-            # log(text=f"{RESET}Nodes influenced {i} at the end: {nodes_influenced}\n")
 
             s_influenced_cost = seed_set_cost(s_influenced, self.nodes_cost) - s_cost
             s_influenced_score = seed_set_score(s_influenced)
-            log(text=f"{GREEN}Cost of influenced seed set {i}: {s_influenced_cost}{RESET}")
-            log(text=f"{GREEN}Score of influenced seed set {i}: {s_influenced_score}\n{RESET}")
+            log_debug(f"{GREEN}Cost of influenced seed set %d: %d{RESET}", i, s_influenced_cost)
+            log_debug(f"{GREEN}Score of influenced seed set %d: %d\n{RESET}", i, s_influenced_score)
 
             max_score = max(max_score, s_influenced_score)
 
             heappush(max_heap, (-s_influenced_score, i))
 
-            log(text=f"{RED}### ENDING Seed set {i} ENDING ###{RESET}")
-            log(text="\n---------------------------------------------\n")
-            log()
+            log_debug(f"{RED}### ENDING Seed set %d ENDING ###{RESET}", i)
+            log_debug("\n---------------------------------------------\n")
+            log_debug("")
 
-        log(text="\n---------------------------------------------\n")
-        log(text=f"{RED}### Creating new population ###{RESET}\n")
+        log_debug("\n---------------------------------------------\n")
+        log_debug(f"{RED}### Creating new population ###{RESET}\n")
 
-        log(text=f"{RED}### Creating top 50% sets ###{RESET}\n")
+        log_debug(f"{RED}### Creating top 50% sets ###{RESET}\n")
         top_50_len = len(max_heap) // 2
         top_50_sets = []
-        log(text=f"{GREEN}Top 50% ({top_50_len} sets) influencing seed sets:{RESET}")
+        log_debug(f"{GREEN}Top 50%% (%d sets) influencing seed sets:{RESET}", top_50_len)
         for _ in range(top_50_len):
             score, i = heappop(max_heap)
-            log(text=f"- Seed set {i} with score {-score} -> current: {seed_sets[i].seed_set} | initial: {seed_sets[i].initial_seed_set}")
+            log_debug("- Seed set %d with score %d -> current: %s | initial: %s", i, -score, summarize_nodes(seed_sets[i].seed_set), summarize_nodes(seed_sets[i].initial_seed_set))
             top_50_sets.append(seed_sets[i])
 
-        log(text=f"\n{RED}### Creating random sets ###{RESET}")
+        self.metrics.lap("selection")
+
+        log_debug(f"\n{RED}### Creating random sets ###{RESET}")
         random_len = (self.n - top_50_len) // 2
-        random_sets = set()
-        while len(random_sets) < random_len:
-            random_set = seed_set_from_degree_graph_given_cost(
+        # a generator reaching no new seed sets gives less random sets instead of spinning
+        random_sets, duplicates = unique_seed_sets(
+            lambda: seed_set_from_degree_graph_given_cost(
                 nodes=graph.nodes,
                 nodes_cost_dict=self.nodes_cost,
                 degrees=graph.degree(),
                 cost=self.cost,
                 a_range=self.a_range,
-            )
-            if (
-                random_set in random_sets or random_set in top_50_sets
-            ):
-                continue
-            random_sets.add(random_set)
+            ),
+            n=random_len,
+            exclude=top_50_sets,
+            max_duplicates=degree_order_max_duplicates(self.a_range),
+        )
+        self.metrics.count("random set retries", duplicates)
+        self.metrics.lap("random sets")
 
-        log(text=f"\n{GREEN}Random ({random_len} sets) influencing seed sets:{RESET}")
+        log_debug(f"\n{GREEN}Random (%d sets) influencing seed sets:{RESET}", len(random_sets))
         for i, s in enumerate(random_sets):
-            log(text=f"- Seed set {i} -> {s.seed_set}")
+            log_debug("- Seed set %d -> %s", i, summarize_nodes(s.seed_set))
 
-        log(text=f"\n{GREEN}Combination ({random_len} sets) influencing seed sets:{RESET}\n")
+        log_debug(f"\n{GREEN}Combination (%d sets) influencing seed sets:{RESET}\n", random_len)
         combined_sets = set()
         for i in range(0, len(top_50_sets), 2):
             s1 = top_50_sets[i]
             s2 = top_50_sets[i + 1]
 
+            # the combined permutation of s1 and s2 is computed once for all the retries
+            candidates = permutation_position_combine_candidates(
+                s1=s1,
+                s2=s2,
+                nodes_cost_dict=self.nodes_cost,
+                degrees=graph.degree(),
+                a_range=self.a_range,
+                cost=self.cost,
+                generation_opt=4,
+            )
             found = False
             iterations = self.cost * 2
             while not found and iterations > 0:
-                combined_set = permutation_position_combine_seed_sets(
-                    s1=s1,
-                    s2=s2,
-                    nodes_cost_dict=self.nodes_cost,
-                    degrees=graph.degree(),
-                    a_range=self.a_range,
-                    cost=self.cost,
-                    generation_opt=4,
-                )
+                combined_set = next(candidates)
                 if (
                     combined_set not in combined_sets and \
                     combined_set not in top_50_sets and \
@@ -169,20 +247,23 @@ class GeneticDegreeSimulation:
                 ):
                     combined_sets.add(combined_set)
                     found = True
-                    log(text=f"- Combining seed sets {i} and {i + 1} with resulting seed set {i} -> {combined_set.seed_set}")
+                    log_debug("- Combining seed sets %d and %d with resulting seed set %d -> %s", i, i + 1, i, summarize_nodes(combined_set.seed_set))
+                self.metrics.count("combination attempts")
                 iterations -= 1
+        self.metrics.lap("combination")
 
-        log(text="\n---------------------------------------------\n")
-        log(text=f"{RED}### Resulting new population ###{RESET}\n")
+        log_debug("\n---------------------------------------------\n")
+        log_debug(f"{RED}### Resulting new population ###{RESET}\n")
 
         seed_sets = top_50_sets + list(random_sets) + list(combined_sets)
         for i, s in enumerate(seed_sets):
-            log(text=f"New seed set {i} -> {s.seed_set}")
+            log_debug("New seed set %d -> %s", i, summarize_nodes(s.seed_set))
 
-        log(text="\n---------------------------------------------\n")
+        log_debug("\n---------------------------------------------\n")
 
-        log(text=f"{RED}### Epoch score ###{RESET}\n")
-        log(text=f"Epoch score: {max_score}\n")
+        log_debug(f"{RED}### Epoch score ###{RESET}\n")
+        log_info("Epoch score: %d\n", max_score)
+        self.metrics.lap("logging")
 
         return seed_sets, max_score
 
@@ -200,8 +281,15 @@ class GeneticDegreeCostSimulation:
         b_range=None,
         nodes_threshold: Dict[Any, int]=None,
         nodes_cost: Dict[Any, int]=None,
+        diffusion_engine="frontier",
+        batch_diffusion=False,
+        incremental_diffusion=False,
+        fitness_cache_size=512,
+        workers=0,
         with_first_total=True,
         with_best_of_starting_population=False,
+        checkpoint=None,
+        resume=False,
     ):
         self.name = name
         self.cost = cost
@@ -211,6 +299,18 @@ class GeneticDegreeCostSimulation:
         self.b_range = b_range if b_range else [1, 1]
         self.nodes_threshold = nodes_threshold
         self.nodes_cost = nodes_cost
+        self.diffusion_engine = diffusion_engine
+        self.batch_diffusion = batch_diffusion
+        self.incremental_diffusion = incremental_diffusion
+        self.fitness_cache_size = fitness_cache_size
+        self.workers = workers
+        # SimulationCheckpoint saved every checkpoint.every epochs, and resumed if resume is set
+        self.checkpoint = checkpoint
+        self.resume = resume
+        # called with the epoch and the new population after each epoch (e.g., by an IslandSimulation)
+        self.migration = None
+        self.evaluator = None
+        self.metrics = None
         self.with_first_total = with_first_total
         self.with_best_of_starting_population = with_best_of_starting_population
         self.best_of_starting_population = None
@@ -218,35 +318,66 @@ class GeneticDegreeCostSimulation:
 
     def run(self, graph_name="karate_club_graph"):
         graph = graphs_by_name[graph_name]
-
-        log(text=f"Generating {self.n} seed sets from degree/cost given a cost of {self.cost}\n")
-        seed_sets = seed_sets_from_degreecost_graph_given_cost(
-            nodes=graph.nodes,
-            nodes_cost_dict=self.nodes_cost,
-            degrees=graph.degree(),
-            cost=self.cost,
-            n=self.n,
-            a_range=self.a_range,
-            b_range=self.b_range,
-            with_first_total=self.with_first_total,
+        self.metrics = SimulationMetrics(self.name)
+        self.evaluator = PopulationEvaluator(
+            graph=graph,
+            nodes_threshold=self.nodes_threshold,
+            diffusion_engine=self.diffusion_engine,
+            batch_diffusion=self.batch_diffusion,
+            incremental_diffusion=self.incremental_diffusion,
+            fitness_cache=FitnessCache(self.fitness_cache_size) if self.fitness_cache_size else None,
+            workers=self.workers,
+            nodes_cost=self.nodes_cost,
+            metrics=self.metrics,
         )
 
-        if self.with_best_of_starting_population:
-            self.best_of_starting_population = deepcopy(max(seed_sets, key=lambda s: seed_set_score(s.seed_set)))
-            log(text=f"Best seed set: {self.best_of_starting_population} with score {seed_set_score(self.best_of_starting_population.seed_set)}")
-
-        max_score = 0
-        epoch_scores = {0: 0}
-        for epoch in range(self.epochs):
-            log(text=f"\n{BLUE}### EPOCH {epoch} ###{RESET}\n")
-            epoch_sets, epoch_score = self.run_epoch(graph=graph, seed_sets=seed_sets)
-            seed_sets = epoch_sets
-            max_score = max(max_score, epoch_score)
-            epoch_scores[epoch] = epoch_score
+        # the evaluator's worker processes and shared memory are released even if the run fails
+        try:
+            self.metrics.mark()
+            state = self.resume_checkpoint()
+            if state is not None:
+                seed_sets = state["seed_sets"]
+                self.best_of_starting_population = state["best_of_starting_population"]
+            else:
+                log(text=f"Generating {self.n} seed sets from degree/cost given a cost of {self.cost}\n")
+                seed_sets = seed_sets_from_degreecost_graph_given_cost(
+                    nodes=graph.nodes,
+                    nodes_cost_dict=self.nodes_cost,
+                    degrees=graph.degree(),
+                    cost=self.cost,
+                    n=self.n,
+                    a_range=self.a_range,
+                    b_range=self.b_range,
+                    with_first_total=self.with_first_total,
+                )
+                self.metrics.lap("population")
+
+                if self.with_best_of_starting_population:
+                    self.best_of_starting_population = deepcopy(max(seed_sets, key=lambda s: seed_set_score(s.seed_set)))
+                    log_info("Best seed set: %s with score %d", summarize_nodes(self.best_of_starting_population), seed_set_score(self.best_of_starting_population.seed_set))
+
+            max_score = state["max_score"] if state is not None else 0
+            epoch_scores = state["epoch_scores"] if state is not None else {0: 0}
+            first_epoch = state["epoch"] + 1 if state is not None else 0
+            for epoch in range(first_epoch, self.epochs):
+                log(text=f"\n{BLUE}### EPOCH {epoch} ###{RESET}\n")
+                epoch_sets, epoch_score = self.run_epoch(graph=graph, seed_sets=seed_sets)
+                seed_sets = epoch_sets
+                max_score = max(max_score, epoch_score)
+                epoch_scores[epoch] = epoch_score
+                if self.migration is not None:
+                    seed_sets = self.migration(epoch, seed_sets)
+
+                if self.checkpoint is not None and self.checkpoint.is_due(epoch, self.epochs):
+                    self.checkpoint.save(epoch, seed_sets, max_score, epoch_scores, self.evaluator.fitness_cache, self.metrics, best_of_starting_population=self.best_of_starting_population)
+                    self.metrics.lap("checkpoint")
+        finally:
+            self.evaluator.close()
+        self.metrics.count_cache(self.evaluator.fitness_cache)
 
         log(text=f"\n{GREEN}### Final seed sets ###{RESET}\n")
         for i, s in enumerate(seed_sets):
-            log(text=f"Final seed set {i} -> {s.seed_set}")
+            log_info("Final seed set %d -> %s", i, summarize_nodes(s.seed_set))
 
         log(text=f"\n{GREEN}### Max score ###{RESET}\n")
         log(text=f"Max score: {max_score}\n")
@@ -255,108 +386,135 @@ class GeneticDegreeCostSimulation:
             log(text=f"Epoch {epoch} score: {score}")
         log()
 
+        if self.evaluator.fitness_cache is not None:
+            fitness_cache = self.evaluator.fitness_cache
+            log(text=f"\n{GREEN}### Fitness cache ###{RESET}\n")
+            log(text=f"Hits: {fitness_cache.hits}, misses: {fitness_cache.misses}, entries: {len(fitness_cache)}\n")
+
+        log(text=f"\n{GREEN}### Metrics ###{RESET}\n")
+        log_info("%s\n", self.metrics)
+
         return seed_sets, max_score, epoch_scores, self.best_of_starting_population
 
 
+    def resume_checkpoint(self):
+        """
+        Restore the state saved after the last completed epoch, if resuming from a checkpoint.
+        """
+        if not self.resume or self.checkpoint is None:
+            return None
+
+        state = self.checkpoint.resume(self.evaluator.fitness_cache, self.metrics)
+        if state is None:
+            log_important(text=f"No checkpoint of {self.name} to resume in {self.checkpoint.path}")
+            return None
+
+        log(text=f"Resuming {self.name} after epoch {state['epoch']} from {self.checkpoint.path}\n")
+        self.metrics.lap("checkpoint")
+        return state
+
+
     def run_epoch(self, graph, seed_sets):
         max_score = 0
+        self.metrics.mark()
+        self.metrics.count("epochs")
+
+        # influence the nodes in the graph starting from each seed set of the population
+        # (survivors were already evaluated, so they are looked up by their initial seed set)
+        evaluations = self.evaluator.evaluate(
+            seed_sets=[s.seed_set for s in seed_sets],
+            initial_seed_sets=[s.initial_seed_set for s in seed_sets],
+        )
+        self.metrics.lap("diffusion")
 
         # the max heap will store the seed set cost and the seed set index
         # so, if we want the top 5 seed sets, we can pop 5 times from the heap
         max_heap = []
         for i, s in enumerate(seed_sets):
-            log(text="\n---------------------------------------------\n")
-            log(text=f"{RED}### START Seed set {i}: {s} START ###{RESET}\n")
+            log_debug("\n---------------------------------------------\n")
+            log_debug(f"{RED}### START Seed set %d: %s START ###{RESET}\n", i, summarize_nodes(s))
             s_cost = seed_set_cost(s.seed_set, self.nodes_cost)
             s_score = seed_set_score(s.seed_set)
 
-            log(text=f"{YELLOW}Influencing nodes in the seed set {i} with initial cost {s_cost} and score {s_score}")
+            log_debug(f"{YELLOW}Influencing nodes in the seed set %d with initial cost %d and score %d", i, s_cost, s_score)
             print_seed_set(s)
-            # start with a clean graph (without any influenced nodes)
-            nodes_influenced = generate_nodes_influenced(graph.nodes)
-            # influence the node in the seed set i
-            nodes_influenced = influence_nodes(s.seed_set, nodes_influenced)
-            # log(text=f"{RESET}Nodes influenced {i} at the start: {nodes_influenced}\n")
-
-            # influence the nodes in the graph starting from the seed set i
-            s_influenced, t = threshold_influence_diffusion(
-                graph=graph,
-                seed_set=s.seed_set,
-                nodes_influenced=nodes_influenced,
-                nodes_threshold=self.nodes_threshold,
-            )
+            s_influenced, t = evaluations[i]
             s.seed_set = s_influenced
 
-            log(text=f"{YELLOW}Influenced seed set {i} in {t} steps:")
+            log_debug(f"{YELLOW}Influenced seed set %d in %d steps:", i, t)
             print_seed_set(s_influenced)
-            # log(text=f"{RESET}Nodes influenced {i} at the end: {nodes_influenced}\n")
 
             s_influenced_cost = seed_set_cost(s_influenced, self.nodes_cost) - s_cost
             s_influenced_score = seed_set_score(s_influenced)
-            log(text=f"{GREEN}Cost of influenced seed set {i}: {s_influenced_cost}{RESET}")
-            log(text=f"{GREEN}Score of influenced seed set {i}: {s_influenced_score}\n{RESET}")
+            log_debug(f"{GREEN}Cost of influenced seed set %d: %d{RESET}", i, s_influenced_cost)
+            log_debug(f"{GREEN}Score of influenced seed set %d: %d\n{RESET}", i, s_influenced_score)
 
             max_score = max(max_score, s_influenced_score)
 
             heappush(max_heap, (-s_influenced_score, i))
 
-            log(text=f"{RED}### ENDING Seed set {i} ENDING ###{RESET}")
-            log(text="\n---------------------------------------------\n")
-            log()
+            log_debug(f"{RED}### ENDING Seed set %d ENDING ###{RESET}", i)
+            log_debug("\n---------------------------------------------\n")
+            log_debug("")
 
-        log(text="\n---------------------------------------------\n")
-        log(text=f"{RED}### Creating new population ###{RESET}\n")
+        log_debug("\n---------------------------------------------\n")
+        log_debug(f"{RED}### Creating new population ###{RESET}\n")
 
-        log(text=f"{RED}### Creating top 50% sets ###{RESET}\n")
+        log_debug(f"{RED}### Creating top 50% sets ###{RESET}\n")
         top_50_len = len(max_heap) // 2
         top_50_sets = []
-        log(text=f"{GREEN}Top 50% ({top_50_len} sets) influencing seed sets:{RESET}")
+        log_debug(f"{GREEN}Top 50%% (%d sets) influencing seed sets:{RESET}", top_50_len)
         for _ in range(top_50_len):
             score, i = heappop(max_heap)
-            log(text=f"- Seed set {i} with score {-score} -> current: {seed_sets[i].seed_set} | initial: {seed_sets[i].initial_seed_set}")
+            log_debug("- Seed set %d with score %d -> current: %s | initial: %s", i, -score, summarize_nodes(seed_sets[i].seed_set), summarize_nodes(seed_sets[i].initial_seed_set))
             top_50_sets.append(seed_sets[i])
 
-        log(text=f"\n{RED}### Creating random sets ###{RESET}")
+        self.metrics.lap("selection")
+
+        log_debug(f"\n{RED}### Creating random sets ###{RESET}")
         random_len = (self.n - top_50_len) // 2
-        random_sets = set()
-        while len(random_sets) < random_len:
-            random_set = seed_set_from_degreecost_graph_given_cost(
+        # a generator reaching no new seed sets gives less random sets instead of spinning
+        random_sets, duplicates = unique_seed_sets(
+            lambda: seed_set_from_degreecost_graph_given_cost(
                 nodes=graph.nodes,
                 nodes_cost_dict=self.nodes_cost,
                 degrees=graph.degree(),
                 cost=self.cost,
                 a_range=self.a_range,
                 b_range=self.b_range,
-            )
-            if (
-                random_set in random_sets or random_set in top_50_sets
-            ):
-                continue
-            random_sets.add(random_set)
+            ),
+            n=random_len,
+            exclude=top_50_sets,
+            reachable=lambda: seed_sets_reachable_from_degreecost(graph.nodes, self.nodes_cost, graph.degree(), self.cost, self.a_range, self.b_range),
+        )
+        self.metrics.count("random set retries", duplicates)
+        self.metrics.lap("random sets")
 
-        log(text=f"\n{GREEN}Random ({random_len} sets) influencing seed sets:{RESET}")
+        log_debug(f"\n{GREEN}Random (%d sets) influencing seed sets:{RESET}", len(random_sets))
         for i, s in enumerate(random_sets):
-            log(text=f"- Seed set {i} -> {s.seed_set}")
+            log_debug("- Seed set %d -> %s", i, summarize_nodes(s.seed_set))
 
-        log(text=f"\n{GREEN}Combination ({random_len} sets) influencing seed sets:{RESET}\n")
+        log_debug(f"\n{GREEN}Combination (%d sets) influencing seed sets:{RESET}\n", random_len)
         combined_sets = set()
         for i in range(0, len(top_50_sets), 2):
             s1 = top_50_sets[i]
             s2 = top_50_sets[i + 1]
 
+            # the combined permutation of s1 and s2 is computed once for all the retries
+            candidates = permutation_position_combine_candidates(
+                s1=s1,
+                s2=s2,
+                nodes_cost_dict=self.nodes_cost,
+                degrees=graph.degree(),
+                a_range=self.a_range,
+                b_range=self.b_range,
+                cost=self.cost,
+                generation_opt=3,
+            )
             found = False
             iterations = self.cost * 2
             while not found and iterations > 0:
-                combined_set = permutation_position_combine_seed_sets(
-                    s1=s1,
-                    s2=s2,
-                    nodes_cost_dict=self.nodes_cost,
-                    degrees=graph.degree(),
-                    a_range=self.a_range,
-                    b_range=self.b_range,
-                    cost=self.cost,
-                    generation_opt=3,
-                )
+                combined_set = next(candidates)
                 if (
                     combined_set not in combined_sets and \
                     combined_set not in top_50_sets and \
@@ -364,19 +522,22 @@ class GeneticDegreeCostSimulation:
                 ):
                     combined_sets.add(combined_set)
                     found = True
-                    log(text=f"- Combining seed sets {i} and {i + 1} with resulting seed set {i} -> {combined_set.seed_set}")
+                    log_debug("- Combining seed sets %d and %d with resulting seed set %d -> %s", i, i + 1, i, summarize_nodes(combined_set.seed_set))
+                self.metrics.count("combination attempts")
                 iterations -= 1
+        self.metrics.lap("combination")
 
-        log(text="\n---------------------------------------------\n")
-        log(text=f"{RED}### Resulting new population ###{RESET}\n")
+        log_debug("\n---------------------------------------------\n")
+        log_debug(f"{RED}### Resulting new population ###{RESET}\n")
 
         seed_sets = top_50_sets + list(random_sets) + list(combined_sets)
         for i, s in enumerate(seed_sets):
-            log(text=f"New seed set {i} -> {s.seed_set}")
+            log_debug("New seed set %d -> %s", i, summarize_nodes(s.seed_set))
 
-        log(text="\n---------------------------------------------\n")
+        log_debug("\n---------------------------------------------\n")
 
-        log(text=f"{RED}### Epoch score ###{RESET}\n")
-        log(text=f"Epoch score: {max_score}\n")
+        log_debug(f"{RED}### Epoch score ###{RESET}\n")
+        log_info("Epoch score: %d\n", max_score)
+        self.metrics.lap("logging")
 
         return seed_sets, max_score
\ No newline at end of file
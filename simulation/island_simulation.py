@@ -0,0 +1,202 @@
+import os
+import queue
+import random
+from copy import copy
+from network import *
+from utils import *
+from .metrics import SimulationMetrics
+
+
+class IslandSimulation:
+    """
+    Island model of a genetic simulation: `islands` populations of simulation.n seed
+    sets evolve in their own processes with the run of the simulation, and every
+    migration_every epochs each island sends a copy of its `migrants` best seed sets
+    to the next island (in a ring, over a queue), where they take the place of the
+    last seed sets of the population (random and combined ones, not evaluated yet).
+
+    Each island waits for the migrants of the previous one, so the results only depend
+    on the random seeds of the islands (drawn from the random module before starting
+    them), not on the timing of the processes.
+
+    The score of an epoch is the best score of the islands in that epoch, so run()
+    returns the same results as the run of the simulation, and the final population
+    is the union of the final populations of the islands.
+    """
+
+
+    def __init__(self, simulation, islands=4, migration_every=5, migrants=2):
+        self.simulation = simulation
+        self.name = simulation.name
+        self.islands = islands
+        self.migration_every = migration_every
+        self.migrants = migrants
+        self.metrics = None
+
+
+    def run(self, graph_name="karate_club_graph"):
+        self.metrics = SimulationMetrics(self.name)
+        if self.simulation.checkpoint is not None:
+            # the migrations in flight are not saved, so the islands do not checkpoint
+            log_important(text=f"Checkpoints of {self.name} are disabled with {self.islands} islands")
+
+        log(text=f"Running {self.name} on {self.islands} islands of {self.simulation.n} seed sets, migrating {self.migrants} seed sets every {self.migration_every} epochs\n")
+        context = fork_context()
+        inboxes = [context.Queue() for _ in range(self.islands)]
+        outcomes = context.Queue()
+        seeds = [random.getrandbits(64) for _ in range(self.islands)]
+        log_file_path = os.environ.get("LOG_FILE_PATH", "log")
+        processes = [
+            context.Process(
+                target=run_island,
+                args=(
+                    self.simulation,
+                    graph_name,
+                    island,
+                    seeds[island],
+                    inboxes[island],
+                    inboxes[(island + 1) % self.islands],
+                    outcomes,
+                    self.migration_every,
+                    self.migrants,
+                    f"{log_file_path} island {island}",
+                ),
+            )
+            for island in range(self.islands)
+        ]
+        for process in processes:
+            process.start()
+
+        results = [None] * self.islands
+        try:
+            for _ in range(self.islands):
+                island, error, result = self.next_outcome(outcomes, processes, results)
+                if error is not None:
+                    log_important(text=f"Island {island} of {self.name} failed because of \"{error}\"")
+                    raise error
+                results[island] = result
+        finally:
+            # if an island failed, the others may be waiting for its migrants
+            failed = any(result is None for result in results)
+            for process in processes:
+                if failed:
+                    process.terminate()
+                process.join()
+        self.metrics.lap("islands")
+
+        return self.merge(results)
+
+
+    def next_outcome(self, outcomes, processes, results, poll_seconds=1):
+        """
+        Wait for the outcome of the next island, checking that the islands still
+        running did not exit without one (e.g., killed).
+        """
+        while True:
+            try:
+                return outcomes.get(timeout=poll_seconds)
+            except queue.Empty:
+                for island, process in enumerate(processes):
+                    if results[island] is None and process.exitcode not in (None, 0):
+                        raise RuntimeError(f"Island {island} of {self.name} exited with code {process.exitcode}")
+
+
+    def merge(self, results):
+        """
+        Merge the results of the islands into the ones of a single run of the simulation.
+        """
+        seed_sets = []
+        max_score = 0
+        epoch_scores = {}
+        for island_result, island_metrics in results:
+            island_seed_sets, island_max_score, island_epoch_scores = island_result[:3]
+            seed_sets.extend(island_seed_sets)
+            max_score = max(max_score, island_max_score)
+            for epoch, score in island_epoch_scores.items():
+                epoch_scores[epoch] = max(epoch_scores.get(epoch, 0), score)
+            for phase, seconds in island_metrics["phases"].items():
+                self.metrics.phases[phase] += seconds
+            for counter, value in island_metrics["counters"].items():
+                self.metrics.counters[counter] += value
+
+        log(text=f"\n{GREEN}### Island scores ###{RESET}\n")
+        for island, (island_result, _) in enumerate(results):
+            log(text=f"Island {island} max score: {island_result[1]}")
+        log(text=f"\nMax score: {max_score}\n")
+
+        if len(results[0][0]) == 3:
+            return seed_sets, max_score, epoch_scores
+
+        # e.g., the best of the starting populations of Genetic Degree/Cost
+        bests = [island_result[3] for island_result, _ in results if island_result[3] is not None]
+        best = max(bests, key=lambda s: seed_set_score(s.seed_set)) if bests else None
+        return seed_sets, max_score, epoch_scores, best
+
+
+class Migration:
+    """
+    Exchange of the best seed sets of an island with its neighbours in the ring,
+    called by the simulation after each epoch.
+    """
+
+
+    def __init__(self, simulation, inbox, outbox, every, migrants):
+        self.simulation = simulation
+        self.inbox = inbox
+        self.outbox = outbox
+        self.every = every
+        self.migrants = migrants
+
+
+    def __call__(self, epoch, seed_sets):
+        # no migration after the last epoch, which would not be evaluated
+        if self.every <= 0 or (epoch + 1) % self.every != 0 or epoch + 1 == self.simulation.epochs:
+            return seed_sets
+
+        # the population starts with the best seed sets of the epoch, by score
+        migrants = min(self.migrants, len(seed_sets) // 2)
+        self.outbox.put([migrant_ixs(s) for s in seed_sets[:migrants]])
+
+        index = seed_sets[0].index if seed_sets else None
+        received = [migrant_seed_set(ixs, index) for ixs in self.inbox.get()]
+        received = [s for s in received if s not in seed_sets]
+        self.simulation.metrics.count("migrants", len(received))
+        if not received:
+            return seed_sets
+
+        log_debug("Received %d seed sets from the previous island", len(received))
+        return seed_sets[:len(seed_sets) - len(received)] + received
+
+
+def migrant_ixs(seed_set):
+    # the positions of the nodes, without the index (each island has the same one)
+    return seed_set.initial_ixs, seed_set.seed_ixs, seed_set.permutation_ixs
+
+
+def migrant_seed_set(ixs, index):
+    initial_ixs, seed_ixs, permutation_ixs = ixs
+    seed_set = GraphPermutationSeedSet.from_ixs(initial_ixs, permutation_ixs, index)
+    seed_set.seed_ixs = seed_ixs
+    return seed_set
+
+
+def run_island(simulation, graph_name, island, seed, inbox, outbox, outcomes, migration_every, migrants, log_file_path):
+    """
+    Run the simulation of an island, and put its results (or the error that stopped
+    it) in outcomes.
+    """
+    use_log_file(log_file_path)
+    random.seed(seed)
+
+    simulation = copy(simulation)
+    simulation.name = f"{simulation.name} island {island}"
+    simulation.checkpoint = None
+    simulation.migration = Migration(simulation, inbox, outbox, migration_every, migrants)
+    try:
+        result = simulation.run(graph_name)
+        outcomes.put((island, None, (result, simulation.metrics.to_dict())))
+    except Exception as e:
+        outcomes.put((island, e, None))
+    finally:
+        # the process exits without running atexit, so write the queued lines now
+        close_logger()
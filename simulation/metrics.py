@@ -0,0 +1,60 @@
+import json
+import time
+from collections import defaultdict
+
+
+class SimulationMetrics:
+    """
+    Time spent in each phase of a simulation run and counters of the work done
+    (cascades evaluated, diffusion rounds, nodes and edges touched, retries of the
+    generation loops, fitness cache hits, ...).
+
+    Phases are timed as laps: lap(phase) adds the time elapsed since the previous
+    lap (or mark) to the phase, so consecutive phases need no nesting.
+    """
+
+
+    def __init__(self, name=""):
+        self.name = name
+        self.phases = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.last = time.perf_counter()
+
+
+    def mark(self):
+        self.last = time.perf_counter()
+
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] += now - self.last
+        self.last = now
+
+
+    def count(self, counter, value=1):
+        self.counters[counter] += value
+
+
+    def count_cache(self, fitness_cache):
+        if fitness_cache is not None:
+            self.counters["cache hits"] = fitness_cache.hits
+            self.counters["cache misses"] = fitness_cache.misses
+
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "phases": dict(self.phases),
+            "counters": dict(self.counters),
+        }
+
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+    def __str__(self):
+        phases = ", ".join(f"{phase}: {seconds:.3f}s" for phase, seconds in self.phases.items())
+        counters = ", ".join(f"{counter}: {value}" for counter, value in self.counters.items())
+        return f"SimulationMetrics({self.name}; {phases}; {counters})"
@@ -0,0 +1,149 @@
+import numpy as np
+from heapq import heappop, heappush
+from typing import Any, Dict
+from network import *
+from utils import *
+from .degree_simulation import DegreeSimulation
+from .metrics import SimulationMetrics
+
+class TSSSimulation(DegreeSimulation):
+    """
+    Cost-weighted target set selection (TSS) by iterative pruning, as in the TSS
+    heuristic of Cordasco et al. for the threshold model: the nodes are removed from
+    the graph one at a time, lowering the degree (and, when the removed node will be
+    influenced before them, the threshold) of the nodes counting it:
+
+    1. a node with threshold 0 is influenced by the nodes already removed;
+    2. a node with degree lower than its threshold can only be a seed;
+    3. otherwise, the node with the highest cost * threshold / (degree * (degree + 1))
+       is pruned: it will be influenced by the nodes left (so costly nodes with high
+       thresholds and few neighbors are the first ones kept out of the seed set).
+
+    Cases 1 and 2 are buckets of the nodes whose state allows them, case 3 a heap with
+    lazily discarded keys, so a pass costs O(E log V).
+
+    The seeds of case 2 influence the whole graph, but they usually cost more than the
+    budget: they are taken in the degree/cost order while their cost fits the budget,
+    and the budget left goes to the other nodes in the same order.
+    """
+
+
+    def __init__(
+        self,
+        name="TSS",
+        cost=0,
+        nodes_threshold: Dict[Any, int]=None,
+        nodes_cost: Dict[Any, int]=None,
+        diffusion_engine="frontier",
+    ):
+        super().__init__(
+            name=name,
+            cost=cost,
+            nodes_threshold=nodes_threshold,
+            nodes_cost=nodes_cost,
+            diffusion_engine=diffusion_engine,
+        )
+
+
+    def run(self, graph_name="karate_club_graph"):
+        graph = graphs_by_name[graph_name]
+        self.metrics = SimulationMetrics(self.name)
+
+        log(text=f"Generating seed set with cost-weighted target set selection given a cost of {self.cost}\n")
+        target_set, others = self.target_set_selection(graph)
+        index = node_order_index(self.nodes_cost, graph.degree())
+        keys = node_order_keys["degree/cost"](index.degree, index.cost)
+        seed_set, _ = seed_set_from_node_order_given_cost(
+            index=index,
+            order=np.concatenate([index.sort(keys, target_set), index.sort(keys, others)]),
+            cost=self.cost,
+        )
+
+        self.metrics.lap("seed set")
+
+        epoch_sets, epoch_score = self.run_epoch(
+            graph=graph,
+            seed_sets=[seed_set], # only one seed set in this case
+            nodes_cost=self.nodes_cost,
+            nodes_threshold=self.nodes_threshold,
+        )
+
+        log(text=f"\n{GREEN}### Final TSS seed set ###{RESET}\n")
+        log_info("- %s", summarize_nodes(epoch_sets[0].seed_set))
+
+        log(text=f"\n{GREEN}### Metrics ###{RESET}\n")
+        log_info("%s\n", self.metrics)
+
+        return seed_set, epoch_score
+
+
+    def target_set_selection(self, graph):
+        """
+        Return the target set (the seeds of case 2) and the other nodes, in the order they were removed.
+        """
+        # a node counts the neighbors it points to, so removing a node
+        # changes the nodes pointing to it (its predecessors)
+        notified_neighbors = graph.predecessors if graph.is_directed() else graph.neighbors
+        positions = {node: position for position, node in enumerate(graph.nodes)}
+        degree = {node: sum(1 for neighbor in graph.neighbors(node) if neighbor != node) for node in graph.nodes}
+        threshold = {node: max(self.nodes_threshold[node], 0) for node in graph.nodes}
+        remaining = set(graph.nodes)
+
+        def pruning_key(node):
+            return -self.nodes_cost[node] * threshold[node] / (degree[node] * (degree[node] + 1))
+
+        # buckets of the nodes of cases 1 and 2, heap of the others (case 3)
+        influenced_bucket = []
+        seed_bucket = []
+        queue = []
+        keys = {}
+
+        def place(node):
+            if threshold[node] == 0:
+                influenced_bucket.append(node)
+            elif degree[node] < threshold[node]:
+                seed_bucket.append(node)
+            else:
+                keys[node] = pruning_key(node)
+                heappush(queue, (keys[node], positions[node], node))
+
+        for node in graph.nodes:
+            place(node)
+
+        seeds = []
+        others = []
+        edges = 0
+        while remaining:
+            if influenced_bucket:
+                node = influenced_bucket.pop()
+            elif seed_bucket:
+                node = seed_bucket.pop()
+            else:
+                key, _, node = heappop(queue)
+                if node not in remaining or keys[node] != key:
+                    continue
+            if node not in remaining:
+                continue
+
+            remaining.remove(node)
+            # a seed (or a node influenced by the removed ones) is influenced before the nodes left
+            is_influenced = threshold[node] == 0 or degree[node] < threshold[node]
+            if is_influenced and threshold[node] > 0:
+                seeds.append(node)
+            else:
+                others.append(node)
+
+            for neighbor in notified_neighbors(node):
+                edges += 1
+                if neighbor == node or neighbor not in remaining:
+                    continue
+                degree[neighbor] -= 1
+                if is_influenced and threshold[neighbor] > 0:
+                    threshold[neighbor] -= 1
+                place(neighbor)
+
+        self.metrics.count("edges touched", edges)
+        self.metrics.count("target set size", len(seeds))
+        self.metrics.count("target set cost", sum(self.nodes_cost[node] for node in seeds))
+
+        return seeds, others
@@ -0,0 +1,48 @@
+from experiment import run_sweep, sweep_grid
+from argparse import ArgumentParser
+from main import setup
+import json
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Run the experiment simulations over a sweep of configurations.")
+    parser.add_argument("-g", "--graph_names", type=str, nargs="+", default=["erdos_renyi_graph"], help="Graph names")
+    parser.add_argument("-c", "--costs", type=int, nargs="+", default=[500], help="Cost values")
+    parser.add_argument("-n", "--set_sizes", type=int, nargs="+", default=[20], help="Sizes of seed set")
+    parser.add_argument("-e", "--epochs", type=int, nargs="+", default=[50], help="Numbers of epochs")
+    parser.add_argument("-cf", "--configurations", type=str, default=None, help="JSON file with a list of {\"cost\", \"n\", \"epochs\"} configurations (instead of the grid)")
+    parser.add_argument("-mt", "--majority_thresholds", action="store_true", help="Use majority thresholds")
+    parser.add_argument("-bop", "--best_of_population", action="store_true", help="Use best of genetic degree/cost population as degree/cost seed set")
+    parser.add_argument("-de", "--diffusion_engine", type=str, default="frontier", help="Diffusion engine (standard, frontier, csr or reduced)")
+    parser.add_argument("-bd", "--batch_diffusion", action="store_true", help="Evaluate each genetic population in one batched diffusion")
+    parser.add_argument("-id", "--incremental_diffusion", action="store_true", help="Continue the cascade of each seed set from the cascade of the closest evaluated seed set")
+    parser.add_argument("-fcs", "--fitness_cache_size", type=int, default=512, help="Max number of cached seed set evaluations (0 to disable)")
+    parser.add_argument("-w", "--workers", type=int, default=0, help="Number of worker processes evaluating the genetic populations")
+    parser.add_argument("-ll", "--log_level", type=str, default="INFO", help="Log level (DEBUG logs every seed set of each epoch, INFO only the summaries)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of processes running the configurations in parallel")
+    parser.add_argument("-p", "--profile", action="store_true", help="Profile each simulation job with cProfile (saved in results)")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="Random seed of the sweep (random if not given)")
+    parser.add_argument("-exp", "--experiment_name", type=str, default="Sweep", help="Sweep name")
+    args = parser.parse_args()
+
+    if args.configurations:
+        with open(args.configurations) as f:
+            configurations = json.load(f)
+    else:
+        configurations = sweep_grid(args.costs, args.set_sizes, args.epochs)
+
+    options = {
+        "thresholds_as_majority": args.majority_thresholds,
+        "with_best_of_starting_population": args.best_of_population,
+        "diffusion_engine": args.diffusion_engine,
+        "batch_diffusion": args.batch_diffusion,
+        "incremental_diffusion": args.incremental_diffusion,
+        "fitness_cache_size": args.fitness_cache_size,
+        "workers": args.workers,
+        "jobs": args.jobs,
+        "seed": args.seed,
+        "profile": args.profile,
+    }
+
+    setup(args.experiment_name, args.log_level)
+    run_sweep(args.experiment_name, args.graph_names, configurations, options)
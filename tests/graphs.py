@@ -0,0 +1,29 @@
+import random
+import networkx as nx
+
+
+def random_graph(rng, directed=False, max_nodes=40):
+    """
+    Random graph with self-loops and thresholds between 0 and the degree plus one
+    (so some nodes are influenced without neighbors and some never are).
+    """
+    num_nodes = rng.randint(1, max_nodes)
+    graph = nx.gnp_random_graph(num_nodes, rng.uniform(0.02, 0.3), seed=rng.randrange(2 ** 32), directed=directed)
+    for node in rng.sample(list(graph.nodes), k=min(3, num_nodes)):
+        graph.add_edge(node, node)
+
+    degrees = graph.out_degree() if directed else graph.degree()
+    nodes_threshold = {node: rng.randint(0, degrees[node] + 1) for node in graph.nodes}
+    return graph, nodes_threshold
+
+
+def random_seed_set(rng, graph, max_size=8):
+    nodes = list(graph.nodes)
+    return rng.sample(nodes, k=rng.randint(0, min(max_size, len(nodes))))
+
+
+def random_graphs(count, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        graph, nodes_threshold = random_graph(rng, directed=i % 2 == 1)
+        yield rng, graph, nodes_threshold
@@ -0,0 +1,53 @@
+import pytest
+from network import (
+    csr_graph_from_networkx,
+    csr_threshold_influence_diffusion,
+    batch_threshold_influence_diffusion,
+    diffusion_engine_by_name,
+    generate_nodes_influenced,
+    influence_nodes,
+)
+from graphs import random_graphs, random_seed_set
+
+
+def diffusion(engine, graph, seed_set, nodes_threshold):
+    nodes_influenced = influence_nodes(seed_set, generate_nodes_influenced(graph.nodes))
+    influenced, t = diffusion_engine_by_name(engine)(
+        graph=graph,
+        seed_set=seed_set,
+        nodes_influenced=nodes_influenced,
+        nodes_threshold=nodes_threshold,
+    )
+    assert {node for node, is_influenced in nodes_influenced.items() if is_influenced} == set(influenced)
+    return set(influenced), t
+
+
+@pytest.mark.parametrize("engine", ["frontier", "csr", "reduced"])
+def test_engine_matches_standard(engine):
+    for rng, graph, nodes_threshold in random_graphs(150):
+        for _ in range(3):
+            seed_set = random_seed_set(rng, graph)
+            assert diffusion(engine, graph, seed_set, nodes_threshold) == diffusion("standard", graph, seed_set, nodes_threshold)
+
+
+def test_csr_graph_matches_standard():
+    for rng, graph, nodes_threshold in random_graphs(100, seed=1):
+        csr_graph = csr_graph_from_networkx(graph, nodes_threshold)
+        seed_set = random_seed_set(rng, graph)
+        influenced_ixs, t = csr_threshold_influence_diffusion(csr_graph, csr_graph.to_ixs(seed_set))
+        assert (set(csr_graph.to_labels(influenced_ixs)), t) == diffusion("standard", graph, seed_set, nodes_threshold)
+
+
+def test_batch_matches_standard():
+    for rng, graph, nodes_threshold in random_graphs(100, seed=2):
+        seed_sets = [random_seed_set(rng, graph) for _ in range(rng.randint(1, 6))]
+        influenced_sets, scores, steps = batch_threshold_influence_diffusion(graph, seed_sets, nodes_threshold)
+        for seed_set, influenced, score, t in zip(seed_sets, influenced_sets, scores, steps):
+            expected, expected_t = diffusion("standard", graph, seed_set, nodes_threshold)
+            assert (set(influenced), len(influenced), t) == (expected, len(expected), expected_t)
+            assert score == len(expected)
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        diffusion_engine_by_name("unknown")
@@ -0,0 +1,56 @@
+from network.incremental import (
+    cascade_state,
+    incremental_cascade_state,
+    cascade_gain,
+    extend_cascade_state,
+    shrink_cascade_state,
+)
+from graphs import random_graphs, random_seed_set
+from test_diffusion_engines import diffusion
+
+
+def assert_same_state(state, expected, nodes_threshold):
+    assert state.seed_set == expected.seed_set
+    assert state.rounds == expected.rounds
+    assert state.t == expected.t
+
+    # the counts a later continuation relies on (the nodes with a non-positive
+    # threshold are influenced at round 1 whatever their neighbors)
+    for node, threshold in nodes_threshold.items():
+        if node in state.seed_set or threshold <= 0:
+            continue
+        assert state.counts.get(node, 0) == expected.counts.get(node, 0)
+        if node in state.rounds:
+            assert state.below.get(node, 0) == expected.below.get(node, 0)
+
+
+def test_incremental_cascade_state_matches_recomputation():
+    for rng, graph, nodes_threshold in random_graphs(400):
+        nodes = list(graph.nodes)
+        state = cascade_state(graph, random_seed_set(rng, graph), nodes_threshold)
+        assert (set(state.influenced), state.t) == diffusion("standard", graph, state.seed_set, nodes_threshold)
+        # chained changes, each continuing the state of the previous one
+        for _ in range(4):
+            seed_set = set(state.seed_set)
+            seed_set -= set(rng.sample(sorted(seed_set), k=rng.randint(0, len(seed_set))))
+            seed_set |= set(rng.sample(nodes, k=rng.randint(0, min(3, len(nodes)))))
+
+            state = incremental_cascade_state(graph, state, seed_set, nodes_threshold)
+            assert_same_state(state, cascade_state(graph, seed_set, nodes_threshold), nodes_threshold)
+
+
+def test_extend_and_shrink_cascade_state():
+    for rng, graph, nodes_threshold in random_graphs(200, seed=1):
+        nodes = list(graph.nodes)
+        state = cascade_state(graph, random_seed_set(rng, graph), nodes_threshold)
+
+        added = rng.sample(nodes, k=rng.randint(1, min(3, len(nodes))))
+        extended = extend_cascade_state(graph, state, added, nodes_threshold)
+        assert_same_state(extended, cascade_state(graph, state.seed_set | set(added), nodes_threshold), nodes_threshold)
+
+        gain, _ = cascade_gain(graph, state, added, nodes_threshold)
+        assert gain == len(extended) - len(state)
+
+        removed = rng.sample(sorted(extended.seed_set), k=rng.randint(0, len(extended.seed_set)))
+        shrunk = shrink_cascade_state(graph, extended, removed, nodes_threshold)
+        assert_same_state(shrunk, cascade_state(graph, extended.seed_set - set(removed), nodes_threshold), nodes_threshold)
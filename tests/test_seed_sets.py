@@ -0,0 +1,37 @@
+import networkx as nx
+from network import (
+    node_order_index,
+    seed_set_from_degree_graph_given_cost,
+    seed_set_from_degreecost_graph_given_cost,
+)
+
+
+def test_builders_follow_the_given_degrees():
+    # the same cost dictionary with two different degrees
+    nodes_cost_dict = {node: 1 for node in range(6)}
+    degrees = {0: 5, 1: 4, 2: 3, 3: 2, 4: 1, 5: 0}
+    reversed_degrees = {node: 5 - degree for node, degree in degrees.items()}
+
+    builders = (
+        seed_set_from_degree_graph_given_cost,
+        lambda **kwargs: seed_set_from_degreecost_graph_given_cost(b_range=[1, 1], **kwargs),
+    )
+    for builder in builders:
+        for node_degrees, expected in ((degrees, [0, 1]), (reversed_degrees, [4, 5]), (degrees, [0, 1])):
+            seed_set = builder(
+                nodes=range(6),
+                nodes_cost_dict=nodes_cost_dict,
+                degrees=node_degrees,
+                cost=2,
+                a_range=[1, 1],
+            )
+            assert sorted(seed_set.seed_set) == expected
+
+
+def test_index_is_shared_by_the_degree_views_of_a_graph():
+    graph = nx.karate_club_graph()
+    nodes_cost_dict = {node: 1 for node in graph}
+
+    index = node_order_index(nodes_cost_dict, graph.degree())
+    assert node_order_index(nodes_cost_dict, graph.degree()) is index
+    assert node_order_index(nodes_cost_dict, graph.degree(weight="weight")) is not index
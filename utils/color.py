@@ -8,4 +8,6 @@ LINE_BLUE = "b"
 LINE_RED = "r"
 LINE_GREEN = "g"
 LINE_YELLOW = "y"
-LINE_PURPLE = "m"
\ No newline at end of file
+LINE_PURPLE = "m"
+LINE_CYAN = "c"
+LINE_BLACK = "k"
\ No newline at end of file
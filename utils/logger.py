@@ -1,24 +1,252 @@
 import re
 import os
+import atexit
+import queue
+import threading
 from utils.os import str_to_bool
 
 LOGGING_ENABLED = "True"
 ANSI_COLOR_PATTERN = re.compile(r'\033\[[0-9;]*m')
 
+DEBUG = 10
+INFO = 20
+IMPORTANT = 30
+LOG_LEVELS = {"DEBUG": DEBUG, "INFO": INFO, "IMPORTANT": IMPORTANT}
 
-def log_important(text="", file_dir="logs", file_path="log"):
-    log_to_console(text)
-    log_to_file(text, file_dir, file_path)
+LOG_FLUSH_BATCH_SIZE = 1000
+# nodes shown by summarize_nodes (0 shows all of them)
+LOG_MAX_NODES = 20
+_STOP_WRITER = object()
 
 
-def log(text="", enabled=True, file_dir="logs", file_path="log"):
-    console_enabled = str_to_bool(os.getenv("LOG_CONSOLE_ENABLED", LOGGING_ENABLED)) and enabled
-    if console_enabled:
-        log_to_console(text)
+class Logger:
+    """
+    Logger with its configuration resolved once: console lines are printed right away,
+    while file lines are queued to a background thread that keeps the log file open
+    and writes them in batches.
+
+    Messages below the configured level are dropped before being formatted.
+    """
+
+
+    def __init__(
+        self,
+        console_enabled=True,
+        file_enabled=True,
+        file_dir="logs",
+        file_path="log",
+        level=INFO,
+    ):
+        self.console_enabled = console_enabled
+        self.file_enabled = file_enabled
+        self.file_dir = file_dir
+        self.file_path = os.path.join(file_dir, f"log_{file_path}.txt")
+        self.level = level
+        self.queue = queue.SimpleQueue()
+        self.writer = None
+        self.lock = threading.Lock()
+
+
+    def is_enabled_for(self, level):
+        return level >= self.level and (self.console_enabled or self.file_enabled)
+
+
+    def log(self, text, args=(), level=INFO, force=False):
+        """
+        Log text (formatted as text % args only if the message is logged) to the
+        console and file, if enabled. With force, log it whatever the configuration.
+        """
+        if not force and level < self.level:
+            return
+
+        console_enabled = force or self.console_enabled
+        file_enabled = force or self.file_enabled
+        if not console_enabled and not file_enabled:
+            return
+
+        if args:
+            text = text % args
+
+        if console_enabled:
+            log_to_console(text)
+        if file_enabled:
+            self.start_writer()
+            self.queue.put(text)
+
+
+    def start_writer(self):
+        if self.writer is not None:
+            return
+
+        with self.lock:
+            if self.writer is None:
+                os.makedirs(self.file_dir, exist_ok=True)
+                self.writer = threading.Thread(target=self.write_lines, name="log-writer", daemon=True)
+                self.writer.start()
+
+
+    def write_lines(self):
+        with open(self.file_path, "a") as log_file:
+            while True:
+                lines = [self.queue.get()]
+                # take whatever else is already queued and write it all at once
+                while len(lines) < LOG_FLUSH_BATCH_SIZE:
+                    try:
+                        lines.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stop = any(line is _STOP_WRITER for line in lines)
+                log_file.write("".join(
+                    ANSI_COLOR_PATTERN.sub('', line) + "\n"
+                    for line in lines if line is not _STOP_WRITER
+                ))
+                log_file.flush()
+
+                if stop:
+                    return
+
+
+    def close(self):
+        # write the queued lines and close the log file
+        if self.writer is not None:
+            self.queue.put(_STOP_WRITER)
+            self.writer.join()
+            self.writer = None
+
+
+_logger = None
+
+
+def logger_from_env():
+    return Logger(
+        console_enabled=str_to_bool(os.getenv("LOG_CONSOLE_ENABLED", LOGGING_ENABLED)),
+        file_enabled=str_to_bool(os.getenv("LOG_FILE_ENABLED", LOGGING_ENABLED)),
+        file_dir=os.getenv("LOG_FILE_DIR", "logs"),
+        file_path=os.getenv("LOG_FILE_PATH", "log"),
+        level=LOG_LEVELS.get(os.getenv("LOG_LEVEL", "INFO").strip().upper(), INFO),
+    )
+
+
+def get_logger():
+    global _logger
+    if _logger is None:
+        _logger = logger_from_env()
+    return _logger
+
+
+def configure_logger():
+    """
+    Resolve again the logging configuration from the environment (LOG_CONSOLE_ENABLED,
+    LOG_FILE_ENABLED, LOG_FILE_DIR, LOG_FILE_PATH and LOG_LEVEL), e.g., after changing
+    the log file of a new experiment.
+    """
+    global _logger
+    close_logger()
+    _logger = logger_from_env()
+    return _logger
+
+
+def use_log_file(file_path):
+    """
+    Log to the file named after file_path (in LOG_FILE_DIR) from now on.
+    """
+    os.environ["LOG_FILE_PATH"] = file_path.replace(os.sep, "-")
+    return configure_logger()
 
-    file_enabled = str_to_bool(os.getenv("LOG_FILE_ENABLED", LOGGING_ENABLED)) and enabled
-    if file_enabled:
+
+def close_logger():
+    if _logger is not None:
+        _logger.close()
+
+
+def reset_logger_after_fork():
+    # the writer thread is not copied into a forked process, so the child starts its own
+    if _logger is not None:
+        _logger.queue = queue.SimpleQueue()
+        _logger.writer = None
+        _logger.lock = threading.Lock()
+
+
+atexit.register(close_logger)
+os.register_at_fork(after_in_child=reset_logger_after_fork)
+
+
+def is_log_enabled(level=INFO):
+    return get_logger().is_enabled_for(level)
+
+
+def log_important(text="", file_dir="logs", file_path="log"):
+    if file_dir != "logs" or file_path != "log":
+        log_to_console(text)
         log_to_file(text, file_dir, file_path)
+        return
+
+    get_logger().log(text, level=IMPORTANT, force=True)
+
+
+def log(text="", enabled=True, file_dir="logs", file_path="log", level=INFO, args=()):
+    if not enabled:
+        return
+
+    if file_dir != "logs" or file_path != "log":
+        logger = get_logger()
+        if logger.is_enabled_for(level):
+            text = text % args if args else text
+            if logger.console_enabled:
+                log_to_console(text)
+            if logger.file_enabled:
+                log_to_file(text, file_dir, file_path)
+        return
+
+    get_logger().log(text, args=args, level=level)
+
+
+def log_debug(text, *args, enabled=True):
+    """
+    Log text % args at DEBUG level: nothing is formatted unless DEBUG messages are logged.
+    """
+    if enabled:
+        get_logger().log(text, args=args, level=DEBUG)
+
+
+def log_info(text, *args, enabled=True):
+    """
+    Log text % args at INFO level: nothing is formatted unless INFO messages are logged.
+    """
+    if enabled:
+        get_logger().log(text, args=args, level=INFO)
+
+
+class NodesSummary:
+    """
+    Nodes to log, only turned into a string (at most max_nodes of them, followed by
+    the number of the others) when the message is actually logged.
+    """
+
+
+    def __init__(self, nodes, max_nodes=None):
+        self.nodes = nodes
+        self.max_nodes = max_nodes
+
+
+    def __str__(self):
+        nodes = getattr(self.nodes, "seed_set", self.nodes)
+        if hasattr(nodes, "tolist"):
+            nodes = nodes.tolist()
+        max_nodes = self.max_nodes
+        if max_nodes is None:
+            max_nodes = int(os.getenv("LOG_MAX_NODES", LOG_MAX_NODES))
+
+        if not max_nodes or len(nodes) <= max_nodes:
+            return str(list(nodes))
+
+        shown = [node for node, _ in zip(nodes, range(max_nodes))]
+        return f"[{', '.join(map(str, shown))}, ... ({len(nodes) - max_nodes} more)]"
+
+
+def summarize_nodes(nodes, max_nodes=None):
+    return NodesSummary(nodes, max_nodes)
 
 
 def log_to_file(text, file_dir="logs", file_path="log"):
@@ -36,4 +264,4 @@ def log_to_file(text, file_dir="logs", file_path="log"):
 
 
 def log_to_console(text):
-    print(text)
\ No newline at end of file
+    print(text)
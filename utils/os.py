@@ -1,4 +1,5 @@
 import os
+import multiprocessing
 
 
 def join_with_parent_dir(*args):
@@ -14,4 +15,14 @@ def get_parent_dir():
 def str_to_bool(value: str) -> bool:
     if not value:
         return False
-    return value.strip().lower() in ("true", "1", "yes", "on")
\ No newline at end of file
+    return value.strip().lower() in ("true", "1", "yes", "on")
+
+
+def fork_context():
+    """
+    Multiprocessing context forking the worker processes, so they share the graphs
+    already built by the parent: with spawn or forkserver each worker would build
+    the random graphs (e.g., erdos_renyi_graph) again, with other edges than the ones
+    the parent drew the nodes' thresholds and costs for.
+    """
+    return multiprocessing.get_context("fork")